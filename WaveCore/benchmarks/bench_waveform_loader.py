@@ -0,0 +1,80 @@
+"""
+Micro-benchmark: waveform peak extraction throughput, legacy per-point loop vs
+the vectorized EnvelopeReducer in utils.audio_loader.
+
+    python benchmarks/bench_waveform_loader.py [--minutes 10] [--points 400] [--repeat 3]
+
+Generates long stereo WAV and FLAC files in a temp folder and reports seconds
+per file and decoded megasamples per second for both implementations.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from utils.audio_loader import load_waveform_data
+
+def legacy_load_waveform_data(file_path, points=1000):
+    # Peak extraction as it was before the vectorized reducer (soundfile path)
+    with sf.SoundFile(file_path) as f:
+        frames = f.frames
+        chunk_size = max(1, frames // points)
+        reduced_data = np.zeros(points, dtype=np.float32)
+        curr_frames_read = 0
+        for block in f.blocks(blocksize=100000, always_2d=True):
+            mono_block = block.mean(axis=1)
+            start_p = curr_frames_read // chunk_size
+            end_p = (curr_frames_read + len(mono_block)) // chunk_size
+            for p in range(start_p, min(end_p, points)):
+                b_start = max(0, p * chunk_size - curr_frames_read)
+                b_end = min(len(mono_block), (p + 1) * chunk_size - curr_frames_read)
+                if b_start < b_end:
+                    reduced_data[p] = np.max(np.abs(mono_block[b_start:b_end]))
+            curr_frames_read += len(mono_block)
+            if curr_frames_read >= frames: break
+    max_val = np.max(reduced_data)
+    if max_val > 0:
+        reduced_data = reduced_data / max_val
+    return reduced_data
+
+def make_file(folder, fmt, minutes, samplerate=48000):
+    path = os.path.join(folder, f"bench_{minutes}min.{fmt}")
+    frames = int(minutes * 60 * samplerate)
+    with sf.SoundFile(path, 'w', samplerate, 2, format=fmt.upper()) as f:
+        rng = np.random.default_rng(0)
+        for start in range(0, frames, samplerate * 10):
+            n = min(samplerate * 10, frames - start)
+            f.write((rng.standard_normal((n, 2)) * 0.1).astype(np.float32))
+    return path, frames
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--points", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        for fmt in ("wav", "flac"):
+            path, frames = make_file(folder, fmt, args.minutes)
+            before = timed(lambda: legacy_load_waveform_data(path, args.points), args.repeat)
+            after = timed(lambda: load_waveform_data(path, args.points), args.repeat)
+            msamples = frames * 2 / 1e6
+            print(f"{fmt.upper():5s} {args.minutes:g} min stereo @48k, {args.points} points")
+            print(f"  before: {before:7.3f} s/file  {msamples / before:8.1f} Msamples/s")
+            print(f"  after:  {after:7.3f} s/file  {msamples / after:8.1f} Msamples/s  ({before / after:.1f}x)")
+
+if __name__ == "__main__":
+    main()
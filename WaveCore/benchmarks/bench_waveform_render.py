@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: WaveformWidget rendering at 4K widths, the legacy per-bar
+drawRoundedRect loop vs the tiled, batched renderer in ui.waveform_widget.
+
+    python benchmarks/bench_waveform_render.py [--width 3840] [--height 80] [--repeat 5]
+
+Runs on Qt's offscreen platform. Reports milliseconds for a full render at
+zoom 1, a full render at 8x zoom, and one pan step at 8x zoom (the legacy
+renderer redraws everything on every pan step).
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QPainter, QPixmap, QBrush, QLinearGradient
+from PyQt6.QtCore import Qt, QRectF
+
+def legacy_render(widget, width, height):
+    # _render_pixmaps as it was before tiling/batching
+    base = QPixmap(width, height)
+    base.fill(Qt.GlobalColor.transparent)
+    prog = QPixmap(width, height)
+    prog.fill(Qt.GlobalColor.transparent)
+    p_base, p_prog = QPainter(base), QPainter(prog)
+    for p in (p_base, p_prog):
+        p.setRenderHint(QPainter.RenderHint.Antialiasing)
+    mid_y, max_h = height / 2, height * 0.85
+    bar_w, step_px = 2, 3
+    data = widget.data
+    start_idx = int(widget.view_offset * len(data))
+    win_data = data[start_idx:min(start_idx + int(len(data) / widget.zoom_factor), len(data))]
+    grad = QLinearGradient(0, 0, 0, height)
+    grad.setColorAt(0, widget.progress_color.lighter(110))
+    grad.setColorAt(0.5, widget.progress_color)
+    grad.setColorAt(1, widget.progress_color.darker(110))
+    p_base.setBrush(QBrush(widget.wave_color))
+    p_base.setPen(Qt.PenStyle.NoPen)
+    p_prog.setBrush(QBrush(grad))
+    p_prog.setPen(Qt.PenStyle.NoPen)
+    for x in range(0, width, step_px):
+        idx = int(x / width * len(win_data))
+        if idx >= len(win_data): break
+        h = max(2, abs(win_data[idx]) * max_h)
+        rect_f = QRectF(float(x), float(mid_y - h / 2), float(bar_w), float(h))
+        p_base.drawRoundedRect(rect_f, 1.0, 1.0)
+        p_prog.drawRoundedRect(rect_f, 1.0, 1.0)
+    p_base.end()
+    p_prog.end()
+
+def timed(fn, repeat, mean=False):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return (sum(times) / len(times) if mean else min(times)) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=80)
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    from ui.waveform_widget import WaveformWidget
+    w, h = args.width, args.height
+    widget = WaveformWidget()
+    widget.resize(w, h)
+    widget.set_data(np.abs(np.random.default_rng(0).standard_normal(args.points)).astype(np.float32) / 4)
+
+    def full(zoom):
+        def run():
+            widget.zoom_factor = zoom
+            widget._tiles_key = None # Drop the tile cache: measure a cold render
+            widget._pixmap_base = None
+            widget._render_pixmaps(w, h)
+        return run
+
+    def pan():
+        # One mouse-move pan step of 20 px (tiles stay cached between steps)
+        widget.view_offset = (widget.view_offset + 20 / (w * widget.zoom_factor)) % (1 - 1 / widget.zoom_factor)
+        widget._pixmap_base = None
+        widget._render_pixmaps(w, h)
+
+    print(f"{w}x{h} px, {args.points} points")
+    for label, zoom in (("zoom 1x", 1.0), ("zoom 8x", 8.0)):
+        widget.view_offset = 0.0
+        widget.zoom_factor = zoom
+        before = timed(lambda: legacy_render(widget, w, h), args.repeat)
+        after = timed(full(zoom), args.repeat)
+        print(f"  full render, {label}: before {before:7.2f} ms  after {after:7.2f} ms  ({before / after:.1f}x)")
+
+    widget.zoom_factor = 8.0
+    full(8.0)()
+    before = timed(lambda: legacy_render(widget, w, h), args.repeat)
+    after = timed(pan, args.repeat * 20, mean=True) # Mean: some steps expose a new tile
+    print(f"  pan step,    zoom 8x: before {before:7.2f} ms  after {after:7.2f} ms  ({before / after:.1f}x)")
+    app.quit()
+
+if __name__ == "__main__":
+    main()
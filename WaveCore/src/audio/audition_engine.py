@@ -0,0 +1,326 @@
+from PyQt6.QtMultimedia import QAudioSink, QAudioFormat, QMediaDevices, QMediaPlayer, QAudio
+from PyQt6.QtCore import QObject, QThread, QBuffer, QByteArray, QIODevice, QTimer, pyqtSignal
+from collections import OrderedDict
+import os
+import threading
+import soundfile as sf
+
+# Files up to this length are auditioned from decoded PCM; longer ones stream via QMediaPlayer
+AUDITION_MAX_SECONDS = 60
+AUDITION_CACHE_BYTES = 256 * 1024 * 1024 # Least recently used clips are dropped above this
+SINK_BUFFER_MS = 50 # Device buffer: small, so starts and seeks are heard immediately
+POSITION_INTERVAL_MS = 30
+
+def _key(path):
+    return os.path.normcase(os.path.normpath(path))
+
+class AuditionClip:
+    """Decoded 16-bit interleaved PCM of one file, ready to hand to a QAudioSink."""
+    __slots__ = ("data", "samplerate", "channels", "frames", "mtime")
+
+    def __init__(self, data, samplerate, channels, frames, mtime):
+        self.data = data # QByteArray (shared with every QBuffer playing it, no copies)
+        self.samplerate = samplerate
+        self.channels = channels
+        self.frames = frames
+        self.mtime = mtime
+
+    @property
+    def duration_ms(self):
+        return int(self.frames * 1000 / self.samplerate) if self.samplerate else 0
+
+def decode_clip(path, max_seconds=AUDITION_MAX_SECONDS):
+    """Decodes a short local file to an AuditionClip, or None (too long / unreadable)."""
+    mtime = os.path.getmtime(path)
+    try:
+        info = sf.info(path)
+        if info.duration > max_seconds:
+            return None
+        data = sf.read(path, dtype='int16', always_2d=True)[0]
+        return AuditionClip(QByteArray(data.tobytes()), info.samplerate, data.shape[1], len(data), mtime)
+    except Exception:
+        pass
+
+    # Same fallback as the waveform loader (MP3 etc. without libsndfile support)
+    try:
+        import miniaudio
+        info = miniaudio.get_file_info(path)
+        if info.duration > max_seconds:
+            return None
+        decoded = miniaudio.decode_file(path, output_format=miniaudio.SampleFormat.SIGNED16)
+        return AuditionClip(QByteArray(decoded.samples.tobytes()), decoded.sample_rate, decoded.nchannels,
+                            decoded.num_frames, mtime)
+    except Exception as e:
+        print(f"Audition decode failed for {path}: {e}")
+        return None
+
+class ClipDecoder(QThread):
+    """
+    Background decoder for the audition cache. The most recent request is decoded
+    first (LIFO), so while skimming the rows around the current one win over
+    requests that are no longer relevant.
+    """
+    clip_decoded = pyqtSignal(str, object) # path, AuditionClip or None
+
+    MAX_PENDING = 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = []
+        self._cond = threading.Condition()
+        self._is_running = True
+
+    def request(self, paths):
+        """Queues paths (newest first out). Returns the requests dropped to stay under MAX_PENDING."""
+        with self._cond:
+            for path in paths:
+                if path in self._pending:
+                    self._pending.remove(path)
+                self._pending.append(path)
+            dropped = self._pending[:-self.MAX_PENDING]
+            del self._pending[:-self.MAX_PENDING]
+            self._cond.notify()
+        if self._is_running and not self.isRunning():
+            self.start(QThread.Priority.LowPriority)
+        return dropped
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._is_running and not self._pending:
+                    self._cond.wait()
+                if not self._is_running:
+                    break
+                path = self._pending.pop()
+            clip = decode_clip(path) if os.path.exists(path) else None
+            if self._is_running:
+                self.clip_decoded.emit(path, clip)
+
+    def stop(self):
+        with self._cond:
+            self._is_running = False
+            self._cond.notify()
+        self.wait()
+
+class AuditionEngine(QObject):
+    """
+    Low-latency playback of short files from decoded PCM.
+    Clips are kept in a bounded LRU cache and played through a QAudioSink reading
+    a QBuffer over the cached bytes, so starting a cached track involves no file
+    access, probing or decoding. preload() decodes upcoming tracks (e.g. the rows
+    next to the playing one) in the background.
+    Signals mirror AudioPlayer's (positions in ms, QMediaPlayer.PlaybackState).
+    """
+    position_changed = pyqtSignal(int)
+    duration_changed = pyqtSignal(int)
+    state_changed = pyqtSignal(QMediaPlayer.PlaybackState)
+
+    def __init__(self, parent=None, max_bytes=AUDITION_CACHE_BYTES):
+        super().__init__(parent)
+        self.max_bytes = max_bytes
+        self._clips = OrderedDict() # Path key -> AuditionClip, least recently used first
+        self._bytes = 0
+        self._rejected = {} # Path key -> mtime of files that cannot be auditioned (too long...)
+        self._requested = set()
+
+        self._decoder = ClipDecoder(self)
+        self._decoder.clip_decoded.connect(self._on_clip_decoded)
+
+        self._sink = None
+        self._format = None
+        self._buffer = None
+        self._clip = None
+        self._offset_ms = 0 # Position the current sink run started from
+        self._volume = 0.8
+        self._state = QMediaPlayer.PlaybackState.StoppedState
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(POSITION_INTERVAL_MS)
+        self._timer.timeout.connect(self._emit_position)
+
+    # --- Cache ---
+    def cached_clip(self, path):
+        """The cached clip of path if it is still current, else None."""
+        key = _key(path)
+        clip = self._clips.get(key)
+        if clip is None:
+            return None
+        try:
+            if os.path.getmtime(path) != clip.mtime:
+                self._drop(key)
+                return None
+        except OSError:
+            self._drop(key)
+            return None
+        self._clips.move_to_end(key)
+        return clip
+
+    def can_play(self, path):
+        clip = self.cached_clip(path)
+        return clip is not None and self._sink_format(clip) is not None
+
+    def preload(self, paths):
+        """Queues local files for decoding into the cache (cached/known-unsuitable ones are skipped)."""
+        wanted = []
+        for path in paths:
+            if not path or path.startswith("http"):
+                continue
+            key = _key(path)
+            if key in self._clips or key in self._requested:
+                continue
+            try:
+                if self._rejected.get(key) == os.path.getmtime(path):
+                    continue
+            except OSError:
+                continue
+            self._requested.add(key)
+            wanted.append(path)
+        if wanted:
+            for path in self._decoder.request(wanted):
+                self._requested.discard(_key(path))
+
+    def _on_clip_decoded(self, path, clip):
+        key = _key(path)
+        self._requested.discard(key)
+        if clip is None:
+            try:
+                self._rejected[key] = os.path.getmtime(path)
+            except OSError:
+                pass
+            return
+        self._drop(key)
+        self._clips[key] = clip
+        self._bytes += clip.data.size()
+        while self._bytes > self.max_bytes and len(self._clips) > 1:
+            old_key = next(iter(self._clips))
+            if self._clip is self._clips[old_key]:
+                self._clips.move_to_end(old_key) # Never evict the clip being played
+                continue
+            self._drop(old_key)
+
+    def _drop(self, key):
+        clip = self._clips.pop(key, None)
+        if clip is not None:
+            self._bytes -= clip.data.size()
+
+    # --- Playback ---
+    def _sink_format(self, clip):
+        fmt = QAudioFormat()
+        fmt.setSampleRate(clip.samplerate)
+        fmt.setChannelCount(clip.channels)
+        fmt.setSampleFormat(QAudioFormat.SampleFormat.Int16)
+        return fmt if QMediaDevices.defaultAudioOutput().isFormatSupported(fmt) else None
+
+    def load(self, path):
+        """Makes path the current clip (it must be cached, see can_play). Does not start playback."""
+        clip = self.cached_clip(path)
+        if clip is None:
+            return False
+        self.stop()
+        fmt = self._sink_format(clip)
+        if fmt is None:
+            return False
+        if self._sink is None or self._format != fmt:
+            # A sink is only rebuilt when the sample format changes
+            if self._sink is not None:
+                self._sink.stateChanged.disconnect(self._on_sink_state)
+                self._sink.deleteLater()
+            self._sink = QAudioSink(QMediaDevices.defaultAudioOutput(), fmt, self)
+            self._sink.setBufferSize(fmt.bytesForDuration(SINK_BUFFER_MS * 1000))
+            self._sink.setVolume(self._volume)
+            self._sink.stateChanged.connect(self._on_sink_state)
+            self._format = fmt
+        self._clip = clip
+        self._offset_ms = 0
+        self.duration_changed.emit(clip.duration_ms)
+        return True
+
+    def _start_at(self, position_ms):
+        if self._clip is None:
+            return
+        position_ms = max(0, min(position_ms, self._clip.duration_ms))
+        self._sink.stop()
+        # One buffer, re-pointed at the clip: it holds no evicted clip's bytes
+        if self._buffer is None:
+            self._buffer = QBuffer(self)
+        self._buffer.close()
+        self._buffer.setData(self._clip.data)
+        self._buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        self._buffer.seek(self._format.bytesForDuration(position_ms * 1000))
+        self._offset_ms = position_ms
+        self._sink.start(self._buffer)
+        self._timer.start()
+
+    def play(self):
+        if self._clip is None:
+            return
+        if self._sink.state() == QAudio.State.SuspendedState:
+            self._sink.resume()
+        elif self._state != QMediaPlayer.PlaybackState.PlayingState:
+            self._start_at(self._offset_ms)
+
+    def pause(self):
+        if self._state == QMediaPlayer.PlaybackState.PlayingState:
+            self._sink.suspend()
+
+    def stop(self):
+        self._timer.stop()
+        if self._sink is not None:
+            self._sink.stop()
+        self._offset_ms = 0
+        self._set_state(QMediaPlayer.PlaybackState.StoppedState)
+
+    def set_position(self, position_ms):
+        if self._clip is None:
+            return
+        if self._state == QMediaPlayer.PlaybackState.PlayingState:
+            self._start_at(position_ms)
+        else:
+            # Remembered; play() starts from here (a paused sink is dropped, state stays paused)
+            self._timer.stop()
+            self._sink.stop()
+            self._offset_ms = max(0, min(position_ms, self._clip.duration_ms))
+            self.position_changed.emit(self._offset_ms)
+
+    def set_volume(self, volume_0_to_1):
+        self._volume = volume_0_to_1
+        if self._sink is not None:
+            self._sink.setVolume(volume_0_to_1)
+
+    def get_duration(self):
+        return self._clip.duration_ms if self._clip else 0
+
+    def get_position(self):
+        if self._clip is None:
+            return 0
+        if self._sink.state() == QAudio.State.StoppedState:
+            return self._offset_ms
+        return min(self._clip.duration_ms, self._offset_ms + self._sink.processedUSecs() // 1000)
+
+    def _emit_position(self):
+        self.position_changed.emit(self.get_position())
+
+    def _on_sink_state(self, sink_state):
+        if sink_state == QAudio.State.ActiveState:
+            self._set_state(QMediaPlayer.PlaybackState.PlayingState)
+        elif sink_state == QAudio.State.SuspendedState:
+            self._set_state(QMediaPlayer.PlaybackState.PausedState)
+        elif sink_state == QAudio.State.IdleState and self._buffer is not None and self._buffer.atEnd():
+            # Whole clip handed to the device: end of track
+            self._timer.stop()
+            self._sink.stop()
+            self._offset_ms = 0
+            self.position_changed.emit(self._clip.duration_ms)
+            self._set_state(QMediaPlayer.PlaybackState.StoppedState)
+
+    def _set_state(self, state):
+        if state != self._state:
+            self._state = state
+            self.state_changed.emit(state)
+
+    def playback_state(self):
+        return self._state
+
+    def shutdown(self):
+        self.stop()
+        self._decoder.stop()
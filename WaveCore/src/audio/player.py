@@ -1,26 +1,40 @@
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
 from PyQt6.QtCore import QUrl, QObject, pyqtSignal
+from audio.audition_engine import AuditionEngine
 
 class AudioPlayer(QObject):
+    """
+    Playback front end. Short local files that are already decoded in the audition
+    cache play through AuditionEngine (no open/probe/buffer delay); everything else
+    goes through QMediaPlayer while the file is decoded for the next time.
+    """
     position_changed = pyqtSignal(int)
     duration_changed = pyqtSignal(int)
     state_changed = pyqtSignal(QMediaPlayer.PlaybackState)
-    
+
     def __init__(self):
         super().__init__()
         self.player = QMediaPlayer()
         self.audio_output = QAudioOutput()
         self.player.setAudioOutput(self.audio_output)
-        
-        # Connect signals
+
         # Connect signals
         self.player.positionChanged.connect(self._on_position_changed)
         self.player.durationChanged.connect(self._on_duration_changed)
         self.player.playbackStateChanged.connect(self._on_state_changed)
         self.player.errorOccurred.connect(self._on_error)
-        
+
         self.audio_output.setVolume(0.8)
 
+        # Audition mode (only used at normal speed: the PCM path does not resample)
+        self.audition = AuditionEngine(self)
+        self.audition.position_changed.connect(self._on_position_changed)
+        self.audition.duration_changed.connect(self._on_duration_changed)
+        self.audition.state_changed.connect(self._on_state_changed)
+        self.audition.set_volume(0.8)
+        self._auditioning = False
+        self._rate = 1.0
+
     def _on_error(self, error, error_string):
         print(f"AUDIO ERROR: {error} - {error_string}")
 
@@ -41,34 +55,68 @@ class AudioPlayer(QObject):
             url = QUrl(file_path)
         else:
             url = QUrl.fromLocalFile(file_path)
+            if self._rate == 1.0 and self.audition.can_play(file_path):
+                self.player.stop()
+                self._auditioning = self.audition.load(file_path)
+                if self._auditioning:
+                    return
+            self.audition.preload([file_path]) # Instant on the next audition
+
+        self.audition.stop()
+        self._auditioning = False
         self.player.setSource(url)
 
+    def preload(self, file_paths):
+        """Decodes upcoming tracks (e.g. the neighbouring rows) into the audition cache."""
+        self.audition.preload(file_paths)
+
     def play(self):
-        self.player.play()
+        if self._auditioning:
+            self.audition.play()
+        else:
+            self.player.play()
 
     def pause(self):
-        self.player.pause()
+        if self._auditioning:
+            self.audition.pause()
+        else:
+            self.player.pause()
 
     def stop(self):
-        self.player.stop()
-        
+        if self._auditioning:
+            self.audition.stop()
+        else:
+            self.player.stop()
+
     def toggle_play(self):
-        if self.player.playbackState() == QMediaPlayer.PlaybackState.PlayingState:
-            self.player.pause()
+        if self.playback_state() == QMediaPlayer.PlaybackState.PlayingState:
+            self.pause()
         else:
-            self.player.play()
+            self.play()
+
+    def playback_state(self):
+        return self.audition.playback_state() if self._auditioning else self.player.playbackState()
 
     def set_position(self, position_ms):
-        self.player.setPosition(position_ms)
+        if self._auditioning:
+            self.audition.set_position(position_ms)
+        else:
+            self.player.setPosition(position_ms)
 
     def set_volume(self, volume_0_to_1):
         self.audio_output.setVolume(volume_0_to_1)
-        
+        self.audition.set_volume(volume_0_to_1)
+
     def set_playback_rate(self, rate):
+        # Applies to QMediaPlayer; tracks loaded while rate != 1.0 skip the audition path
+        self._rate = rate
         self.player.setPlaybackRate(rate)
-        
+
     def get_duration(self):
-        return self.player.duration()
-        
+        return self.audition.get_duration() if self._auditioning else self.player.duration()
+
     def get_position(self):
-        return self.player.position()
+        return self.audition.get_position() if self._auditioning else self.player.position()
+
+    def shutdown(self):
+        self.audition.shutdown()
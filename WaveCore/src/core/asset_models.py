@@ -8,8 +8,13 @@ class Asset:
         self.path = os.path.normpath(path)
         self.filename = os.path.basename(path)
         self.title = os.path.splitext(self.filename)[0]
-        self.file_size = os.path.getsize(path) if os.path.exists(path) else 0
-        self.mtime = os.path.getmtime(path) if os.path.exists(path) else 0
+        try:
+            st = os.stat(path) # One stat call instead of exists + getsize + getmtime
+            self.file_size = st.st_size
+            self.mtime = st.st_mtime
+        except OSError:
+            self.file_size = 0
+            self.mtime = 0
         self.tags = []
         self.is_favorite = False
         self.type = "generic"
@@ -41,7 +46,28 @@ class AudioAsset(Asset):
         self.channels = channels
         self.sample_rate = sample_rate
         self.waveform = waveform # Expects list or numpy array
+        self.waveform_approx = False # Seek-sampled placeholder, exact one still pending
+        self.analysis = {} # Loudness/peak/RMS/silence measurements (utils.block_analyzers)
         self.format = os.path.splitext(path)[1].lower().replace(".", "")
+        self.artist = ""
+        self.album = ""
+        self.genre = ""
+
+    @classmethod
+    def from_probe(cls, path, probe):
+        """Builds an AudioAsset from a utils.metadata_reader.probe_audio() result."""
+        asset = cls(path, duration=probe.get("duration", 0), sample_rate=probe.get("sample_rate", 0),
+                    waveform=probe.get("waveform"))
+        asset.channels = "Stereo" if probe.get("channels", 0) > 1 else "Mono"
+        asset.title = probe.get("title") or asset.title
+        asset.artist = probe.get("artist", "")
+        asset.album = probe.get("album", "")
+        asset.genre = probe.get("genre", "")
+        asset.waveform_approx = probe.get("waveform_approx", False)
+        asset.analysis = probe.get("analysis") or {}
+        if probe.get("format"):
+            asset.format = probe["format"]
+        return asset
 
     def to_dict(self):
         data = super().to_dict()
@@ -50,7 +76,12 @@ class AudioAsset(Asset):
             "channels": self.channels,
             "sample_rate": self.sample_rate,
             "waveform": self.waveform, # Ensure this is a list before saving
-            "format": self.format
+            "waveform_approx": self.waveform_approx,
+            "analysis": self.analysis,
+            "format": self.format,
+            "artist": self.artist,
+            "album": self.album,
+            "genre": self.genre
         })
         return data
 
@@ -5,10 +5,14 @@ import os
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
-from PyQt6.QtWidgets import QApplication
-from ui.main_window import MainWindow
+import multiprocessing
 
 def main():
+    # UI imports live here so scanner worker processes (spawned, they re-import
+    # this module) don't pay for loading the whole interface
+    from PyQt6.QtWidgets import QApplication
+    from ui.main_window import MainWindow
+    
     # Global Exception Handler
     def exception_hook(exctype, value, traceback_obj):
         import traceback
@@ -49,4 +53,5 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # Required for the analysis pool in PyInstaller builds
     main()
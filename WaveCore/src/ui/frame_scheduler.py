@@ -0,0 +1,72 @@
+from PyQt6.QtCore import QObject, QTimer
+import time
+
+class FrameScheduler(QObject):
+    """
+    One shared ~60 FPS timer for every animated widget. Widgets call request(self)
+    when they start animating; each tick calls their advance_frame(), which returns
+    False once they have settled. The timer stops as soon as nothing is animating,
+    so an idle app gets no frame wakeups at all.
+
+    frames / busy_ms / wakeups count the work done, for checking idle CPU (see stats()).
+    """
+    INTERVAL_MS = 16
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._active = {} # id -> widget, in request order
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.INTERVAL_MS)
+        self._timer.timeout.connect(self._tick)
+
+        self.frames = 0      # Widget frames advanced
+        self.wakeups = 0     # Timer ticks
+        self.busy_ms = 0.0   # Time spent advancing frames
+        self.last_tick_ms = 0.0
+
+    def request(self, widget):
+        """Animates widget until its advance_frame() returns False."""
+        self._active[id(widget)] = widget
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def cancel(self, widget):
+        self._active.pop(id(widget), None)
+
+    def is_running(self):
+        return self._timer.isActive()
+
+    def _tick(self):
+        start = time.perf_counter()
+        for key, widget in list(self._active.items()):
+            try:
+                animating = widget.advance_frame()
+            except RuntimeError:
+                animating = False # Underlying C++ widget already deleted
+            self.frames += 1
+            if not animating:
+                self._active.pop(key, None)
+        if not self._active:
+            self._timer.stop()
+        self.wakeups += 1
+        self.last_tick_ms = (time.perf_counter() - start) * 1000
+        self.busy_ms += self.last_tick_ms
+
+    def stats(self):
+        return {
+            "running": self.is_running(),
+            "active": len(self._active),
+            "wakeups": self.wakeups,
+            "frames": self.frames,
+            "busy_ms": round(self.busy_ms, 2),
+            "avg_tick_ms": round(self.busy_ms / self.wakeups, 3) if self.wakeups else 0.0,
+        }
+
+_scheduler = None
+
+def get_frame_scheduler():
+    """Process-wide FrameScheduler (created lazily, on the GUI thread)."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FrameScheduler()
+    return _scheduler
@@ -1,6 +1,10 @@
 from PyQt6.QtCore import QAbstractTableModel, Qt, pyqtSignal, QModelIndex, QMimeData, QUrl
 import os
+import numpy as np
 from constants import LibraryColumns
+from ui.track_store import TrackStore
+from utils.search_index import SearchIndex, search_text
+from utils.track_query import parse_query
 
 class LibraryModel(QAbstractTableModel):
     # Use Constants for architectural stability
@@ -15,9 +19,20 @@ class LibraryModel(QAbstractTableModel):
     
     COL_COUNT = LibraryColumns.COUNT
     
+    # Track keys that only affect the waveform cell (analysis is not displayed)
+    WAVEFORM_KEYS = {"path", "waveform", "waveform_approx", "analysis_pending", "analysis"}
+    # Searchable track keys besides the file name (paths change through move_tracks)
+    SEARCH_KEYS = frozenset({"title", "artist", "album", "genre", "tags"})
+    
+    PAGE_SIZE = 200 # Rows materialized per fetchMore() when listing paged results
+    
     def __init__(self, parent=None, localizer=None):
         super().__init__(parent)
-        self._tracks = [] # List of dicts
+        self._store = TrackStore() # Columnar rows; track dicts are rebuilt on demand
+        self._row_of = {} # Normalized path -> row, for in-place updates
+        self.search_index = SearchIndex() # Keyed by the store's stable row ids
+        self._pending = [] # Paged listing: paths not loaded yet (see set_paged_paths)
+        self._load_page = None
         self._playing_index = -1
         self.localizer = localizer
         
@@ -27,38 +42,67 @@ class LibraryModel(QAbstractTableModel):
         
     def add_tracks(self, tracks):
         if not tracks: return
-        start = len(self._tracks)
+        start = len(self._store)
         end = start + len(tracks) - 1
         
         self.beginInsertRows(QModelIndex(), start, end)
-        self._tracks.extend(tracks)
+        self._store.append(tracks)
+        for i, track in enumerate(tracks, start):
+            self._row_of[self._key(track.get("path", ""))] = i
+        ids = self._store.ids[start:end + 1].tolist()
+        self.search_index.add_many(zip(ids, map(search_text, tracks)))
         self.endInsertRows()
+
+    def upsert_tracks(self, tracks):
+        """Replaces rows whose path is already listed and appends the rest."""
+        new_tracks = []
+        for track in tracks:
+            row = self._row_of.get(self._key(track.get("path", "")))
+            if row is None:
+                new_tracks.append(track)
+                continue
+            self._store.replace(row, track)
+            self._reindex(row, track)
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.COL_COUNT - 1))
+        self.add_tracks(new_tracks)
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.normpath(path))
+
+    def _rebuild_row_map(self):
+        self._row_of = {self._key(p or ""): i for i, p in enumerate(self._store.paths)}
         
     def rowCount(self, parent=QModelIndex()):
         if parent.isValid(): return 0
-        return len(self._tracks)
+        return len(self._store)
         
     def columnCount(self, parent=QModelIndex()):
         return self.COL_COUNT
         
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
-        if not index.isValid() or not (0 <= index.row() < len(self._tracks)):
+        if not index.isValid():
+            return None
+        return self.cell_data(index.row(), index.column(), role)
+
+    def cell_data(self, row, col, role=Qt.ItemDataRole.DisplayRole):
+        """data() by row/column (lets proxies skip building a source QModelIndex per cell)."""
+        if not (0 <= row < len(self._store)):
             return None
             
-        track = self._tracks[index.row()]
-        col = index.column()
+        store = self._store
         
         if role == Qt.ItemDataRole.DisplayRole:
             if col == self.COL_INDEX:
-                return str(index.row() + 1)
+                return str(row + 1)
             elif col == self.COL_TITLE:
-                return track.get("title", "")
+                return store.title(row)
             elif col == self.COL_CHANNELS:
-                return track.get("channels", "")
+                return store.value("channels", row)
             elif col == self.COL_FORMAT:
-                return track.get("format", "")
+                return store.value("format", row)
             elif col == self.COL_DURATION:
-                d = track.get("duration", 0)
+                d = store.value("duration", row)
                 m = int(d // 60)
                 s = int(d % 60)
                 return f"{m:02d}:{s:02d}"
@@ -68,11 +112,11 @@ class LibraryModel(QAbstractTableModel):
         # Custom roles for Delegate
         elif role == Qt.ItemDataRole.UserRole:
             # Return full track data for logic
-            return track
+            return store.get(row)
             
         elif role == Qt.ItemDataRole.UserRole + 2:
             # Is Favorite?
-            return track.get("is_favorite", False)
+            return store.value("is_favorite", row)
             
         return None
         
@@ -105,34 +149,163 @@ class LibraryModel(QAbstractTableModel):
         if index_row != -1:
             self.dataChanged.emit(self.index(index_row, 0), self.index(index_row, self.COL_COUNT-1))
             
+    def row_of(self, path):
+        """Row of the track with this path, or -1."""
+        return self._row_of.get(self._key(path), -1)
+
+    def _reindex(self, row, track=None):
+        self.search_index.add(int(self._store.ids[row]), search_text(track or self._store.get(row)))
+
+    def search_rows(self, text, start=0, end=None):
+        """
+        Rows in [start, end) matching the query text, as an ascending NumPy array;
+        None when text has neither words nor field terms (no filter). Words must be
+        prefixes of words of the title, file name, artist, album, genre or tags
+        ('-word' excludes the rows it matches); field terms (dur:<2s fmt:wav ...) are evaluated on the store's columns,
+        see utils.track_query.
+        """
+        query = parse_query(text)
+        if query.is_empty():
+            return None
+        end = len(self._store) if end is None else end
+        keep = query.mask(self._store, start, end) # None without field terms
+        hits = query.text_mask(self.search_index, self._store.ids[start:end])
+        if hits is not None:
+            keep = hits if keep is None else keep & hits
+        if keep is None:
+            return None
+        return start + np.flatnonzero(keep)
+
     def get_track_at(self, row):
-        if 0 <= row < len(self._tracks):
-            return self._tracks[row]
+        """Track dict of a row (a copy: change rows through merge_tracks/upsert_tracks)."""
+        if 0 <= row < len(self._store):
+            return self._store.get(row)
         return None
 
+    def get_path_at(self, row):
+        if 0 <= row < len(self._store):
+            return self._store.paths[row]
+        return None
+
+    def set_paged_paths(self, paths, load_page):
+        """
+        Lists paths lazily (e.g. vault-wide search results): rows are loaded
+        PAGE_SIZE at a time through load_page(paths) -> track dicts, the first page
+        now and the next ones as the view scrolls to the end (canFetchMore/fetchMore).
+        """
+        self.clear()
+        self._pending = list(paths)
+        self._load_page = load_page
+        self.fetchMore()
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and bool(self._pending)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        while self._pending:
+            page = self._pending[:self.PAGE_SIZE]
+            del self._pending[:self.PAGE_SIZE]
+            tracks = self._load_page(page) # Paths gone from the index since are skipped
+            if tracks:
+                self.add_tracks(tracks)
+                return
+
     def clear(self):
         self.beginResetModel()
-        self._tracks = []
+        self._pending = []
+        self._load_page = None
+        self._store.clear()
+        self._row_of = {}
+        self.search_index.clear()
         self._playing_index = -1
         self.endResetModel()
 
     def remove_track_by_path(self, path):
-        # Find index
-        norm_path = os.path.normpath(path)
-        for i, track in enumerate(self._tracks):
-            if os.path.normpath(track.get("path", "")) == norm_path:
-                self.beginRemoveRows(QModelIndex(), i, i)
-                self._tracks.pop(i)
-                
-                # Adjust playing index
-                if self._playing_index == i:
-                    self._playing_index = -1
-                elif self._playing_index > i:
-                    self._playing_index -= 1
-                    
-                self.endRemoveRows()
-                return True
-        return False
+        i = self._row_of.get(self._key(path))
+        if i is None:
+            return False
+        
+        self.beginRemoveRows(QModelIndex(), i, i)
+        self.search_index.remove([int(self._store.ids[i])])
+        self._store.delete(i, i + 1)
+        
+        # Adjust playing index
+        if self._playing_index == i:
+            self._playing_index = -1
+        elif self._playing_index > i:
+            self._playing_index -= 1
+            
+        self._rebuild_row_map()
+        self.endRemoveRows()
+        return True
+
+    def remove_tracks_by_path(self, paths):
+        rows = sorted({r for r in (self._row_of.get(self._key(p)) for p in paths) if r is not None}, reverse=True)
+        # Contiguous runs, last first so the rows still to remove keep their numbers
+        i = 0
+        while i < len(rows):
+            start = end = rows[i]
+            while i + 1 < len(rows) and rows[i + 1] == start - 1:
+                i += 1
+                start -= 1
+            self.beginRemoveRows(QModelIndex(), start, end)
+            self.search_index.remove(self._store.ids[start:end + 1].tolist())
+            self._store.delete(start, end + 1)
+            if start <= self._playing_index <= end:
+                self._playing_index = -1
+            elif self._playing_index > end:
+                self._playing_index -= end - start + 1
+            self.endRemoveRows()
+            i += 1
+        if rows:
+            self._rebuild_row_map()
+        return len(rows)
+
+    def merge_tracks(self, updates):
+        """
+        Merges partial track dicts (matched by path) into the listed rows. Updates that
+        only carry waveform data repaint just the COL_WAVEFORM cell.
+        Returns the merged track dicts (the update's own values as given, e.g. full
+        analysis with feature vectors, so they can be saved to the index as is).
+        """
+        merged = []
+        for update in updates:
+            row = self._row_of.get(self._key(update.get("path", "")))
+            if row is None:
+                continue
+            self._store.update(row, update)
+            merged.append({**self._store.get(row), **update})
+            if not self.SEARCH_KEYS.isdisjoint(update):
+                self._reindex(row, merged[-1])
+            if self.WAVEFORM_KEYS.issuperset(update):
+                index = self.index(row, self.COL_WAVEFORM)
+                self.dataChanged.emit(index, index)
+            else:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, self.COL_COUNT - 1))
+        return merged
+
+    def move_tracks(self, moves):
+        """Follows renamed/moved files given as (old_path, new_path) pairs; rows keep their data."""
+        for old_path, new_path in moves:
+            row = self._row_of.pop(self._key(old_path), None)
+            if row is None:
+                continue
+            # Titles that were just the file name (with or without extension) follow the rename
+            title = self._store.title(row)
+            old_name, new_name = os.path.basename(self._store.paths[row]), os.path.basename(new_path)
+            if title == old_name:
+                title = new_name
+            elif title == os.path.splitext(old_name)[0]:
+                title = os.path.splitext(new_name)[0]
+            self._store.update(row, {"path": new_path, "title": title})
+            self._row_of[self._key(new_path)] = row
+            self._reindex(row)
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.COL_COUNT - 1))
 
     def flags(self, index):
         return super().flags(index)
@@ -207,4 +207,5 @@ class MainWindow(QMainWindow):
         # Save Audio Page State
         if hasattr(self, 'audio_page'):
             self.audio_page.save_state()
+        self.player.shutdown()
         super().closeEvent(event)
@@ -7,9 +7,16 @@ from PyQt6.QtCore import Qt, QSize, QDir, QTimer, QUrl, pyqtSignal, QPoint
 from ui.playback_bar import PlaybackBar
 import utils.file_ops as fops
 from ui.library_model import LibraryModel
+from ui.track_filter_proxy import TrackFilterProxy
 from ui.track_delegate import TrackDelegate
-from utils.scanner_thread import ScannerThread
-from utils.library_cache import get_cached_folder_data, save_folder_to_cache
+from utils.scanner_thread import ScannerThread, FolderTreeThread, DEFAULT_WORKERS
+from utils.library_cache import (get_cached_folder_data, get_cached_tree_data, save_track_to_cache, mark_folder_cached,
+                                 remove_tracks_from_cache, update_cached_waveform, get_cached_tracks)
+from utils.library_watcher import LibraryWatcher
+from utils.waveform_refiner import WaveformRefiner
+from utils.similarity_index import get_similarity_index
+from utils.library_catalog import get_library_catalog
+from utils.audio_loader import APPROX_MIN_DURATION
 import os
 
 class AudioPage(QWidget):
@@ -27,12 +34,24 @@ class AudioPage(QWidget):
         
         self.init_ui()
         
+        # Live updates of the listed folders (single-track, no rescans)
+        self.library_watcher = LibraryWatcher(self, workers=self.scan_workers())
+        self.library_watcher.tracks_changed.connect(self.on_watch_tracks_changed)
+        self.library_watcher.tracks_removed.connect(self.library_model.remove_tracks_by_path)
+        self.library_watcher.tracks_moved.connect(self.library_model.move_tracks)
+        
+        # Exact waveforms for long files listed with a seek-sampled one
+        self.waveform_refiner = WaveformRefiner(self)
+        self.waveform_refiner.waveform_refined.connect(self.on_waveform_refined)
+        
         # Load Vault
         self.load_vault()
         
         # Shortcuts
         self.space_shortcut = QShortcut(QKeySequence(Qt.Key.Key_Space), self)
         self.space_shortcut.activated.connect(self.player.toggle_play)
+        self.find_shortcut = QShortcut(QKeySequence(QKeySequence.StandardKey.Find), self)
+        self.find_shortcut.activated.connect(self.focus_local_search)
 
     def init_ui(self):
         # Vertical Layout: [Splitter (Content)] / [PlaybackBar]
@@ -138,6 +157,33 @@ class AudioPage(QWidget):
         
         from constants import LibraryColumns
         
+        # Local Search (filters the listed tracks as you type)
+        self.local_search_area = QWidget()
+        self.local_search_area.setStyleSheet("background-color: #1f1f1f; border-bottom: 1px solid #333;")
+        local_search_layout = QHBoxLayout(self.local_search_area)
+        
+        self.local_search_input = QLineEdit()
+        self.local_search_input.setPlaceholderText(self.localizer.get("placeholder_filter_tracks"))
+        self.local_search_input.setClearButtonEnabled(True)
+        self.local_search_input.setToolTip(self.localizer.get("tip_filter_syntax"))
+        self.local_search_input.setStyleSheet("background-color: #333; color: white; border: 1px solid #444; padding: 5px; border-radius: 3px;")
+        self.local_search_input.textChanged.connect(self.filter_local_tracks)
+        
+        # Global mode: the same query over every indexed folder, results paged into the list
+        self.btn_search_all = QPushButton(self.localizer.get("btn_search_all"))
+        self.btn_search_all.setCheckable(True)
+        self.btn_search_all.setStyleSheet("QPushButton { background-color: #333; color: #aaa; border: 1px solid #444; padding: 5px 12px; border-radius: 3px; } QPushButton:checked { background-color: #D75239; color: white; border: 1px solid #D75239; }")
+        self.btn_search_all.toggled.connect(self.set_global_search)
+        
+        self.global_search_timer = QTimer(self)
+        self.global_search_timer.setSingleShot(True)
+        self.global_search_timer.setInterval(80) # Coalesces fast typing: each search loads a page from the index
+        self.global_search_timer.timeout.connect(self.run_global_search)
+        
+        local_search_layout.addWidget(self.local_search_input)
+        local_search_layout.addWidget(self.btn_search_all)
+        local_layout.addWidget(self.local_search_area)
+        
         # Local Header
         self.local_header = QWidget()
         self.local_header.setFixedHeight(30)
@@ -187,8 +233,12 @@ class AudioPage(QWidget):
         self.library_model = LibraryModel(self, self.localizer)
         self.track_delegate = TrackDelegate(self)
         
+        # The view shows the model through the search filter: view rows != model rows
+        self.track_filter = TrackFilterProxy(self)
+        self.track_filter.setSourceModel(self.library_model)
+        
         self.track_view = QTableView()
-        self.track_view.setModel(self.library_model)
+        self.track_view.setModel(self.track_filter)
         self.track_view.setItemDelegate(self.track_delegate)
         
         self.track_view.setShowGrid(False)
@@ -215,6 +265,17 @@ class AudioPage(QWidget):
         self.track_view.clicked.connect(self.on_track_clicked)
         self.track_view.doubleClicked.connect(self.on_track_double_clicked)
         
+        # Waveform thumbnails of the rows around the viewport are rendered ahead of scrolling
+        self.thumb_prefetch_timer = QTimer(self)
+        self.thumb_prefetch_timer.setSingleShot(True)
+        self.thumb_prefetch_timer.setInterval(30)
+        self.thumb_prefetch_timer.timeout.connect(self.prefetch_waveform_thumbnails)
+        self.track_view.verticalScrollBar().valueChanged.connect(self.thumb_prefetch_timer.start)
+        header.sectionResized.connect(self.thumb_prefetch_timer.start)
+        self.track_filter.rowsInserted.connect(self.thumb_prefetch_timer.start)
+        self.track_filter.modelReset.connect(self.thumb_prefetch_timer.start)
+        self.track_delegate.prefetcher.thumbnails_ready.connect(self.track_view.viewport().update)
+        
         local_layout.addWidget(self.track_view)
         
         self.right_stack.addWidget(local_widget)
@@ -331,16 +392,37 @@ class AudioPage(QWidget):
         root_item.setText(0, folder_name)
         root_item.setData(0, Qt.ItemDataRole.UserRole, folder_path)
         root_item.setExpanded(True)
-        try:
-            entries = sorted(os.listdir(folder_path))
-            for entry in entries:
-                full_path = os.path.join(folder_path, entry)
-                if os.path.isdir(full_path):
-                    cat_item = QTreeWidgetItem(root_item)
-                    cat_item.setText(0, entry)
-                    cat_item.setData(0, Qt.ItemDataRole.UserRole, full_path)
-        except Exception as e:
-            print(f"Error reading folder: {e}")
+        
+        # Subfolders (any depth) are listed off the UI thread and streamed in
+        if not hasattr(self, 'folder_items'):
+            self.folder_items = {}
+            self.tree_threads = []
+        self.folder_items[os.path.normcase(os.path.normpath(folder_path))] = root_item
+        
+        tree_thread = FolderTreeThread(folder_path)
+        tree_thread.folders_found.connect(self.on_folders_found)
+        tree_thread.finished.connect(lambda item=root_item: self.sort_folder_tree(item))
+        tree_thread.finished.connect(lambda t=tree_thread: self.tree_threads.remove(t))
+        self.tree_threads.append(tree_thread)
+        tree_thread.start()
+
+    def sort_folder_tree(self, root_item):
+        # The walker emits folders in no fixed order, and sortChildren() sorts one level only
+        items = [root_item]
+        while items:
+            item = items.pop()
+            item.sortChildren(0, Qt.SortOrder.AscendingOrder)
+            items.extend(item.child(i) for i in range(item.childCount()))
+
+    def on_folders_found(self, paths):
+        for full_path in paths:
+            parent_item = self.folder_items.get(os.path.normcase(os.path.dirname(full_path)))
+            if parent_item is None:
+                continue
+            cat_item = QTreeWidgetItem(parent_item)
+            cat_item.setText(0, os.path.basename(full_path))
+            cat_item.setData(0, Qt.ItemDataRole.UserRole, full_path)
+            self.folder_items[os.path.normcase(full_path)] = cat_item
 
     def on_category_selected(self, item, column):
         path = item.data(0, Qt.ItemDataRole.UserRole)
@@ -350,11 +432,16 @@ class AudioPage(QWidget):
             self.scan_and_display_files(path)
 
     def load_favorites_list(self):
+        self.leave_global_search()
         try:
             if hasattr(self, 'scanner_thread') and self.scanner_thread.isRunning():
                 self.scanner_thread.stop()
                 
             self.library_model.clear()
+            self.library_watcher.watch([])
+            # The list no longer shows a folder: re-selecting it must not delta-scan against favorites
+            self.current_scan_path = None
+            self.current_scan_recursive = False
             paths = self.fav_manager.get_all()
             if not paths: 
                 return
@@ -363,67 +450,146 @@ class AudioPage(QWidget):
             if not valid_paths:
                 return
 
-            self.scanner_thread = ScannerThread(file_paths=valid_paths)
+            self.scanner_thread = ScannerThread(file_paths=valid_paths, workers=self.scan_workers(),
+                                                approx_over=self.approx_waveform_over(), progressive=True)
             self.scanner_thread.batch_found.connect(self.on_scan_batch)
+            self.scanner_thread.details_found.connect(self.on_scan_details)
             self.scanner_thread.finished_scan.connect(self.on_scan_finished)
             self.scanner_thread.start()
         except Exception as e:
             print(f"Error loading favorites: {e}")
 
-    def scan_and_display_files(self, folder_path):
+    def scan_workers(self):
+        # Analysis processes for ScannerThread (settings key "scan_workers", 0 = in-thread)
+        try:
+            return int(self.settings.value("scan_workers", DEFAULT_WORKERS))
+        except (TypeError, ValueError):
+            return DEFAULT_WORKERS
+
+    def approx_waveform_over(self):
+        # Duration (seconds) above which scans draw a seek-sampled waveform first (0 = never)
+        try:
+            return float(self.settings.value("approx_waveform_min_duration", APPROX_MIN_DURATION))
+        except (TypeError, ValueError):
+            return APPROX_MIN_DURATION
+
+    def refine_waveforms(self, tracks):
+        approx = [t["path"] for t in tracks if t.get("waveform_approx")]
+        if approx:
+            self.waveform_refiner.enqueue(approx)
+
+    def on_waveform_refined(self, path, waveform, analysis):
+        update_cached_waveform(path, waveform, analysis)
+        self.library_model.merge_tracks([{"path": path, "waveform": waveform,
+                                          "waveform_approx": False, "analysis": analysis}])
+
+    def scan_and_display_files(self, folder_path, recursive=False):
+        self.leave_global_search()
         if hasattr(self, 'scanner_thread') and self.scanner_thread.isRunning():
             self.scanner_thread.stop()
-            
-        self.library_model.clear()
-        
-        cached_tracks = get_cached_folder_data(folder_path)
-        if cached_tracks:
-            print(f"Loading {folder_path} from cache...")
-            import numpy as np
-            for t in cached_tracks:
-                t["waveform"] = np.array(t["waveform"], dtype=np.float32)
-                t["is_favorite"] = self.fav_manager.is_favorite(t["path"])
-            self.library_model.add_tracks(cached_tracks)
-            return
-
-        print(self.localizer.get("status_loading").format(folder_path))
+        
+        same_folder = (getattr(self, 'current_scan_path', None) is not None and
+                       os.path.normpath(self.current_scan_path) == os.path.normpath(folder_path) and
+                       self.current_scan_recursive == recursive)
         self.current_scan_path = folder_path
-        self.current_scan_results = []
+        self.current_scan_recursive = recursive
         
-        self.scanner_thread = ScannerThread(folder_path)
+        if same_folder and self.library_model.rowCount() > 0:
+            # Re-selecting the listed folder: patch the model in place (rows still pending get re-analyzed)
+            known_tracks = [self.library_model.get_track_at(i) for i in range(self.library_model.rowCount())]
+            known_tracks = [t for t in known_tracks if not t.get("analysis_pending")]
+        else:
+            self.library_model.clear()
+            if recursive:
+                known_tracks = get_cached_tree_data(folder_path)
+            else:
+                known_tracks = get_cached_folder_data(folder_path)
+            if known_tracks:
+                print(f"Loading {folder_path} from cache...")
+                for t in known_tracks:
+                    t["is_favorite"] = self.fav_manager.is_favorite(t["path"])
+                self.library_model.add_tracks(known_tracks)
+                self.refine_waveforms(known_tracks) # Refinements interrupted last session
+            else:
+                print(self.localizer.get("status_loading").format(folder_path))
+        
+        # Delta mode when we already know the folder: only new/changed files get re-analyzed
+        self.scanner_thread = ScannerThread(folder_path, known_tracks=known_tracks or None,
+                                            workers=self.scan_workers(), recursive=recursive,
+                                            approx_over=self.approx_waveform_over(), progressive=True)
         self.scanner_thread.batch_found.connect(self.on_scan_batch_with_cache)
+        self.scanner_thread.details_found.connect(self.on_scan_details_with_cache)
+        self.scanner_thread.tracks_removed.connect(self.on_scan_tracks_removed)
         self.scanner_thread.finished_scan.connect(self.on_scan_finished_with_cache)
         self.scanner_thread.start()
 
+    def _is_stale_scan(self):
+        # Queued signals of a scanner that was stopped for another folder (or for a global search)
+        return self.sender() is not getattr(self, 'scanner_thread', None) or self.btn_search_all.isChecked()
+
     def on_scan_batch_with_cache(self, tracks):
+        if self._is_stale_scan(): return
         for track in tracks:
             track["is_favorite"] = self.fav_manager.is_favorite(track["path"])
-            self.current_scan_results.append(track)
-        self.library_model.add_tracks(tracks)
+            if not track.get("analysis_pending"):
+                save_track_to_cache(track)
+        # Rows show up right away; waveforms follow through on_scan_details_with_cache
+        self.library_model.upsert_tracks(tracks)
+
+    def on_scan_details_with_cache(self, updates):
+        if self._is_stale_scan(): return
+        merged = self.library_model.merge_tracks(updates)
+        for track in merged:
+            # One small transaction per track: an interrupted scan keeps its progress
+            save_track_to_cache(track)
+        self.refine_waveforms(merged)
+
+    def on_scan_tracks_removed(self, paths):
+        if self._is_stale_scan(): return
+        remove_tracks_from_cache(paths)
+        self.library_model.remove_tracks_by_path(paths)
 
     def on_scan_finished_with_cache(self, count):
-        if hasattr(self, 'current_scan_path') and self.current_scan_results:
-            save_folder_to_cache(self.current_scan_path, self.current_scan_results)
+        if self._is_stale_scan(): return
+        if getattr(self, 'current_scan_path', None) is not None and not self.scanner_thread.was_cancelled():
+            mark_folder_cached(self.current_scan_path, recursive=self.current_scan_recursive)
+            self.watch_listed_folders()
         self.on_scan_finished(count)
+
+    def watch_listed_folders(self):
+        tracks = [self.library_model.get_track_at(i) for i in range(self.library_model.rowCount())]
+        folders = {os.path.normpath(self.current_scan_path)}
+        if self.current_scan_recursive:
+            folders.update(os.path.dirname(t["path"]) for t in tracks)
+        self.library_watcher.watch(sorted(folders), tracks)
+
+    def on_watch_tracks_changed(self, tracks):
+        for track in tracks:
+            track["is_favorite"] = self.fav_manager.is_favorite(track["path"])
+        self.library_model.upsert_tracks(tracks)
         
     def on_scan_batch(self, tracks):
         for track in tracks:
             track["is_favorite"] = self.fav_manager.is_favorite(track["path"])
         self.library_model.add_tracks(tracks)
+
+    def on_scan_details(self, updates):
+        if self._is_stale_scan(): return
+        self.refine_waveforms(self.library_model.merge_tracks(updates))
         
     def on_scan_finished(self, count):
+        self.library_model.search_index.pack() # The first filter keystroke then finds the index ready
         print(self.localizer.get("status_loaded").format(count))
         
     def on_track_clicked(self, index):
         try:
-            track = self.library_model.get_track_at(index.row())
+            track = self.track_filter.get_track_at(index.row())
             if not track: return
 
             if index.column() == self.library_model.COL_FAV:
                 path = track.get("path")
                 is_fav = self.fav_manager.toggle(path)
-                track["is_favorite"] = is_fav
-                self.library_model.dataChanged.emit(index, index)
+                self.library_model.merge_tracks([{"path": path, "is_favorite": is_fav}])
                 return
 
             play_cols = (self.library_model.COL_PLAY, self.library_model.COL_TITLE, 
@@ -441,14 +607,14 @@ class AudioPage(QWidget):
                 if width > 0:
                     perc = rel_x / width
                     self.on_seek_requested(perc)
-                    track = self.library_model.get_track_at(index.row())
+                    track = self.track_filter.get_track_at(index.row())
                     if track:
                         self.play_track(track["path"], track["title"], track["waveform"], track["duration"])
         except Exception as e:
             print(f"Error in on_track_clicked: {e}")
 
     def on_track_double_clicked(self, index):
-        track = self.library_model.get_track_at(index.row())
+        track = self.track_filter.get_track_at(index.row())
         if track:
             self.play_track(track["path"], track["title"], track["waveform"], track["duration"])
 
@@ -458,12 +624,101 @@ class AudioPage(QWidget):
             print(f"Playing: {path}")
             self.player.load(path)
             self.player.play()
+            self.preload_neighbours(path)
             self.playback_bar.set_track_info(title, data, path, duration)
             self.playback_bar.set_playing_state(True)
         except Exception as e:
             print(f"CRITICAL ERROR playing track: {e}")
             QMessageBox.critical(self, self.localizer.get("msg_playback_error"), f"{e}")
 
+    def prefetch_waveform_thumbnails(self):
+        # One page above and below the visible rows
+        view = self.track_view
+        rows = self.track_filter.rowCount()
+        first = view.rowAt(0)
+        if first < 0:
+            return
+        last = view.rowAt(view.viewport().height() - 1)
+        if last < 0:
+            last = rows - 1
+        page = last - first + 1
+        tracks = [self.track_filter.get_track_at(r)
+                  for r in range(max(0, first - page), min(rows, last + 1 + page))]
+        self.track_delegate.prefetch_waveforms(tracks, view.columnWidth(self.library_model.COL_WAVEFORM),
+                                               view.rowHeight(first), view.devicePixelRatioF())
+
+    def preload_neighbours(self, path):
+        # Next and previous rows as listed (i.e. filtered) are the likely next auditions: decode them ahead
+        row = self.track_filter.row_of(path)
+        if row < 0:
+            return
+        neighbours = (self.track_filter.get_track_at(r) for r in (row + 1, row - 1))
+        self.player.preload([t["path"] for t in neighbours if t and t.get("type", "audio") == "audio"])
+
+    def filter_local_tracks(self, text):
+        if self.btn_search_all.isChecked():
+            self.global_search_timer.start()
+            return
+        # Runs on every keystroke: an index lookup plus one proxy reset (no per-row work)
+        self.track_filter.set_query(text)
+
+    def set_global_search(self, enabled):
+        if enabled:
+            if hasattr(self, 'scanner_thread') and self.scanner_thread.isRunning():
+                self.scanner_thread.stop()
+            self.library_watcher.watch([])
+            self.current_scan_path = None # The list no longer shows a folder
+            self.track_filter.set_query("") # Results already match the query
+            get_library_catalog().warm_up()
+            self.run_global_search()
+        else:
+            self.global_search_timer.stop()
+            self.library_model.clear()
+            self.track_filter.set_query(self.local_search_input.text())
+            item = self.library_tree.currentItem()
+            if item is not None:
+                self.on_category_selected(item, 0)
+
+    def leave_global_search(self):
+        # Another listing (folder, favorites...) replaces the results
+        if self.btn_search_all.isChecked():
+            self.btn_search_all.blockSignals(True)
+            self.btn_search_all.setChecked(False)
+            self.btn_search_all.blockSignals(False)
+            self.global_search_timer.stop()
+            self.track_filter.set_query(self.local_search_input.text())
+
+    def run_global_search(self):
+        """Searches every indexed folder; only the first page of results is loaded, the rest on scroll."""
+        try:
+            catalog = get_library_catalog()
+            text, favorites = self.local_search_input.text(), self.fav_manager.get_all()
+            paths = catalog.search(text, favorites)
+            if paths is None:
+                self.library_model.clear()
+                return
+            status = "status_loaded"
+            if not paths:
+                # Nothing matches as typed: the closest names instead (typos, other word splits)
+                closest = catalog.search_fuzzy(text, favorites)
+                if closest:
+                    paths, status = closest, "status_closest_matches"
+            self.library_model.set_paged_paths(paths, self.load_result_page)
+            print(self.localizer.get(status).format(len(paths)))
+        except Exception as e:
+            print(f"Global Search Error: {e}")
+
+    def load_result_page(self, paths):
+        tracks = get_cached_tracks(paths)
+        for t in tracks:
+            t["is_favorite"] = self.fav_manager.is_favorite(t["path"])
+        return tracks
+
+    def focus_local_search(self):
+        self.sidebar_tabs.setCurrentIndex(self.tab_idx_library)
+        self.local_search_input.setFocus()
+        self.local_search_input.selectAll()
+
     def on_player_position_changed(self, pos_ms):
         duration = self.player.get_duration()
         self.playback_bar.update_progress(pos_ms, duration)
@@ -491,6 +746,9 @@ class AudioPage(QWidget):
     def save_state(self):
         sizes = self.main_splitter.sizes()
         self.settings.setValue("splitter_sizes", [str(s) for s in sizes])
+        self.library_watcher.stop()
+        self.waveform_refiner.stop()
+        self.track_delegate.prefetcher.stop()
 
     # --- ACTION HANDLERS ---
     def open_sidebar_menu(self, position):
@@ -501,6 +759,10 @@ class AudioPage(QWidget):
         action_new.triggered.connect(lambda: self.action_create_folder(item))
         
         if item:
+            path = item.data(0, Qt.ItemDataRole.UserRole)
+            if path and path != "favorites_internal":
+                action_scan = menu.addAction(self.localizer.get("ctx_scan_recursive"))
+                action_scan.triggered.connect(lambda: self.scan_and_display_files(path, recursive=True))
             menu.addSeparator()
             action_rename = menu.addAction(self.localizer.get("ctx_rename"))
             action_rename.triggered.connect(lambda: self.action_rename_folder(item))
@@ -533,6 +795,8 @@ class AudioPage(QWidget):
                 new_item = QTreeWidgetItem(target_item)
                 new_item.setText(0, name)
                 new_item.setData(0, Qt.ItemDataRole.UserRole, new_path)
+                if hasattr(self, 'folder_items'):
+                    self.folder_items[os.path.normcase(os.path.normpath(new_path))] = new_item
                 target_item.setExpanded(True)
             except Exception as e:
                 QMessageBox.critical(self, self.localizer.get("msg_error"), str(e))
@@ -570,7 +834,7 @@ class AudioPage(QWidget):
         index = self.track_view.indexAt(position)
         if not index.isValid(): return
         
-        track = self.library_model.get_track_at(index.row())
+        track = self.track_filter.get_track_at(index.row())
         if not track: return
 
         menu = QMenu()
@@ -578,18 +842,50 @@ class AudioPage(QWidget):
         action_rename.triggered.connect(lambda: self.action_rename_file(index, track))
         action_delete = menu.addAction(self.localizer.get("ctx_delete_file"))
         action_delete.triggered.connect(lambda: self.action_delete_file(index, track))
+        menu.addSeparator()
+        action_similar = menu.addAction(self.localizer.get("ctx_find_similar"))
+        action_similar.triggered.connect(lambda: self.show_similar(track))
         
         menu.exec(self.track_view.viewport().mapToGlobal(position))
 
+    def show_similar(self, track, k=100):
+        """Lists the k indexed sounds closest to track (best match first, the track itself on top)."""
+        self.leave_global_search()
+        try:
+            matches = get_similarity_index().query(track["path"], k)
+            if not matches:
+                QMessageBox.information(self, self.localizer.get("ctx_find_similar"),
+                                        self.localizer.get("msg_no_results"))
+                return
+
+            if hasattr(self, 'scanner_thread') and self.scanner_thread.isRunning():
+                self.scanner_thread.stop()
+            self.library_model.clear()
+            self.library_watcher.watch([])
+            # Matches come from the whole vault: re-selecting the old folder must rescan it from scratch
+            self.current_scan_path = None
+            self.current_scan_recursive = False
+
+            tracks = get_cached_tracks([track["path"]] + [p for p, _ in matches if os.path.exists(p)])
+            for t in tracks:
+                t["is_favorite"] = self.fav_manager.is_favorite(t["path"])
+            self.library_model.add_tracks(tracks)
+        except Exception as e:
+            print(f"Similarity Search Error: {e}")
+
+    def action_rename_file(self, index, track):
         path = track["path"]
-        old_name = track["title"]
+        old_name, ext = os.path.splitext(os.path.basename(path))
         title = self.localizer.get("msg_rename")
         label = self.localizer.get("msg_new_name")
         text, ok = QInputDialog.getText(self, title, label, text=old_name)
         if ok and text and text != old_name:
+            if not text.lower().endswith(ext.lower()):
+                text += ext
             try:
+                # file_ops keeps the index in sync; the row is re-keyed, not re-analyzed
                 new_path = fops.rename_item(path, text)
-                self.library_model.update_track_info(index.row(), {"path": new_path, "title": text})
+                self.library_model.move_tracks([(path, new_path)])
             except Exception as e:
                  QMessageBox.critical(self, self.localizer.get("msg_error"), str(e))
 
@@ -602,7 +898,7 @@ class AudioPage(QWidget):
         if reply == QMessageBox.StandardButton.Yes:
             try:
                 fops.delete_item(path)
-                self.library_model.removeRow(index.row())
+                self.library_model.remove_track_by_path(path)
             except Exception as e:
                 QMessageBox.critical(self, "Error", str(e))
 
@@ -723,6 +1019,9 @@ class AudioPage(QWidget):
         # 5. Search Area
         self.search_input.setPlaceholderText(self.localizer.get("placeholder_search_audio") if self.localizer.get("placeholder_search_audio") != "placeholder_search_audio" else "Search Freesound...")
         self.btn_search.setText(self.localizer.get("btn_search") if self.localizer.get("btn_search") != "btn_search" else "SEARCH")
+        self.local_search_input.setPlaceholderText(self.localizer.get("placeholder_filter_tracks"))
+        self.local_search_input.setToolTip(self.localizer.get("tip_filter_syntax"))
+        self.btn_search_all.setText(self.localizer.get("btn_search_all"))
 
     def apply_theme(self, t):
         # 1. Main Styles
@@ -769,12 +1068,15 @@ class AudioPage(QWidget):
         if hasattr(self, 'local_header'): self.local_header.setStyleSheet(header_style)
         if hasattr(self, 'online_header'): self.online_header.setStyleSheet(header_style)
         if hasattr(self, 'search_area'): self.search_area.setStyleSheet(header_style)
+        if hasattr(self, 'local_search_area'): self.local_search_area.setStyleSheet(header_style)
         
         for lbl in self.local_header_labels + self.online_header_labels:
             lbl.setStyleSheet(f"color: {t.get('text_secondary')}; font-size: 11px; font-weight: bold; text-transform: uppercase;")
 
         # 6. Inputs & Buttons
         self.search_input.setStyleSheet(f"background-color: {t.get('bg_button')}; color: {t.get('text_main')}; border: 1px solid {t.get('border')}; padding: 5px; border-radius: 3px;")
+        self.local_search_input.setStyleSheet(self.search_input.styleSheet())
+        self.btn_search_all.setStyleSheet(f"QPushButton {{ background-color: {t.get('bg_button')}; color: {t.get('text_secondary')}; border: 1px solid {t.get('border')}; padding: 5px 12px; border-radius: 3px; }} QPushButton:checked {{ background-color: {t.get('accent')}; color: white; border: 1px solid {t.get('accent')}; }}")
         
         # 7. Delegate & Playback Bar
         self.track_delegate.apply_theme(t)
@@ -801,11 +1103,8 @@ class AudioPage(QWidget):
             success = client.download_preview(url, target_path)
             
             if success:
-                from utils.library_cache import invalidate_cache
-                invalidate_cache(target_dir)
-                if hasattr(self, 'current_scan_path'):
-                    if os.path.normpath(self.current_scan_path) == os.path.normpath(target_dir):
-                        self.scan_and_display_files(target_dir)
+                # Only the new file is analyzed (if its folder is listed); others pick it up on their next delta scan
+                self.library_watcher.notify_changed(target_dir)
                 QMessageBox.information(self, "Downloaded", f"Guardado con éxito en:\n{target_path}")
             else:
                 QMessageBox.warning(self, "Error", "Download failed.")
@@ -151,6 +151,7 @@ class PlaybackBar(QWidget):
         
         # --- WAVEFORM (Bottom) ---
         self.waveform = WaveformWidget()
+        self.waveform.deep_zoom = True
         self.waveform.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.waveform.setMinimumHeight(40) 
         self.waveform.bg_color = QColor(Qt.GlobalColor.transparent) 
@@ -1,8 +1,8 @@
 from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
 from PyQt6 import QtCore, QtGui
 import math
-import numpy as np
 from ui.library_model import LibraryModel
+from ui.waveform_thumbnails import get_thumbnail_cache, thumbnail_key, render_thumbnail, ThumbnailPrefetcher
 from constants import LibraryColumns
 
 class TrackDelegate(QStyledItemDelegate):
@@ -16,6 +16,9 @@ class TrackDelegate(QStyledItemDelegate):
         self.bg_selected = QtGui.QColor("#2a2a2a")
         self.bg_hover = QtGui.QColor("#1a1a1a")
         
+        self.thumbnails = get_thumbnail_cache()
+        self.prefetcher = ThumbnailPrefetcher(self)
+        
     def apply_theme(self, t):
         self.text_color = QtGui.QColor(t.get("text_main"))
         self.text_dim = QtGui.QColor(t.get("text_secondary"))
@@ -33,8 +36,7 @@ class TrackDelegate(QStyledItemDelegate):
         elif option.state & QStyle.StateFlag.State_MouseOver:
             painter.fillRect(option.rect, self.bg_hover)
             
-        # Data
-        track = index.data(QtCore.Qt.ItemDataRole.UserRole)
+        # Data (the full track dict is only built for the waveform cell)
         col = index.column()
         rect = option.rect
         
@@ -103,6 +105,7 @@ class TrackDelegate(QStyledItemDelegate):
             
         # 3. Waveform
         elif col == LibraryModel.COL_WAVEFORM:
+            track = index.data(QtCore.Qt.ItemDataRole.UserRole)
             if track:
                 self._draw_waveform_cached(painter, rect, track, color)
         
@@ -126,71 +129,32 @@ class TrackDelegate(QStyledItemDelegate):
             
         painter.restore()
         
-    def _draw_waveform(self, painter, rect, data, color):
-        if data is None or len(data) == 0: return
-        
-        # Check Cache in track data
-        # We need the track dict to store the cache
-        # We'll use a hidden key in the track dict
-        # We must verify width/height match to reuse
-        width = rect.width()
-        height = rect.height()
-        
-        # Since 'data' is passed from 'track.get("waveform")', 
-        # let's assume the caller can help us find the track dict
-        # Actually, let's just use a simple cache on the 'data' object itself or nearby
-        # Better: the track dict is available in paint()
-        
-        # NOTE: This method is called with 'data', not 'track'. 
-        # To optimize, I'll modify the caller in paint()
-        pass
-
-    def _get_cached_waveform_path(self, track_dict, width, height, color_hex):
-        cache = track_dict.get("_wave_path_cache")
-        if cache and cache["w"] == width and cache["h"] == height and cache["color"] == color_hex:
-            return cache["path"]
-        return None
+    def _draw_waveform_placeholder(self, painter, rect):
+        # Listed row whose waveform is still being computed: dim center line
+        painter.save()
+        pen = QtGui.QPen(self.text_dim, 1, QtCore.Qt.PenStyle.DotLine)
+        painter.setPen(pen)
+        y = rect.center().y()
+        painter.drawLine(rect.left() + 2, y, rect.right() - 2, y)
+        painter.restore()
 
     def _draw_waveform_cached(self, painter, rect, track_dict, color):
+        if track_dict.get("analysis_pending"):
+            self._draw_waveform_placeholder(painter, rect)
+            return
         data = track_dict.get("waveform")
         if data is None or len(data) == 0: return
         
-        width = rect.width()
-        height = rect.height()
-        color_hex = color.name()
-        
-        path = self._get_cached_waveform_path(track_dict, width, height, color_hex)
-        
-        if path is None:
-            path = QtGui.QPainterPath()
-            # Path is relative: x=0 to width, y=0 is the center line
-            mid_y_local = 0 
-            max_h = height * 0.8
-            
-            # Spotify style: Discrete Bars
-            bar_w = 1.5 
-            gap = 1.0
-            step_px = bar_w + gap
-            
-            for x_rel in np.arange(0, float(width), float(step_px)):
-                data_ratio = x_rel / width
-                idx = int(data_ratio * len(data))
-                if idx >= len(data): break
-                
-                val = abs(data[idx])
-                h = max(2, val * max_h)
-                
-                # Add bar relative to (0,0) center
-                path.addRoundedRect(float(x_rel), float(-h/2), float(bar_w), float(h), 0.7, 0.7)
-            
-            track_dict["_wave_path_cache"] = {
-                "w": width, "h": height, "color": color_hex, "path": path
-            }
-            
-        painter.save()
-        # Translate to the center-left of the target rect
-        painter.translate(rect.x(), rect.center().y())
-        painter.setPen(QtCore.Qt.PenStyle.NoPen)
-        painter.fillPath(path, QtGui.QBrush(color))
-        painter.restore()
+        # Pre-rasterized thumbnail from the shared cache (rendered here on a miss;
+        # rows near the viewport are usually prefetched by ThumbnailPrefetcher)
+        dpr = painter.device().devicePixelRatioF()
+        key = thumbnail_key(track_dict, rect.width(), rect.height(), color, dpr)
+        image = self.thumbnails.get(key)
+        if image is None:
+            image = render_thumbnail(data, rect.width(), rect.height(), color, dpr)
+            self.thumbnails.put(key, image)
+        painter.drawImage(rect.topLeft(), image)
 
+    def prefetch_waveforms(self, tracks, width, height, dpr=1.0):
+        """Renders upcoming rows' thumbnails in the background (unselected color)."""
+        self.prefetcher.prefetch(tracks, width, height, self.text_color, dpr)
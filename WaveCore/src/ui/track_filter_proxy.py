@@ -0,0 +1,165 @@
+from PyQt6.QtCore import QAbstractProxyModel, QModelIndex, Qt
+import numpy as np
+
+class TrackFilterProxy(QAbstractProxyModel):
+    """
+    Filtered view of a LibraryModel for the local search box.
+
+    Without a query it passes rows through unchanged. With one, its rows are an
+    ascending array of source rows computed by LibraryModel.search_rows(), so a
+    keystroke costs one index lookup and a model reset, instead of one
+    filterAcceptsRow() call per row as with QSortFilterProxyModel. Rows the
+    scanner appends while a query is set are matched as they arrive. Rows whose
+    text changes stay listed until the query changes.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._query = ""
+        self._rows = None # None = no filter; else source rows (ascending int64 array)
+        self._removing = None
+
+    def setSourceModel(self, model):
+        self.beginResetModel()
+        super().setSourceModel(model)
+        model.dataChanged.connect(self._on_data_changed)
+        model.headerDataChanged.connect(self.headerDataChanged)
+        model.rowsAboutToBeInserted.connect(self._on_rows_about_to_be_inserted)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        model.rowsRemoved.connect(self._on_rows_removed)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self._on_model_reset)
+        self._rows = model.search_rows(self._query)
+        self.endResetModel()
+
+    # --- Filter ---
+    def query(self):
+        return self._query
+
+    def is_filtered(self):
+        return self._rows is not None
+
+    def set_query(self, text):
+        """Shows only the rows matching text (see LibraryModel.search_rows); '' shows all."""
+        self._query = text
+        rows = self.sourceModel().search_rows(text)
+        if rows is None and self._rows is None:
+            return
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    # --- Mapping ---
+    def source_row(self, row):
+        return row if self._rows is None else int(self._rows[row])
+
+    def proxy_row(self, source_row):
+        """Row showing source_row, or -1 if it is filtered out."""
+        if self._rows is None or source_row < 0:
+            return source_row
+        i = int(np.searchsorted(self._rows, source_row))
+        return i if i < len(self._rows) and self._rows[i] == source_row else -1
+
+    def _proxy_range(self, first, last):
+        """[lo, hi) of the proxy rows showing source rows first..last."""
+        return (int(np.searchsorted(self._rows, first)),
+                int(np.searchsorted(self._rows, last, side="right")))
+
+    def mapToSource(self, index):
+        if not index.isValid() or self.sourceModel() is None:
+            return QModelIndex()
+        return self.sourceModel().index(self.source_row(index.row()), index.column())
+
+    def mapFromSource(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        row = self.proxy_row(index.row())
+        return self.index(row, index.column()) if row >= 0 else QModelIndex()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        # Runs for every visible cell and role: straight to the source row
+        if not index.isValid():
+            return None
+        return self.sourceModel().cell_data(self.source_row(index.row()), index.column(), role)
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < self.rowCount()) or not (0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    # --- LibraryModel conveniences, in view rows ---
+    def get_track_at(self, row):
+        if 0 <= row < self.rowCount():
+            return self.sourceModel().get_track_at(self.source_row(row))
+        return None
+
+    def row_of(self, path):
+        """View row of the track with this path, or -1 (not listed or filtered out)."""
+        return self.proxy_row(self.sourceModel().row_of(path))
+
+    # --- Source changes ---
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        first, last = top_left.row(), bottom_right.row()
+        if self._rows is not None:
+            lo, hi = self._proxy_range(first, last)
+            if lo >= hi:
+                return
+            first, last = lo, hi - 1
+        self.dataChanged.emit(self.index(first, top_left.column()), self.index(last, bottom_right.column()), roles)
+
+    def _on_rows_about_to_be_inserted(self, parent, first, last):
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _on_rows_inserted(self, parent, first, last):
+        if self._rows is None:
+            self.endInsertRows()
+            return
+        count = last - first + 1
+        pos = int(np.searchsorted(self._rows, first))
+        self._rows[pos:] += count # Rows after the insertion point moved down
+        new_rows = self.sourceModel().search_rows(self._query, first, last + 1)
+        if new_rows is None or len(new_rows) == 0:
+            return
+        self.beginInsertRows(QModelIndex(), pos, pos + len(new_rows) - 1)
+        self._rows = np.concatenate((self._rows[:pos], new_rows, self._rows[pos:]))
+        self.endInsertRows()
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        if self._rows is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            return
+        lo, hi = self._proxy_range(first, last)
+        self._removing = (lo, hi)
+        if lo < hi:
+            self.beginRemoveRows(QModelIndex(), lo, hi - 1)
+
+    def _on_rows_removed(self, parent, first, last):
+        if self._rows is None:
+            self.endRemoveRows()
+            return
+        lo, hi = self._removing
+        self._removing = None
+        rows = np.concatenate((self._rows[:lo], self._rows[hi:]))
+        rows[lo:] -= last - first + 1
+        self._rows = rows
+        if lo < hi:
+            self.endRemoveRows()
+
+    def _on_model_reset(self):
+        self._rows = self.sourceModel().search_rows(self._query)
+        self.endResetModel()
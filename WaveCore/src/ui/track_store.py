@@ -0,0 +1,261 @@
+import os
+import numpy as np
+
+WAVE_POINTS = 400 # Matches utils.asset_analysis.WAVEFORM_POINTS; longer waveforms are resampled
+
+class ValueTable:
+    """Interned values of a low-cardinality column (format, artist...) <-> int32 codes."""
+    def __init__(self):
+        self.values = [""]
+        self._codes = {"": 0}
+
+    def code(self, value):
+        if value is None:
+            value = ""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _is_empty(value):
+    return value is None or (isinstance(value, (str, list, tuple, dict)) and not value)
+
+class TrackStore:
+    """
+    Columnar backing store for LibraryModel: one NumPy array per numeric/flag
+    column, int32 codes into shared value tables for repetitive strings, one
+    (rows, WAVE_POINTS) float16 waveform matrix, and plain lists only for the
+    per-track strings (path, and title when it is not just the file name).
+    Anything else a track dict carries (tags, video fields...) is kept in a sparse
+    per-row dict. Numeric analysis values get a float64 column each (NaN = None);
+    vectors such as "features" are not kept (they live in the library index).
+
+    get(row) rebuilds the track dict; the model's data() reads columns directly.
+    ids holds a stable id per row (kept by updates and when other rows are deleted,
+    never reused), for structures that must outlive row renumbering (search index).
+    """
+    NUMERIC = {"duration": np.float64, "file_size": np.int64, "mtime": np.float64, "sample_rate": np.int32}
+    CODED = ("type", "format", "channels", "artist", "album", "genre")
+    FLAGS = ("is_favorite", "waveform_approx", "analysis_pending")
+    DERIVED = ("filename",) # Always os.path.basename(path)
+
+    def __init__(self):
+        self.tables = {name: ValueTable() for name in self.CODED}
+        self._handled = {"path", "title", "analysis", "waveform", *self.NUMERIC, *self.CODED, *self.FLAGS, *self.DERIVED}
+        self.clear()
+
+    def clear(self):
+        self._len = 0
+        self._cap = 0
+        self.next_id = 0
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.paths = []
+        self._titles = [] # None = file name without extension
+        self._extra = []  # None or dict of the keys without a column
+        self.columns = {}
+        for name, dtype in self.NUMERIC.items():
+            self.columns[name] = np.zeros(0, dtype=dtype)
+        for name in self.CODED:
+            self.columns[name] = np.zeros(0, dtype=np.int32)
+        for name in self.FLAGS:
+            self.columns[name] = np.zeros(0, dtype=bool)
+        self.analysis = {} # Analysis key -> float64 column
+        self.waves = np.zeros((0, WAVE_POINTS), dtype=np.float16)
+        self.wave_len = np.zeros(0, dtype=np.int16) # 0 = no waveform
+
+    def __len__(self):
+        return self._len
+
+    # --- Storage ---
+    def _grow(self, needed):
+        if needed <= self._cap:
+            return
+        cap = max(needed, self._cap * 2, 256)
+        def grown(a):
+            out = np.zeros((cap,) + a.shape[1:], dtype=a.dtype)
+            out[:self._len] = a[:self._len]
+            return out
+        for name in self.columns:
+            self.columns[name] = grown(self.columns[name])
+        for name in self.analysis:
+            self.analysis[name] = grown(self.analysis[name])
+        self.waves = grown(self.waves)
+        self.wave_len = grown(self.wave_len)
+        self.ids = grown(self.ids)
+        self._cap = cap
+
+    def _analysis_column(self, name):
+        column = self.analysis.get(name)
+        if column is None:
+            column = self.analysis[name] = np.full(self._cap, np.nan)
+        return column
+
+    def _write(self, row, track, partial=False):
+        # partial: only the keys present in 'track' change (merge); else the row is replaced
+        path = track.get("path") if not partial or "path" in track else self.paths[row]
+        if not partial or "path" in track:
+            self.paths[row] = path
+        if not partial or "title" in track or "path" in track:
+            title = track["title"] if "title" in track else self.title(row)
+            stem = os.path.splitext(os.path.basename(path or ""))[0]
+            self._titles[row] = None if title == stem else title
+
+        for name, column in self.columns.items():
+            if name in track:
+                value = track[name]
+                if name in self.tables:
+                    column[row] = self.tables[name].code(value)
+                elif name in self.FLAGS:
+                    column[row] = bool(value)
+                else:
+                    column[row] = value or 0
+            elif not partial:
+                column[row] = 0
+
+        if "analysis" in track or not partial:
+            for column in self.analysis.values():
+                column[row] = np.nan
+            self._write_analysis(row, track.get("analysis") or {})
+
+        if "waveform" in track or not partial:
+            self._write_wave(row, track.get("waveform"))
+
+        if partial and self._extra[row]:
+            track = {**self._extra[row], **track}
+        self._extra[row] = self._extras_of(track)
+
+    def _write_analysis(self, row, analysis):
+        for name, value in analysis.items():
+            if value is None or _is_number(value):
+                self._analysis_column(name)[row] = np.nan if value is None else value
+            # Other values (feature vectors) are not kept in the view model
+
+    def _extras_of(self, track):
+        extra = {k: v for k, v in track.items() if k not in self._handled and not _is_empty(v)}
+        return extra or None
+
+    def _write_wave(self, row, waveform):
+        if waveform is None or len(waveform) == 0:
+            self.wave_len[row] = 0
+            return
+        waveform = np.asarray(waveform)
+        if len(waveform) > WAVE_POINTS:
+            waveform = waveform[np.linspace(0, len(waveform) - 1, WAVE_POINTS).astype(np.int64)]
+        self.waves[row, :len(waveform)] = waveform
+        self.wave_len[row] = len(waveform)
+
+    def append(self, tracks):
+        # Column by column (one pass per column instead of per-row writes)
+        start, n = self._len, len(tracks)
+        end = start + n
+        self._grow(end)
+        self._len = end
+        self.ids[start:end] = np.arange(self.next_id, self.next_id + n)
+        self.next_id += n
+        self.paths.extend(t.get("path") for t in tracks)
+        for t, path in zip(tracks, self.paths[start:]):
+            title = t.get("title")
+            stem = os.path.splitext(os.path.basename(path or ""))[0]
+            self._titles.append(None if title == stem else title)
+        for name, column in self.columns.items():
+            if name in self.tables:
+                code = self.tables[name].code
+                column[start:end] = [code(t.get(name)) for t in tracks]
+            elif name in self.FLAGS:
+                column[start:end] = [bool(t.get(name)) for t in tracks]
+            else:
+                column[start:end] = [t.get(name) or 0 for t in tracks]
+
+        for column in self.analysis.values():
+            column[start:end] = np.nan
+        analyses = [t.get("analysis") or {} for t in tracks]
+        for name in {k for a in analyses for k, v in a.items() if _is_number(v)}:
+            values = [a.get(name) for a in analyses]
+            self._analysis_column(name)[start:end] = [v if _is_number(v) else None for v in values] # None -> NaN
+
+        waves = [t.get("waveform") for t in tracks]
+        full = [i for i, w in enumerate(waves) if w is not None and len(w) == WAVE_POINTS]
+        if full:
+            self.waves[start + np.array(full)] = np.stack([waves[i] for i in full])
+            self.wave_len[start + np.array(full)] = WAVE_POINTS
+        for i, w in enumerate(waves):
+            if w is None or len(w) != WAVE_POINTS:
+                self._write_wave(start + i, w)
+        self._extra.extend(self._extras_of(t) for t in tracks)
+
+    def replace(self, row, track):
+        self._write(row, track)
+
+    def update(self, row, changes):
+        self._write(row, changes, partial=True)
+
+    def delete(self, start, end):
+        """Removes rows [start, end)."""
+        n = end - start
+        if n <= 0:
+            return
+        tail = slice(end, self._len)
+        for arrays in (self.columns, self.analysis):
+            for column in arrays.values():
+                column[start:self._len - n] = column[tail]
+        self.waves[start:self._len - n] = self.waves[tail]
+        self.wave_len[start:self._len - n] = self.wave_len[tail]
+        self.ids[start:self._len - n] = self.ids[tail]
+        del self.paths[start:end]
+        del self._titles[start:end]
+        del self._extra[start:end]
+        self._len -= n
+
+    # --- Reads ---
+    def title(self, row):
+        title = self._titles[row]
+        if title is None:
+            return os.path.splitext(os.path.basename(self.paths[row] or ""))[0]
+        return title
+
+    def value(self, name, row):
+        """Value of a coded/numeric/flag column for one row."""
+        v = self.columns[name][row]
+        if name in self.tables:
+            return self.tables[name].values[v]
+        return v.item()
+
+    def column(self, name):
+        """All rows of a numeric/coded/flag column (codes for coded ones, see values()). A view."""
+        return self.columns[name][:self._len]
+
+    def values(self, name):
+        """Strings of a coded column, indexed by code."""
+        return self.tables[name].values
+
+    def waveform(self, row):
+        """A float32 copy: rows of waves are overwritten by update() and shifted by delete()."""
+        n = self.wave_len[row]
+        return self.waves[row, :n].astype(np.float32) if n else None
+
+    def get(self, row):
+        """The track dict of one row (a new dict: changes go through update())."""
+        path = self.paths[row]
+        track = {"path": path, "filename": os.path.basename(path or ""), "title": self.title(row)}
+        for name, column in self.columns.items():
+            if name in self.tables and column[row] == 0:
+                continue # Empty/missing value: left out, like in the dicts the store was fed
+            track[name] = self.value(name, row)
+        analysis = {}
+        for name, column in self.analysis.items():
+            v = column[row]
+            analysis[name] = None if np.isnan(v) else float(v)
+        track["analysis"] = analysis
+        track["waveform"] = self.waveform(row)
+        if self._extra[row]:
+            track.update(self._extra[row])
+        return track
+
+    def nbytes(self):
+        """Approximate memory held by the arrays (excludes the per-row Python strings/dicts)."""
+        arrays = list(self.columns.values()) + list(self.analysis.values()) + [self.waves, self.wave_len]
+        return sum(a.nbytes for a in arrays)
@@ -0,0 +1,150 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QRectF, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QPainter, QColor
+from collections import OrderedDict
+import os
+import threading
+import numpy as np
+
+THUMBNAIL_CACHE_BYTES = 48 * 1024 * 1024 # ~1000 thumbnails of 300x40
+PREFETCH_THREADS = 2
+
+# Spotify style: Discrete Bars
+BAR_W = 1.5
+STEP_PX = 2.5 # Bar + gap
+
+def thumbnail_key(track, width, height, color, dpr=1.0):
+    """Cache key of a track's waveform thumbnail: (track id, width, height, color)."""
+    # Path + mtime + approx flag identify the waveform: a refined or re-analyzed one gets a new key
+    track_id = (os.path.normcase(track.get("path", "")), track.get("mtime", 0), bool(track.get("waveform_approx")))
+    return (track_id, round(width * dpr), round(height * dpr), QColor(color).rgba())
+
+def render_thumbnail(data, width, height, color, dpr=1.0):
+    """
+    Rasterizes a waveform overview into a transparent QImage (safe off the GUI
+    thread), at the screen's device pixel ratio. Bar heights are computed for the
+    whole width at once and drawn in one batched call.
+    """
+    image = QImage(max(1, round(width * dpr)), max(1, round(height * dpr)), QImage.Format.Format_ARGB32_Premultiplied)
+    image.setDevicePixelRatio(dpr)
+    image.fill(Qt.GlobalColor.transparent)
+    if data is None or len(data) == 0 or width <= 0:
+        return image
+
+    xs = np.arange(0, float(width), STEP_PX)
+    idx = (xs / width * len(data)).astype(np.int64)
+    xs = xs[idx < len(data)]
+    idx = idx[idx < len(data)]
+    heights = np.maximum(2.0, np.abs(np.asarray(data[idx], dtype=np.float32)) * (height * 0.8))
+    tops = height / 2 - heights / 2
+    rects = [QRectF(x, y, BAR_W, h) for x, y, h in zip(xs.tolist(), tops.tolist(), heights.tolist())]
+
+    painter = QPainter(image) # Logical coordinates (the image carries the pixel ratio)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(QColor(color))
+    painter.drawRects(rects)
+    painter.end()
+    return image
+
+class ThumbnailCache:
+    """Process-wide LRU of rendered thumbnails, bounded by total image bytes. Thread-safe."""
+
+    def __init__(self, max_bytes=THUMBNAIL_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._images
+
+    def put(self, key, image):
+        with self._lock:
+            old = self._images.pop(key, None)
+            if old is not None:
+                self._bytes -= old.sizeInBytes()
+            self._images[key] = image
+            self._bytes += image.sizeInBytes()
+            while self._bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= evicted.sizeInBytes()
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+_cache = ThumbnailCache()
+
+def get_thumbnail_cache():
+    return _cache
+
+class _RenderTask(QRunnable):
+    def __init__(self, prefetcher, key, data, width, height, color, dpr):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.args = (key, data, width, height, color, dpr)
+
+    def run(self):
+        key, data, width, height, color, dpr = self.args
+        try:
+            _cache.put(key, render_thumbnail(data, width, height, color, dpr))
+        finally:
+            self.prefetcher._done(key)
+
+class ThumbnailPrefetcher(QObject):
+    """
+    Renders thumbnails of rows that are about to scroll into view on a small
+    worker pool, so painting them is a cache hit. thumbnails_ready fires (on the
+    GUI thread) when a batch has landed, to repaint the view.
+    """
+    thumbnails_ready = pyqtSignal()
+
+    def __init__(self, parent=None, threads=PREFETCH_THREADS):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(threads)
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def prefetch(self, tracks, width, height, color, dpr=1.0):
+        if width <= 0 or height <= 0:
+            return
+        self._pool.clear() # Rows requested earlier and not started yet are no longer near the viewport
+        with self._lock:
+            self._pending.clear()
+        for track in tracks:
+            if not track or track.get("analysis_pending"):
+                continue
+            data = track.get("waveform")
+            if data is None or len(data) == 0:
+                continue
+            key = thumbnail_key(track, width, height, color, dpr)
+            with self._lock:
+                if key in self._pending or key in _cache:
+                    continue
+                self._pending.add(key)
+            self._pool.start(_RenderTask(self, key, data, width, height, QColor(color), dpr))
+
+    def _done(self, key):
+        with self._lock:
+            self._pending.discard(key)
+            idle = not self._pending
+        if idle:
+            self.thumbnails_ready.emit() # Queued to the GUI thread (emitted from a worker)
+
+    def stop(self):
+        self._pool.clear()
+        self._pool.waitForDone()
@@ -1,12 +1,20 @@
 from PyQt6.QtWidgets import QWidget, QApplication
 from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QDrag, QPixmap, QPainterPath, QLinearGradient
-from PyQt6 import QtCore
-from PyQt6.QtCore import Qt, QRect, QRectF, pyqtSignal, QMimeData, QUrl, QPoint, QTimer
+from PyQt6.QtCore import Qt, QRect, QRectF, pyqtSignal, QMimeData, QUrl, QPoint
+from collections import OrderedDict
 import numpy as np
+import os
+from ui.frame_scheduler import get_frame_scheduler
 
 class WaveformWidget(QWidget):
     seek_requested = pyqtSignal(float) # 0.0 to 1.0
 
+    # Spotify style: Discrete Bars
+    BAR_W = 2
+    STEP_PX = 3 # Bar + gap
+    TILE_W = 510 # Rendered tile width (a multiple of STEP_PX)
+    MAX_TILES = 32
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.data = None
@@ -33,6 +41,11 @@ class WaveformWidget(QWidget):
         self.zoom_factor = 1.0 # 1.0 = no zoom
         self.view_offset = 0.0 # Left side of visible window (0.0 to 1.0)
         
+        # Deep zoom: min/max peak pyramid loaded on the first zoom-in (opt-in per widget)
+        self.deep_zoom = False
+        self.pyramid = None
+        self._pyramid_loaders = []
+        
         # Caching
         self._pixmap_base = None
         self._pixmap_progress = None
@@ -40,29 +53,30 @@ class WaveformWidget(QWidget):
         self._cached_height = -1
         self._cached_zoom = -1
         self._cached_offset = -1
-        
-        # Animation Timer (Smooth interpolation)
-        self.anim_timer = QTimer(self)
-        self.anim_timer.setInterval(16) # ~60 FPS
-        self.anim_timer.timeout.connect(self._on_anim_tick)
-        self.anim_timer.start()
+        self._tiles = OrderedDict() # Tile index -> (base, progress) pixmaps, least recently used first
+        self._tiles_key = None
 
         self.setMinimumHeight(40)
         self.setMouseTracking(True)
 
-    def _on_anim_tick(self):
-        # Smoothly interpolate display_progress towards progress
+    def advance_frame(self):
+        """
+        One animation frame (driven by the shared FrameScheduler while the playhead
+        moves): interpolates display_progress towards progress.
+        Returns False once settled, which takes the widget off the scheduler.
+        """
         diff = self.progress - self.display_progress
         if abs(diff) < 0.0001:
             if self.display_progress != self.progress:
                 self.display_progress = self.progress
                 self.update()
-            return
+            return False
             
-        # Adjust speed: 0.2 means it moves 20% of the distance every 16ms
+        # Adjust speed: 0.3 means it moves 30% of the distance every frame (~16ms)
         step = diff * 0.3 
         self.display_progress += step
         self.update()
+        return True
 
     def set_data(self, data, file_path=None, duration=0):
         self.data = data
@@ -72,8 +86,10 @@ class WaveformWidget(QWidget):
         self.sel_end = None
         self.zoom_factor = 1.0
         self.view_offset = 0.0
+        self.pyramid = None
         self._pixmap_base = None # Invalidate cache
         self._pixmap_progress = None
+        self._tiles_key = None
         self.update()
 
     def set_progress(self, progress):
@@ -81,6 +97,8 @@ class WaveformWidget(QWidget):
         # If jumping significantly (user seek), snap display_progress
         if abs(self.progress - self.display_progress) > 0.1:
             self.display_progress = self.progress
+        elif self.progress != self.display_progress:
+            get_frame_scheduler().request(self)
         self.update()
         
     def set_colors(self, wave, progress):
@@ -88,75 +106,115 @@ class WaveformWidget(QWidget):
         self.progress_color = QColor(progress)
         self._pixmap_base = None
         self._pixmap_progress = None
+        self._tiles_key = None
+        self.update()
+
+    def _request_pyramid(self):
+        if not self.deep_zoom or self.pyramid is not None or not self.file_path:
+            return
+        if self.file_path.startswith("http") or not os.path.exists(self.file_path):
+            return
+        if any(l.file_path == self.file_path for l in self._pyramid_loaders):
+            return
+        from utils.waveform_pyramid import PyramidLoader, pyramid_failed
+        if pyramid_failed(self.file_path):
+            return # Undecodable (e.g. m4a): do not retry on every wheel notch
+        loader = PyramidLoader(self.file_path)
+        loader.pyramid_ready.connect(self._on_pyramid_ready)
+        loader.finished.connect(lambda l=loader: self._pyramid_loaders.remove(l))
+        self._pyramid_loaders.append(loader)
+        loader.start()
+
+    def _on_pyramid_ready(self, file_path, pyramid):
+        if file_path != self.file_path:
+            return
+        self.pyramid = pyramid
+        self._pixmap_base = None
         self.update()
 
+    def _source_data(self, width, step_px):
+        # At zoom 1 the stored overview is enough; deeper, use the pyramid level
+        # whose resolution matches the number of bars in the visible window
+        if self.pyramid is not None and self.zoom_factor > 1.0:
+            return self.pyramid.level_for(self.zoom_factor, max(1, width // step_px))
+        return self.data
+
+    def _render_tile(self, index, data, content_w, height):
+        """
+        Rasterizes tile 'index' of the zoomed waveform (content_w pixels wide in
+        total): the base pixmap and its progress-colored copy.
+        Bars sit on a grid anchored to the content, so a tile never changes when panning.
+        """
+        x0 = index * self.TILE_W
+        xs = np.arange(x0, min(x0 + self.TILE_W, content_w), self.STEP_PX)
+        idx = np.minimum((xs * len(data)) // content_w, len(data) - 1)
+        max_h = height * 0.85
+        heights = np.maximum(2.0, np.abs(np.asarray(data[idx], dtype=np.float32)) * max_h)
+        tops = height / 2 - heights / 2
+        rects = [QRectF(float(x), float(y), float(self.BAR_W), float(h))
+                 for x, y, h in zip((xs - x0).tolist(), tops.tolist(), heights.tolist())]
+
+        tile_w = self.TILE_W
+        base = QPixmap(tile_w, height)
+        base.fill(Qt.GlobalColor.transparent)
+        p = QPainter(base)
+        p.setRenderHint(QPainter.RenderHint.Antialiasing)
+        p.setPen(Qt.PenStyle.NoPen)
+        p.setBrush(QBrush(QColor(self.wave_color)))
+        p.drawRects(rects) # One batched call for the whole tile
+        p.end()
+
+        # Progress Gradient: same bars, recolored (no second rasterization)
+        grad = QLinearGradient(0, 0, 0, height)
+        progress_color = QColor(self.progress_color)
+        grad.setColorAt(0, progress_color.lighter(110))
+        grad.setColorAt(0.5, progress_color)
+        grad.setColorAt(1, progress_color.darker(110))
+        prog = QPixmap(base)
+        p = QPainter(prog)
+        p.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
+        p.fillRect(0, 0, tile_w, height, QBrush(grad))
+        p.end()
+        return base, prog
+
     def _render_pixmaps(self, width, height):
         if (self._pixmap_base and width == self._cached_width and 
             height == self._cached_height and self.zoom_factor == self._cached_zoom and
             self.view_offset == self._cached_offset):
             return
             
-        if self.data is None or len(self.data) == 0:
+        if self.data is None or len(self.data) < 2:
             return
-            
-        # Create new pixmaps
+
+        # Tiles of the zoomed content are cached: panning only rasterizes the newly
+        # exposed ones, and the view pixmaps are assembled from them by blitting
+        data = self._source_data(width, self.STEP_PX)
+        key = (width, height, self.zoom_factor, id(data)) # Not the pan position
+        if key != self._tiles_key:
+            self._tiles.clear()
+            self._tiles_key = key
+        content_w = max(width, int(round(width * self.zoom_factor)))
+        view_x = int(round(self.view_offset * content_w))
+
         self._pixmap_base = QPixmap(width, height)
         self._pixmap_base.fill(Qt.GlobalColor.transparent)
-        
         self._pixmap_progress = QPixmap(width, height)
         self._pixmap_progress.fill(Qt.GlobalColor.transparent)
-        
         p_base = QPainter(self._pixmap_base)
         p_prog = QPainter(self._pixmap_progress)
-        
-        for p in [p_base, p_prog]:
-            p.setRenderHint(QPainter.RenderHint.Antialiasing)
-            
-        mid_y = height / 2
-        max_h = height * 0.85
-        
-        # Spotify style: Discrete Bars
-        bar_w = 2 
-        gap = 1
-        step_px = bar_w + gap
-        
-        # Window into data
-        start_idx = int(self.view_offset * len(self.data))
-        win_len = int(len(self.data) / self.zoom_factor)
-        end_idx = min(start_idx + win_len, len(self.data))
-        
-        win_data = self.data[start_idx:end_idx]
-        if len(win_data) < 2: 
-            p_base.end()
-            p_prog.end()
-            return
 
-        # Progress Gradient for the progress pixmap
-        grad = QLinearGradient(0, 0, 0, height)
-        grad.setColorAt(0, self.progress_color.lighter(110))
-        grad.setColorAt(0.5, self.progress_color)
-        grad.setColorAt(1, self.progress_color.darker(110))
-        
-        p_base.setBrush(QBrush(self.wave_color))
-        p_base.setPen(Qt.PenStyle.NoPen)
-        
-        p_prog.setBrush(QBrush(grad))
-        p_prog.setPen(Qt.PenStyle.NoPen)
-        
-        # Draw Bars
-        for x in range(0, width, step_px):
-            data_ratio = x / width
-            idx = int(data_ratio * len(win_data))
-            if idx >= len(win_data): break
-            
-            val = abs(win_data[idx])
-            h = max(2, val * max_h)
-            
-            # Draw to both pixmaps
-            rect_f = QtCore.QRectF(float(x), float(mid_y - h/2), float(bar_w), float(h))
-            p_base.drawRoundedRect(rect_f, 1.0, 1.0)
-            p_prog.drawRoundedRect(rect_f, 1.0, 1.0)
-            
+        for index in range(view_x // self.TILE_W, (view_x + width - 1) // self.TILE_W + 1):
+            tile = self._tiles.get(index)
+            if tile is None:
+                tile = self._tiles[index] = self._render_tile(index, data, content_w, height)
+            else:
+                self._tiles.move_to_end(index)
+            x = index * self.TILE_W - view_x
+            p_base.drawPixmap(x, 0, tile[0])
+            p_prog.drawPixmap(x, 0, tile[1])
+        while len(self._tiles) > self.MAX_TILES:
+            self._tiles.popitem(last=False)
+
         p_base.end()
         p_prog.end()
         
@@ -312,6 +370,7 @@ class WaveformWidget(QWidget):
                 else:
                     self.sel_start = start
                     self.sel_end = end
+                    self._pre_export_selection()
             self.is_selecting = False
             self.update()
 
@@ -332,12 +391,19 @@ class WaveformWidget(QWidget):
         else:
             self.zoom_factor /= zoom_step
             
-        self.zoom_factor = max(1.0, min(self.zoom_factor, 100.0))
+        # With a pyramid we can zoom until one finest-level bin (256 samples) fills a bar
+        max_zoom = 100.0
+        if self.pyramid is not None:
+            max_zoom = max(max_zoom, len(self.pyramid.peaks[0]) / max(1, w // 3))
+        self.zoom_factor = max(1.0, min(self.zoom_factor, max_zoom))
         
         # Adjust view_offset to keep mouse_rel persistent
         self.view_offset = mouse_rel - (mouse_x / w) / self.zoom_factor
         self.view_offset = max(0.0, min(self.view_offset, 1.0 - 1.0/self.zoom_factor))
         
+        if self.zoom_factor > 1.0:
+            self._request_pyramid()
+        
         self._pixmap_base = None
         self.update()
 
@@ -346,13 +412,32 @@ class WaveformWidget(QWidget):
         s, e = sorted((self.sel_start, self.sel_end))
         return s <= val <= e
 
+    def _selection_ms(self):
+        s, e = sorted((self.sel_start, self.sel_end))
+        return int(s * self.duration_sec * 1000), int(e * self.duration_sec * 1000)
+
+    def _pre_export_selection(self):
+        # Render the snippet in the background so a drag can start instantly
+        if not self.file_path: return
+        from utils.audio_exporter import export_snippet_async
+        previous = getattr(self, '_pre_export', None)
+        if previous is not None:
+            previous.cancel() # Superseded selection; only drops it if not started yet
+        self._pre_export = export_snippet_async(self.file_path, *self._selection_ms())
+
     def start_drag(self):
         if not self.file_path or self.sel_start is None: return
-        s, e = sorted((self.sel_start, self.sel_end))
-        start_ms = s * self.duration_sec * 1000
-        end_ms = e * self.duration_sec * 1000
-        from utils.audio_exporter import export_snippet
-        snippet_path = export_snippet(self.file_path, start_ms, end_ms)
+        from utils.audio_exporter import export_snippet_async
+        # Joins the pre-export started on mouse release (or a cache hit) instead of exporting again
+        future = export_snippet_async(self.file_path, *self._selection_ms())
+        if not future.done():
+            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+            try:
+                snippet_path = future.result()
+            finally:
+                QApplication.restoreOverrideCursor()
+        else:
+            snippet_path = future.result()
         if snippet_path:
             drag = QDrag(self)
             mime = QMimeData()
@@ -0,0 +1,133 @@
+import os
+from core.asset_models import AudioAsset, VideoAsset, ImageAsset
+
+# Kept free of Qt imports: analyze_file also runs inside worker processes.
+
+AUDIO_EXT = ('.mp3', '.wav', '.flac', '.ogg', '.m4a', '.aiff')
+VIDEO_EXT = ('.mp4', '.mov', '.avi', '.mkv', '.webm')
+IMAGE_EXT = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+MEDIA_EXT = AUDIO_EXT + VIDEO_EXT + IMAGE_EXT
+
+WAVEFORM_POINTS = 400 # Peaks stored per track for the list view
+
+def analyze_file(path, name=None, ext=None, approx_over=0):
+    """
+    Extracts waveform/metadata for one media file.
+    Audio longer than approx_over seconds (0 = never) gets a provisional, seek-sampled
+    waveform (track["waveform_approx"] is True) to be refined later.
+    Returns the track dict LibraryModel expects, or None.
+    """
+    name = name or os.path.basename(path)
+    ext = ext or os.path.splitext(name)[1].lower()
+    try:
+        asset = None
+
+        if ext in AUDIO_EXT:
+            from utils.metadata_reader import probe_audio
+
+            # One open for tags, technical info and the waveform peaks
+            probe = probe_audio(path, waveform_points=WAVEFORM_POINTS, approx_over=approx_over)
+            asset = AudioAsset.from_probe(path, probe)
+
+        elif ext in VIDEO_EXT:
+            from utils.video_utils import VideoMetadataExtractor
+
+            # Extract Metadata & Thumbnail
+            extractor = VideoMetadataExtractor()
+            meta = extractor.get_metadata(path)
+
+            asset = VideoAsset(path)
+            asset.duration = meta.get("duration", 0)
+            asset.width = meta.get("width", 0)
+            asset.height = meta.get("height", 0)
+            asset.fps = meta.get("fps", 0)
+            asset.thumbnail_path = meta.get("thumbnail_path", "")
+
+            # Title from filename if not in metadata (OpenCV doesn't give title usually)
+            asset.title = name
+
+        elif ext in IMAGE_EXT:
+            # Placeholder for Image Extraction
+            asset = ImageAsset(path)
+
+        if asset:
+            # COMPATIBILITY LAYER:
+            # Convert the object to a dict structure that LibraryModel expects
+            # LibraryModel expects: path, title, duration, format, channels, waveform, is_favorite
+
+            track_data = asset.to_dict()
+
+            # Add extra fields expected by current UI if missing
+            if "artist" not in track_data: track_data["artist"] = ""
+            if "album" not in track_data: track_data["album"] = ""
+            if "channels" not in track_data: track_data["channels"] = ""
+
+            return track_data
+
+    except Exception as e:
+        print(f"Error processing {name}: {e}")
+    return None
+
+def describe_file(path, name=None, ext=None):
+    """
+    First stage of progressive scans: the row for one media file from stat data and,
+    for audio, tags and header info. Nothing is decoded. Rows that still need the
+    second stage (analyze_details) carry "analysis_pending": True.
+    Returns the track dict LibraryModel expects, or None.
+    """
+    name = name or os.path.basename(path)
+    ext = ext or os.path.splitext(name)[1].lower()
+    try:
+        if ext in AUDIO_EXT:
+            from utils.metadata_reader import probe_audio
+            track = AudioAsset.from_probe(path, probe_audio(path)).to_dict()
+            track["analysis_pending"] = True
+            return track
+
+        elif ext in VIDEO_EXT:
+            asset = VideoAsset(path)
+            asset.title = name
+            track = asset.to_dict()
+            track["analysis_pending"] = True
+            return track
+
+        elif ext in IMAGE_EXT:
+            return ImageAsset(path).to_dict()
+
+    except Exception as e:
+        print(f"Error listing {name}: {e}")
+    return None
+
+def analyze_details(path, ext=None, approx_over=0, duration=0):
+    """
+    Second stage of progressive scans: the expensive fields of a row listed by
+    describe_file, as a partial track dict to merge into it. For audio this is the
+    waveform and the block analysis of the same decode; videos get their full
+    metadata and thumbnail.
+    :param duration: Duration from the listed row, to pick the approximate mode
+                     without re-reading the header.
+    """
+    ext = ext or os.path.splitext(path)[1].lower()
+    update = {"path": path, "analysis_pending": False}
+    try:
+        if ext in AUDIO_EXT:
+            from utils.audio_loader import analyze_audio
+
+            if approx_over and not duration:
+                from utils.metadata_reader import probe_audio
+                duration = probe_audio(path)["duration"]
+            approximate = bool(approx_over) and duration > approx_over
+            waveform, _, _, analysis = analyze_audio(path, points=WAVEFORM_POINTS, approximate=approximate)
+            update["waveform"] = waveform
+            update["waveform_approx"] = approximate
+            update["analysis"] = analysis
+
+        elif ext in VIDEO_EXT:
+            track = analyze_file(path, ext=ext)
+            if track:
+                track.pop("is_favorite", None) # Owned by the listed row
+                update.update(track)
+
+    except Exception as e:
+        print(f"Error processing {os.path.basename(path)}: {e}")
+    return update
@@ -1,50 +1,124 @@
 import os
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import soundfile as sf
 import numpy as np
 
-def export_snippet(source_path, start_ms, end_ms, output_dir=None):
+# Exported snippets are kept and reused (same file, same region, same format)
+SNIPPET_DIR = os.path.join(tempfile.gettempdir(), "wavecore_snippets")
+SNIPPET_CACHE_BYTES = 512 * 1024 * 1024 # Least recently used snippets are deleted above this
+
+SNIPPET_FORMATS = {"wav": "WAV", "flac": "FLAC", "aiff": "AIFF"}
+
+# Background pre-export: one worker, and at most one export per region in flight
+_executor = None
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+def _snippet_path(source_path, start_ms, end_ms, fmt, output_dir):
+    # Keyed on (path, mtime, start, end, format): an edited source never reuses stale audio
+    st = os.stat(source_path)
+    key = f"{os.path.normcase(os.path.abspath(source_path))}|{st.st_mtime}|{start_ms}|{end_ms}|{fmt}"
+    digest = hashlib.md5(key.encode()).hexdigest()[:10]
+    name, _ = os.path.splitext(os.path.basename(source_path))
+    # Keep a readable name: it is what the drop target (DAW, explorer...) shows
+    return os.path.join(output_dir, f"{name}_snippet_{start_ms}_{end_ms}_{digest}.{fmt}")
+
+def prune_snippet_cache(max_bytes=SNIPPET_CACHE_BYTES, cache_dir=SNIPPET_DIR, keep=None):
+    """Deletes the least recently used snippets until the cache fits in max_bytes."""
+    try:
+        entries = []
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+    except OSError:
+        return
+
+    total = sum(e[1] for e in entries)
+    for _, size, path in sorted(entries): # Oldest first (hits refresh the mtime)
+        if total <= max_bytes: break
+        if path == keep: continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass # Still open somewhere (e.g. a drop in progress)
+
+def export_snippet(source_path, start_ms, end_ms, output_dir=None, fmt="wav"):
     """
-    Slices the audio file from start_ms to end_ms and saves it to a temp file using soundfile.
-    Exports as WAV to ensure compatibility without external FFmpeg dependency.
+    Slices the audio file from start_ms to end_ms and saves it to a file using soundfile.
+    Only the selected frames are read (seek + read), and the result is cached: dragging
+    the same region again returns the existing file.
+    Exports as WAV by default to ensure compatibility without external FFmpeg dependency.
     """
     if not os.path.exists(source_path):
         return None
-        
+
     try:
-        # Load audio using soundfile
-        # soundfile reads into numpy array (frames, channels)
-        # always_2d=True ensures we handle mono/stereo consistently
-        data, samplerate = sf.read(source_path, always_2d=True)
-        
-        # Calculate samples
-        start_sample = int((start_ms / 1000.0) * samplerate)
-        end_sample = int((end_ms / 1000.0) * samplerate)
-        
-        # Ensure bounds
-        start_sample = max(0, start_sample)
-        end_sample = min(len(data), end_sample)
-        
-        if start_sample >= end_sample:
-            return None
-            
-        snippet_data = data[start_sample:end_sample]
-        
-        # Generate Output Path
-        if output_dir is None:
-            import tempfile
-            output_dir = tempfile.gettempdir()
-            
-        filename = os.path.basename(source_path)
-        name, _ = os.path.splitext(filename)
-        # Always export as .wav for safety/speed without ffmpeg encoding
-        new_name = f"{name}_snippet_{int(start_ms)}_{int(end_ms)}.wav"
-        output_path = os.path.join(output_dir, new_name)
-        
-        # Write
-        sf.write(output_path, snippet_data, samplerate)
-        
+        start_ms, end_ms = int(start_ms), int(end_ms)
+        cached = output_dir is None
+        if cached:
+            output_dir = SNIPPET_DIR
+            os.makedirs(output_dir, exist_ok=True)
+
+        output_path = _snippet_path(source_path, start_ms, end_ms, fmt, output_dir)
+        if os.path.exists(output_path):
+            os.utime(output_path) # Mark as recently used
+            return output_path
+
+        with sf.SoundFile(source_path) as f:
+            samplerate = f.samplerate
+
+            # Calculate samples
+            start_sample = max(0, int((start_ms / 1000.0) * samplerate))
+            end_sample = min(f.frames, int((end_ms / 1000.0) * samplerate))
+            if start_sample >= end_sample:
+                return None
+
+            f.seek(start_sample)
+            snippet_data = f.read(end_sample - start_sample, dtype='float32', always_2d=True)
+            # Keep the source bit depth when the target format supports it
+            out_format = SNIPPET_FORMATS.get(fmt, "WAV")
+            subtype = f.subtype if sf.check_format(out_format, f.subtype) else None
+
+        # Write next to the final name and rename, so a concurrent export/drag
+        # never picks up a half-written file
+        tmp_path = output_path + ".part"
+        sf.write(tmp_path, snippet_data, samplerate, subtype=subtype, format=out_format)
+        os.replace(tmp_path, output_path)
+
+        if cached:
+            prune_snippet_cache(keep=output_path)
         return output_path
-        
+
     except Exception as e:
         print(f"Export error: {e}")
         return None
+
+def export_snippet_async(source_path, start_ms, end_ms, fmt="wav"):
+    """
+    Runs export_snippet (into the snippet cache) on a background worker and returns
+    a Future with the output path. Asking again for a region that is still being
+    exported returns the same Future instead of starting a second export.
+    """
+    global _executor
+    key = (os.path.normcase(os.path.abspath(source_path)), int(start_ms), int(end_ms), fmt)
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        if future is not None:
+            return future
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snippet-export")
+        future = _executor.submit(export_snippet, source_path, start_ms, end_ms, None, fmt)
+        _in_flight[key] = future
+
+    def forget(f):
+        with _in_flight_lock:
+            if _in_flight.get(key) is f:
+                del _in_flight[key]
+    future.add_done_callback(forget)
+    return future
@@ -1,114 +1,230 @@
 import soundfile as sf
 import numpy as np
 
-def load_waveform_data(file_path, points=1000):
+BLOCK_FRAMES = 100000
+
+# Approximate (seek-sampled) waveforms: frames read per bin, and the default
+# duration above which scans use them
+APPROX_WINDOW_FRAMES = 4096
+APPROX_MIN_DURATION = 20 * 60
+
+class EnvelopeReducer:
     """
-    Lee un archivo de audio y devuelve una versión reducida de la forma de onda
-    para visualización rápida.
-    :param file_path: Ruta al archivo.
-    :param points: Número aproximado de puntos a devolver.
-    :return: numpy array con los datos normalizados (-1 a 1).
+    Streaming, vectorized reduction of a mono signal into 'points' bins.
+    Blocks are fed in order; each one is reduced with ufunc.reduceat, and bins
+    that straddle two blocks are merged into running accumulators.
+    One pass yields min, max, peak (max |x|) and RMS per bin.
+    """
+    def __init__(self, total_frames, points):
+        self.points = points
+        self.total_frames = max(0, int(total_frames))
+        # Bin i covers [edges[i], edges[i+1]); the whole file is covered
+        self.edges = np.linspace(0, self.total_frames, points + 1).astype(np.int64)
+        self.min = np.full(points, np.inf, dtype=np.float32)
+        self.max = np.full(points, -np.inf, dtype=np.float32)
+        self.sumsq = np.zeros(points, dtype=np.float64)
+        self.count = np.zeros(points, dtype=np.int64)
+        self.pos = 0
+
+    def feed(self, mono):
+        start = self.pos
+        mono = mono[:max(0, self.total_frames - start)]
+        n = len(mono)
+        if n == 0:
+            return
+        end = start + n
+
+        # Bins touched by [start, end)
+        p0 = max(0, int(np.searchsorted(self.edges, start, side='right')) - 1)
+        p1 = min(self.points - 1, int(np.searchsorted(self.edges, end - 1, side='right')) - 1)
+        local = np.clip(self.edges[p0:p1 + 1] - start, 0, n)
+        counts = np.diff(np.append(local, n))
+        valid = counts > 0 # Empty bins (duplicate edges) would read a neighbour in reduceat
+        local = local[valid]
+        bins = np.arange(p0, p1 + 1)[valid]
+
+        self.min[bins] = np.minimum(self.min[bins], np.minimum.reduceat(mono, local))
+        self.max[bins] = np.maximum(self.max[bins], np.maximum.reduceat(mono, local))
+        self.sumsq[bins] += np.add.reduceat(np.square(mono, dtype=np.float64), local)
+        self.count[bins] += counts[valid]
+        self.pos = end
+
+    def result(self):
+        filled = self.count > 0
+        mn = np.where(filled, self.min, 0).astype(np.float32)
+        mx = np.where(filled, self.max, 0).astype(np.float32)
+        rms = np.zeros(self.points, dtype=np.float32)
+        rms[filled] = np.sqrt(self.sumsq[filled] / self.count[filled])
+        return {
+            "peak": np.maximum(np.abs(mn), np.abs(mx)),
+            "min": mn,
+            "max": mx,
+            "rms": rms,
+        }
+
+def mix_to_mono(block):
+    """Averages the channels of a (frames, channels) block.
+    A dot product with the channel weights is several times faster than
+    block.mean(axis=1), which reduces along the short, strided axis."""
+    channels = block.shape[1]
+    if channels == 1:
+        return block[:, 0]
+    return block @ np.full(channels, 1.0 / channels, dtype=block.dtype)
+
+def _normalize(envelopes):
+    # Visual normalization: the loudest peak maps to 1.0
+    max_val = np.max(envelopes["peak"]) if len(envelopes["peak"]) else 0
+    if max_val > 0:
+        envelopes = {k: v / max_val for k, v in envelopes.items()}
+    return envelopes
+
+def _stream_envelopes_miniaudio(file_path, points, should_stop=None, analyzers=()):
+    """
+    Decodes compressed formats soundfile can't open (MP3/OGG/M4A...) chunk by chunk.
+    miniaudio hands out float32 chunks of BLOCK_FRAMES frames; each is viewed
+    with np.frombuffer (no copy) and fed straight to the reducer, so memory stays
+    bounded by the chunk size instead of the decoded length of the file.
+    """
+    import miniaudio
+    info = miniaudio.get_file_info(file_path)
+    reducer = EnvelopeReducer(info.num_frames, points)
+    # Mono is enough for the waveform; analyzers need every channel
+    nchannels = info.nchannels if analyzers else 1
+    for analyzer in analyzers:
+        analyzer.start(info.sample_rate, nchannels, info.num_frames)
+    stream = miniaudio.stream_file(file_path, output_format=miniaudio.SampleFormat.FLOAT32,
+                                   nchannels=nchannels, sample_rate=info.sample_rate,
+                                   frames_to_read=BLOCK_FRAMES)
+    for chunk in stream:
+        block = np.frombuffer(chunk, dtype=np.float32).reshape(-1, nchannels)
+        for analyzer in analyzers:
+            analyzer.feed(block)
+        reducer.feed(mix_to_mono(block))
+        if reducer.pos >= reducer.total_frames: break
+        if should_stop and should_stop():
+            stream.close()
+            return None, 0, 0
+    stream.close()
+    return reducer.result(), info.duration, info.nchannels
+
+def _sampled_envelopes(file_path, points, window_frames=APPROX_WINDOW_FRAMES):
+    """
+    Seeks to 'points' evenly spaced windows (one centred in every bin) and reads only
+    window_frames from each, so the cost no longer depends on the file length.
+    Transients between windows are missed: the result is provisional.
+    """
+    with sf.SoundFile(file_path) as f:
+        if not f.seekable():
+            raise ValueError("stream is not seekable")
+        frames = f.frames
+        edges = np.linspace(0, frames, points + 1).astype(np.int64)
+        mn = np.zeros(points, dtype=np.float32)
+        mx = np.zeros(points, dtype=np.float32)
+        rms = np.zeros(points, dtype=np.float32)
+        for i in range(points):
+            lo, hi = edges[i], edges[i + 1]
+            n = min(window_frames, hi - lo)
+            if n <= 0: continue
+            f.seek(lo + (hi - lo - n) // 2)
+            block = f.read(n, dtype='float32', always_2d=True)
+            if not len(block): continue
+            mono = mix_to_mono(block)
+            mn[i] = mono.min()
+            mx[i] = mono.max()
+            rms[i] = np.sqrt(np.mean(np.square(mono, dtype=np.float64)))
+        envelopes = {"peak": np.maximum(np.abs(mn), np.abs(mx)), "min": mn, "max": mx, "rms": rms}
+        return envelopes, frames / f.samplerate, f.channels
+
+def load_waveform_envelopes(file_path, points=1000, approximate=False, should_stop=None, analyzers=()):
+    """
+    Reads an audio file once and returns reduced envelopes for display.
+    :param file_path: Path or an already open binary file object (positioned at the start).
+    :param approximate: Only read evenly spaced windows (see _sampled_envelopes); falls back
+                        to the exact pass if the file can't be seeked.
+    :param should_stop: Optional callable polled between blocks; when it returns True
+                        the read is abandoned and (None, 0, 0) is returned.
+    :param analyzers: Block analyzers (utils.block_analyzers) fed every decoded
+                      (frames, channels) block alongside the reducer. Not used in
+                      approximate mode.
+    :return: (dict with 'peak', 'min', 'max', 'rms' arrays of length points, normalized
+              so the peak is 1.0), duration in seconds, channel count.
     """
+    if approximate:
+        try:
+            envelopes, duration, channels = _sampled_envelopes(file_path, points)
+            return _normalize(envelopes), duration, channels
+        except Exception as e:
+            print(f"Sampled waveform failed: {e}. Reading the whole file...")
+            if not isinstance(file_path, str):
+                file_path.seek(0)
+
     try:
         with sf.SoundFile(file_path) as f:
             frames = f.frames
-            samplerate = f.samplerate
-            duration = frames / samplerate
+            duration = frames / f.samplerate
             channels = f.channels
-            
-            # Divide file into 'points' chunks
-            chunk_size = max(1, frames // points)
-            reduced_data = np.zeros(points, dtype=np.float32)
-            
-            # Read in larger blocks to minimize I/O overhead
-            # But process each chunk within the block
-            block_frames = 100000 
-            
-            p_idx = 0
-            curr_frames_read = 0
-            
-            # Simplified approach for speed and memory:
-            # We jump and read a small window around each point
-            # Or read everything in blocks.
-            
-            # Optimized Block Reading:
-            for block in f.blocks(blocksize=block_frames, always_2d=True):
-                # block is (block_frames, channels)
-                # Mix to mono
-                mono_block = block.mean(axis=1)
-                
-                # How many waveform 'points' fall into this block?
-                # We need to find peaks for each relative chunk
-                # (This is more complex but more robust)
-                
-                # Simpler: just take one sample every 'chunk_size'
-                # but let's do a better peak detection if possible
-                
-                # To keep it fast for UI, we'll use a stride reading if extremely large
-                # for now, let's just make it memory safe by not loading everything at once.
-                
-                # Calculate which points in 'reduced_data' this block covers
-                start_p = curr_frames_read // chunk_size
-                end_p = (curr_frames_read + len(mono_block)) // chunk_size
-                
-                for p in range(start_p, min(end_p, points)):
-                    # Calculate relative start/end in mono_block
-                    b_start = p * chunk_size - curr_frames_read
-                    b_end = (p + 1) * chunk_size - curr_frames_read
-                    
-                    # Clamp to block bounds
-                    b_start = max(0, b_start)
-                    b_end = min(len(mono_block), b_end)
-                    
-                    if b_start < b_end:
-                        # Peak for this waveform point
-                        reduced_data[p] = np.max(np.abs(mono_block[b_start:b_end]))
-                
-                curr_frames_read += len(mono_block)
-                if curr_frames_read >= frames: break
-
-        # Normalización visual
-        max_val = np.max(reduced_data)
-        if max_val > 0:
-            reduced_data = reduced_data / max_val
-            
-        return reduced_data, duration, channels
-        
+
+            reducer = EnvelopeReducer(frames, points)
+            for analyzer in analyzers:
+                analyzer.start(f.samplerate, channels, frames)
+            # Read in large blocks to keep memory bounded; every analysis shares the decode
+            for block in f.blocks(blocksize=BLOCK_FRAMES, always_2d=True, dtype='float32'):
+                for analyzer in analyzers:
+                    analyzer.feed(block)
+                reducer.feed(mix_to_mono(block))
+                if reducer.pos >= frames: break
+                if should_stop and should_stop():
+                    return None, 0, 0
+
+        return _normalize(reducer.result()), duration, channels
+
     except Exception as e:
         print(f"Soundfile failed: {e}. Trying miniaudio...")
         try:
-            import miniaudio
-            info = miniaudio.get_file_info(file_path)
-            decoded = miniaudio.decode_file(file_path, nchannels=1, sample_rate=info.sample_rate) # Mono for waveform
-            
-            # Decoded samples are int16 by default
-            samples = np.array(decoded.samples, dtype=np.float32) / 32768.0
-            
-            duration = info.duration
-            channels = info.nchannels
-            
-            # Resample to 'points'
-            num_samples = len(samples)
-            if num_samples > points:
-                # Simple decimation
-                step = num_samples // points
-                reduced_data = np.zeros(points, dtype=np.float32)
-                for i in range(points):
-                    start = i * step
-                    end = start + step
-                    chunk = samples[start:end]
-                    if len(chunk) > 0:
-                        reduced_data[i] = np.max(np.abs(chunk))
-            else:
-                reduced_data = samples
-                
-            # Normalize
-            max_val = np.max(reduced_data)
-            if max_val > 0:
-                reduced_data = reduced_data / max_val
-                
-            return reduced_data, duration, channels
-            
+            if not isinstance(file_path, str):
+                file_path = file_path.name # miniaudio needs a path
+            envelopes, duration, channels = _stream_envelopes_miniaudio(file_path, points, should_stop, analyzers)
+            if envelopes is None:
+                return None, 0, 0
+            return _normalize(envelopes), duration, channels
+
         except Exception as e2:
             print(f"Miniaudio failed: {e2}")
-            return np.zeros(points), 0, 0
+            empty = np.zeros(points, dtype=np.float32)
+            return {"peak": empty, "min": empty, "max": empty, "rms": empty}, 0, 0
+
+def load_waveform_data(file_path, points=1000, approximate=False, should_stop=None):
+    """
+    Lee un archivo de audio y devuelve una versión reducida de la forma de onda
+    para visualización rápida.
+    :param file_path: Ruta al archivo.
+    :param points: Número aproximado de puntos a devolver.
+    :param approximate: Muestreo por saltos (archivos muy largos), ver load_waveform_envelopes.
+    :return: numpy array con los datos normalizados (0 a 1), duración, canales.
+    """
+    envelopes, duration, channels = load_waveform_envelopes(file_path, points, approximate, should_stop)
+    if envelopes is None:
+        return None, 0, 0
+    return envelopes["peak"], duration, channels
+
+def analyze_audio(file_path, points=1000, approximate=False, should_stop=None):
+    """
+    One decode for the waveform and every registered block analyzer
+    (utils.block_analyzers: loudness, peak, RMS, silence...).
+    :return: peak array (as load_waveform_data), duration, channels, analysis dict.
+             The analysis is empty in approximate mode, where not every frame is read.
+    """
+    from utils.block_analyzers import create_analyzers
+    analyzers = [] if approximate else create_analyzers()
+    envelopes, duration, channels = load_waveform_envelopes(file_path, points, approximate, should_stop, analyzers)
+    if envelopes is None:
+        return None, 0, 0, {}
+
+    analysis = {}
+    if duration:
+        for analyzer in analyzers:
+            try:
+                analysis.update(analyzer.result())
+            except Exception as e:
+                print(f"Analyzer {type(analyzer).__name__} failed: {e}")
+    return envelopes["peak"], duration, channels, analysis
@@ -0,0 +1,277 @@
+import math
+from functools import lru_cache
+import numpy as np
+
+# Measurements computed from the same decoded blocks as the waveform (see
+# audio_loader.analyze_audio), so each one is free at scan time.
+#
+# An analyzer is created per file and gets:
+#   start(samplerate, channels, total_frames)
+#   feed(block)    float32 (frames, channels) blocks, in order
+#   result()       dict of JSON-serializable values, merged into track["analysis"]
+#                  ("features" is the exception: a float32 vector, stored as a BLOB)
+# New measurements only need a class and a register_analyzer() call.
+
+SILENCE_THRESHOLD_DB = -60.0
+
+def _db(value):
+    return round(20 * math.log10(value), 2) if value > 0 else None
+
+class PeakAnalyzer:
+    """Sample peak in dBFS."""
+    def start(self, samplerate, channels, total_frames):
+        self.peak = 0.0
+
+    def feed(self, block):
+        self.peak = max(self.peak, float(block.max()), -float(block.min()))
+
+    def result(self):
+        return {"peak_db": _db(self.peak)}
+
+class RmsAnalyzer:
+    """RMS level over all samples and channels, in dBFS."""
+    def start(self, samplerate, channels, total_frames):
+        self.sumsq = 0.0
+        self.count = 0
+
+    def feed(self, block):
+        flat = block.ravel()
+        self.sumsq += float(np.dot(flat, flat))
+        self.count += len(flat)
+
+    def result(self):
+        return {"rms_db": _db(math.sqrt(self.sumsq / self.count)) if self.count else None}
+
+class SilenceAnalyzer:
+    """Leading and trailing silence (below SILENCE_THRESHOLD_DB), in seconds."""
+    def start(self, samplerate, channels, total_frames):
+        self.samplerate = samplerate
+        self.threshold = 10 ** (SILENCE_THRESHOLD_DB / 20)
+        self.pos = 0
+        self.first = None
+        self.last = None
+
+    def feed(self, block):
+        # Work on the flat interleaved samples: reducing over the short channel axis is slow
+        loud = np.abs(block.ravel()) > self.threshold
+        if loud.any():
+            channels = block.shape[1]
+            if self.first is None:
+                self.first = self.pos + int(loud.argmax()) // channels
+            self.last = self.pos + (len(loud) - 1 - int(loud[::-1].argmax())) // channels
+        self.pos += len(block)
+
+    def result(self):
+        if self.first is None or not self.samplerate:
+            lead = tail = round(self.pos / self.samplerate, 3) if self.samplerate else 0
+        else:
+            lead = round(self.first / self.samplerate, 3)
+            tail = round((self.pos - self.last - 1) / self.samplerate, 3)
+        return {"silence_lead": lead, "silence_tail": tail}
+
+@lru_cache(maxsize=8)
+def k_weighting_ir(samplerate):
+    """
+    Impulse response of the ITU-R BS.1770 K-weighting filter (high shelf + high
+    pass biquads) at the given rate, truncated once it has decayed (~0.1 s).
+    """
+    def biquad(b, a, x):
+        y = np.zeros_like(x)
+        x1 = x2 = y1 = y2 = 0.0
+        for n in range(len(x)):
+            y[n] = b[0] * x[n] + b[1] * x1 + b[2] * x2 - a[1] * y1 - a[2] * y2
+            x2, x1, y2, y1 = x1, x[n], y1, y[n]
+        return y
+
+    # Stage 1: high shelf (head effects)
+    f0, gain_db, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    k = math.tan(math.pi * f0 / samplerate)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf_b = ((vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0)
+    shelf_a = (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0)
+
+    # Stage 2: high pass (RLB weighting)
+    f0, q = 38.13547087602444, 0.5003270373238773
+    k = math.tan(math.pi * f0 / samplerate)
+    a0 = 1 + k / q + k * k
+    hp_b = (1.0, -2.0, 1.0)
+    hp_a = (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0)
+
+    impulse = np.zeros(int(samplerate * 0.1))
+    impulse[0] = 1.0
+    return biquad(hp_b, hp_a, biquad(shelf_b, shelf_a, impulse))
+
+def _fft_size(n):
+    """Smallest 2^a * 3^b * 5^c >= n (pocketfft is fast on these, less padding than 2^k)."""
+    best = 1 << (n - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            m = p35
+            while m < n: m *= 2
+            best = min(best, m)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+class LoudnessAnalyzer:
+    """
+    Integrated loudness (LUFS, ITU-R BS.1770 / EBU R128 gating).
+    K-weighting is applied per block by FFT convolution (overlap-save) with the
+    filter's impulse response instead of a sample-by-sample IIR loop. The mean
+    square is kept per 100 ms segment; 400 ms gating blocks (75% overlap) are
+    then the mean of 4 consecutive segments.
+    """
+    SEGMENT_SEC = 0.1
+
+    def start(self, samplerate, channels, total_frames):
+        self.seg = max(1, int(round(samplerate * self.SEGMENT_SEC)))
+        self.ir = k_weighting_ir(samplerate)
+        self.history = np.zeros((len(self.ir) - 1, channels), dtype=np.float32) # Filter memory
+        # Channel weights: L, R, C = 1.0, surrounds = 1.41, LFE excluded (5.1 layout)
+        self.gains = np.ones(channels)
+        if channels == 6:
+            self.gains = np.array([1.0, 1.0, 1.0, 0.0, 1.41, 1.41])
+        self.carry = np.zeros((0, channels)) # Filtered samples of an incomplete segment
+        self.powers = [] # Mean square per segment and channel
+        self._ir_spectra = {}
+
+    def feed(self, block):
+        n = len(block)
+        x = np.concatenate([self.history, block])
+        nfft = _fft_size(len(x))
+        ir_spectrum = self._ir_spectra.get(nfft)
+        if ir_spectrum is None:
+            ir_spectrum = self._ir_spectra[nfft] = np.fft.rfft(self.ir, nfft)[:, None]
+        spectrum = np.fft.rfft(x, nfft, axis=0) * ir_spectrum
+        filtered = np.fft.irfft(spectrum, nfft, axis=0)[len(self.history):len(self.history) + n]
+        self.history = x[len(x) - len(self.history):]
+
+        if len(self.carry):
+            filtered = np.concatenate([self.carry, filtered])
+        usable = len(filtered) - len(filtered) % self.seg
+        if usable:
+            segs = filtered[:usable].reshape(-1, self.seg, filtered.shape[1])
+            self.powers.append(np.mean(np.square(segs), axis=1))
+        self.carry = filtered[usable:]
+
+    def result(self):
+        if not self.powers:
+            return {"lufs": None}
+        seg_power = np.concatenate(self.powers)
+        if len(seg_power) < 4:
+            return {"lufs": None} # Shorter than one gating block
+
+        # 400 ms blocks with 75% overlap = running mean of 4 segments
+        cum = np.cumsum(np.vstack([np.zeros((1, seg_power.shape[1])), seg_power]), axis=0)
+        block_power = (cum[4:] - cum[:-4]) / 4
+        z = block_power @ self.gains
+        with np.errstate(divide='ignore'):
+            loudness = -0.691 + 10 * np.log10(z)
+
+        gated = z[loudness > -70.0] # Absolute gate
+        if not len(gated):
+            return {"lufs": None}
+        relative = -0.691 + 10 * np.log10(gated.mean()) - 10.0
+        gated = gated[-0.691 + 10 * np.log10(gated) > relative] # Relative gate
+        if not len(gated):
+            return {"lufs": None}
+        return {"lufs": round(-0.691 + 10 * math.log10(gated.mean()), 2)}
+
+@lru_cache(maxsize=8)
+def _mel_filterbank(samplerate, n_fft, n_bands):
+    """Triangular mel-spaced filters over the rfft bins, shape (bins, n_bands)."""
+    def hz_to_mel(f): return 2595 * np.log10(1 + f / 700.0)
+    def mel_to_hz(m): return 700 * (10 ** (m / 2595.0) - 1)
+
+    top = min(16000.0, samplerate / 2)
+    edges = mel_to_hz(np.linspace(hz_to_mel(30.0), hz_to_mel(top), n_bands + 2))
+    freqs = np.fft.rfftfreq(n_fft, 1.0 / samplerate)
+    bank = np.zeros((len(freqs), n_bands), dtype=np.float32)
+    for i in range(n_bands):
+        lo, mid, hi = edges[i], edges[i + 1], edges[i + 2]
+        up = (freqs - lo) / (mid - lo)
+        down = (hi - freqs) / (hi - mid)
+        bank[:, i] = np.clip(np.minimum(up, down), 0, None)
+    return bank
+
+@lru_cache(maxsize=4)
+def _dct_matrix(n_in, n_out):
+    """Orthonormal DCT-II basis, shape (n_in, n_out)."""
+    n = np.arange(n_in)[:, None]
+    k = np.arange(n_out)[None, :]
+    basis = np.cos(np.pi * (n + 0.5) * k / n_in) * np.sqrt(2.0 / n_in)
+    basis[:, 0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+class FeatureAnalyzer:
+    """
+    Compact timbre descriptor for similarity search ("find sounds like this"):
+    mean and standard deviation over the file of 13 MFCCs, spectral centroid,
+    spectral flatness and frame energy, on non-overlapping FRAME-sample frames
+    of the mono mix. Result: {"features": FEATURE_DIM float32 values}.
+    """
+    FRAME = 2048
+    BANDS = 26
+    MFCCS = 13
+    FEATURE_DIM = 2 * (MFCCS + 3)
+
+    def start(self, samplerate, channels, total_frames):
+        self.samplerate = samplerate
+        self.bank = _mel_filterbank(samplerate, self.FRAME, self.BANDS)
+        self.dct = _dct_matrix(self.BANDS, self.MFCCS)
+        self.freqs = np.fft.rfftfreq(self.FRAME, 1.0 / samplerate).astype(np.float32)
+        self.window = np.hanning(self.FRAME).astype(np.float32)
+        self.carry = np.zeros(0, dtype=np.float32)
+        self.sums = np.zeros(self.MFCCS + 3)
+        self.sumsq = np.zeros(self.MFCCS + 3)
+        self.count = 0
+
+    def feed(self, block):
+        from utils.audio_loader import mix_to_mono
+        mono = mix_to_mono(block)
+        if len(self.carry):
+            mono = np.concatenate([self.carry, mono])
+        usable = len(mono) - len(mono) % self.FRAME
+        self.carry = mono[usable:]
+        if not usable:
+            return
+
+        frames = mono[:usable].reshape(-1, self.FRAME) * self.window
+        power = np.square(np.abs(np.fft.rfft(frames, axis=1))).astype(np.float32) + 1e-10
+        total = power.sum(axis=1)
+        mel = np.log(power @ self.bank + 1e-10)
+        mfcc = mel @ self.dct
+        centroid = (power @ self.freqs) / total / (self.samplerate / 2) # 0..1
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        energy = np.log(total)
+
+        per_frame = np.column_stack([mfcc, centroid, flatness, energy]).astype(np.float64)
+        self.sums += per_frame.sum(axis=0)
+        self.sumsq += np.square(per_frame).sum(axis=0)
+        self.count += len(per_frame)
+
+    def result(self):
+        if not self.count:
+            return {}
+        mean = self.sums / self.count
+        std = np.sqrt(np.maximum(self.sumsq / self.count - mean * mean, 0))
+        return {"features": np.concatenate([mean, std]).astype(np.float32)}
+
+_analyzer_types = []
+
+def register_analyzer(analyzer_type):
+    """Adds an analyzer class (or factory) to the default scan pipeline."""
+    if analyzer_type not in _analyzer_types:
+        _analyzer_types.append(analyzer_type)
+    return analyzer_type
+
+def create_analyzers():
+    """Fresh instances of every registered analyzer, for one file."""
+    return [t() for t in _analyzer_types]
+
+for _t in (PeakAnalyzer, RmsAnalyzer, SilenceAnalyzer, LoudnessAnalyzer, FeatureAnalyzer):
+    register_analyzer(_t)
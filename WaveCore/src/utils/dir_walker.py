@@ -0,0 +1,95 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WALK_THREADS = 8
+
+_DONE = object()
+
+def walk_entries(roots, max_workers=DEFAULT_WALK_THREADS, should_stop=None, include_dirs=False):
+    """
+    Recursively walks one or more folder trees with a bounded thread pool (one
+    os.scandir per task) and yields os.DirEntry objects as soon as they are found,
+    before the walk has finished. Order is not deterministic.
+
+    Directories are identified by (st_dev, st_ino) so symlink/junction loops and
+    trees reachable twice are only walked once.
+    :param should_stop: Optional callable; when it returns True the walk is abandoned.
+    :param include_dirs: Also yield directory entries (for building folder trees).
+    """
+    if isinstance(roots, str):
+        roots = [roots]
+
+    out = queue.Queue()
+    visited = set()
+    lock = threading.Lock()
+    outstanding = [0]
+    abandoned = threading.Event() # Set when the consumer closes the generator
+    stopped = lambda: abandoned.is_set() or bool(should_stop and should_stop())
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="walk")
+
+    def claim(path):
+        # True if this directory was not seen before (loop-safe)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        ident = (st.st_dev, st.st_ino)
+        with lock:
+            if ident in visited:
+                return False
+            visited.add(ident)
+            return True
+
+    def submit(path):
+        with lock:
+            outstanding[0] += 1
+        executor.submit(scan_dir, path)
+
+    def scan_dir(path):
+        try:
+            if stopped(): return
+            with os.scandir(path) as it:
+                for entry in it:
+                    if stopped(): return
+                    try:
+                        if entry.is_dir(follow_symlinks=True):
+                            if claim(entry.path):
+                                if include_dirs:
+                                    out.put(entry)
+                                submit(entry.path)
+                        elif entry.is_file():
+                            out.put(entry)
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"Walk error {path}: {e}")
+        finally:
+            with lock:
+                outstanding[0] -= 1
+                finished = outstanding[0] == 0
+            if finished:
+                out.put(_DONE)
+
+    started = False
+    for root in roots:
+        if os.path.isdir(root) and claim(root):
+            submit(root)
+            started = True
+
+    try:
+        if not started:
+            return
+        while True:
+            try:
+                item = out.get(timeout=0.25)
+            except queue.Empty:
+                if stopped(): return
+                continue
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        abandoned.set()
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -3,6 +3,7 @@ import shutil
 # import send2trash # TODO: Add safely later
 from PyQt6.QtWidgets import QMessageBox
 from utils.constants import get_vault_path, get_audio_path, get_video_path, get_photo_path
+from utils.library_cache import move_in_cache, remove_path_from_cache
 
 def ensure_vault_exists():
     """Creates the Vault folder and subfolders if they doesn't exist. Returns the path."""
@@ -39,6 +40,7 @@ def rename_item(old_path, new_name):
         raise FileExistsError(f"'{new_name}' already exists.")
     
     os.rename(old_path, new_path)
+    move_in_cache(old_path, new_path)
     return new_path
 
 def delete_item(path):
@@ -47,6 +49,7 @@ def delete_item(path):
         shutil.rmtree(path)
     else:
         os.remove(path)
+    remove_path_from_cache(path)
 
 def move_file(source_path, target_folder):
     """Moves a file to a target folder."""
@@ -57,4 +60,5 @@ def move_file(source_path, target_folder):
         raise FileExistsError(f"'{filename}' already exists in destination.")
         
     shutil.move(source_path, target_path)
+    move_in_cache(source_path, target_path)
     return target_path
@@ -0,0 +1,161 @@
+import os
+import re
+import numpy as np
+
+_CHUNK_RE = re.compile(r"[^\W_]+")
+# Inside a chunk: acronyms (before a capitalized word), capitalized/lower words, digit runs, other scripts
+_PART_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+|[^\W\d_A-Za-z]+")
+
+def name_words(text):
+    """
+    Words of a sound file name, split on '_', '-', spaces, case changes and digits:
+    'WHOOSH_SwshFast02' -> ['whoosh', 'swsh', 'fast', '02'].
+    """
+    if not text:
+        return []
+    return [part.lower() for chunk in _CHUNK_RE.findall(text) for part in _PART_RE.findall(chunk)]
+
+def fuzzy_name(track):
+    """Name text of a track dict for fuzzy matching: its title and file name (without extension)."""
+    base = os.path.splitext(os.path.basename(track.get("path") or ""))[0]
+    return f"{track.get('title') or ''} {base}"
+
+def _trigrams(words):
+    grams = set()
+    for word in words:
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class TrigramIndex:
+    """
+    Typo-tolerant name matching: every document (integer id, as in SearchIndex)
+    is the set of character trigrams of its name words (see name_words), and a
+    query scores each document by the trigrams they share, so 'whosh' still finds
+    WHOOSH_Swsh_Fast_02 and the ranking does not depend on word order or spelling.
+
+    Packed like SearchIndex: trigram ids laid out as CSR postings, so the shared
+    counts of all documents are one np.bincount over the query's posting slices.
+    Documents added since the last pack are kept as a small (doc, trigram) pair
+    list scored with np.isin, removed ones are masked out.
+
+    The score is a Tversky index weighted towards the query:
+    shared / (shared + |query - doc| + LENGTH_WEIGHT * |doc - query|), so a short
+    query matching part of a long file name still ranks high, and among equal
+    matches the shorter name wins.
+    """
+    PACK_MIN = 4096
+    LENGTH_WEIGHT = 0.1
+    MIN_SCORE = 0.3
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._ids = {}        # Trigram -> id
+        self._doc_grams = {}  # Doc id -> trigram ids (int32 array)
+        self._size = 0        # Highest doc id + 1
+        self._lengths = np.zeros(0, dtype=np.int32) # Doc id -> trigram count
+
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._flat = np.zeros(0, dtype=np.int64)
+        self._delta_docs = set()
+        self._delta_pairs = None # (doc ids, trigram ids) of the delta (built on demand)
+        self._dead = set()
+
+    def __len__(self):
+        return len(self._doc_grams)
+
+    def add_many(self, docs):
+        """Indexes (doc id, name text) pairs; a doc id already indexed is re-indexed."""
+        ids = self._ids
+        for doc, text in docs:
+            if doc in self._doc_grams:
+                self._discard(doc)
+            grams = [ids.setdefault(g, len(ids)) for g in _trigrams(name_words(text))]
+            self._doc_grams[doc] = np.array(grams, dtype=np.int32)
+            self._delta_docs.add(doc)
+            if doc >= self._size:
+                self._size = doc + 1
+        self._delta_pairs = None
+
+    def remove(self, docs):
+        for doc in docs:
+            self._discard(doc)
+        self._delta_pairs = None
+
+    def _discard(self, doc):
+        if self._doc_grams.pop(doc, None) is not None:
+            self._delta_docs.discard(doc)
+            self._dead.add(doc)
+
+    def _grow_lengths(self):
+        if len(self._lengths) < self._size:
+            lengths = np.zeros(self._size, dtype=np.int32)
+            lengths[:len(self._lengths)] = self._lengths
+            self._lengths = lengths
+
+    # --- Packing ---
+    def pack(self):
+        """Rebuilds the postings from every document; search() does it once the delta has grown."""
+        if not self._delta_docs and not self._dead:
+            return
+        docs = np.fromiter(self._doc_grams, dtype=np.int64, count=len(self._doc_grams))
+        counts = np.fromiter((len(g) for g in self._doc_grams.values()), dtype=np.int64, count=len(docs))
+        grams = np.concatenate(list(self._doc_grams.values())) if len(docs) else np.zeros(0, dtype=np.int32)
+        owners = np.repeat(docs, counts)
+        order = np.argsort(grams, kind="stable")
+        offsets = np.zeros(len(self._ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(grams, minlength=len(self._ids)), out=offsets[1:])
+        self._flat, self._offsets = owners[order], offsets
+        self._lengths = np.zeros(self._size, dtype=np.int32)
+        self._lengths[docs] = counts
+        self._delta_docs, self._delta_pairs, self._dead = set(), None, set()
+
+    def _needs_pack(self):
+        return len(self._delta_docs) + len(self._dead) > max(self.PACK_MIN, len(self) // 8)
+
+    # --- Queries ---
+    def scores(self, text):
+        """Score (0..1) of every doc id against the name text, or None when text has no words."""
+        grams = _trigrams(name_words(text))
+        if not grams:
+            return None
+        if self._needs_pack():
+            self.pack()
+        self._grow_lengths()
+        query = np.array([self._ids[g] for g in grams if g in self._ids], dtype=np.int64)
+        known = query[query < len(self._offsets) - 1]
+        shared = np.zeros(self._size, dtype=np.int64)
+        if len(known):
+            starts, ends = self._offsets[known], self._offsets[known + 1]
+            hits = np.concatenate([self._flat[s:e] for s, e in zip(starts, ends)])
+            shared[:] = np.bincount(hits, minlength=self._size)[:self._size]
+        if self._dead:
+            shared[np.fromiter(self._dead, dtype=np.int64, count=len(self._dead))] = 0
+        if self._delta_docs:
+            if self._delta_pairs is None:
+                docs = list(self._delta_docs)
+                arrays = [self._doc_grams[d] for d in docs]
+                owners = np.repeat(np.array(docs, dtype=np.int64), [len(a) for a in arrays])
+                self._delta_pairs = (owners, np.concatenate(arrays))
+                self._lengths[docs] = [len(a) for a in arrays]
+            owners, delta_grams = self._delta_pairs
+            shared += np.bincount(owners[np.isin(delta_grams, query)], minlength=self._size)
+        # Dead docs share nothing, so every denominator is at least len(grams)
+        extra = self._lengths - shared
+        return (shared / (len(grams) + self.LENGTH_WEIGHT * extra)).astype(np.float32)
+
+    def search(self, text, limit=100):
+        """Doc ids best matching text (score at least MIN_SCORE), best first."""
+        scores = self.scores(text)
+        if scores is None:
+            return []
+        return top_matches(scores, limit, self.MIN_SCORE)
+
+def top_matches(scores, limit, min_score=TrigramIndex.MIN_SCORE):
+    """Positions of the limit highest scores of at least min_score, best first."""
+    candidates = np.flatnonzero(scores >= min_score)
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
@@ -1,66 +1,86 @@
 import os
-import json
-import hashlib
+import time
+from utils.library_index import get_library_index
 
-CACHE_FILE = os.path.join(os.path.expanduser("~"), ".wavecore_cache.json")
-
-def _get_folder_hash(folder_path):
-    # Simply use the absolute path as key for now
-    # A better approach would be hashing path + mtime of the folder
-    return hashlib.md5(folder_path.encode()).hexdigest()
+# Thin compatibility layer over the SQLite library index (utils/library_index.py).
+# The old monolithic ~/.wavecore_cache.json is migrated automatically on first use.
 
 def get_cached_folder_data(folder_path):
     folder_path = os.path.normpath(folder_path)
-    if not os.path.exists(CACHE_FILE):
+    try:
+        return get_library_index().get_folder_tracks(folder_path)
+    except Exception as e:
+        print(f"Cache Read Error: {e}")
         return None
-    
+
+def get_cached_tree_data(root_path):
+    """Tracks of a folder and all its subfolders (after a recursive scan), or None."""
+    root_path = os.path.normpath(root_path)
     try:
-        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-            full_cache = json.load(f)
-            return full_cache.get(folder_path)
-    except:
+        return get_library_index().get_tree_tracks(root_path)
+    except Exception as e:
+        print(f"Cache Read Error: {e}")
         return None
 
+def get_cached_tracks(paths):
+    """Indexed track dicts for the given paths, in order (unknown paths are skipped)."""
+    try:
+        return get_library_index().get_tracks(paths)
+    except Exception as e:
+        print(f"Cache Read Error: {e}")
+        return []
+
 def save_folder_to_cache(folder_path, tracks):
     folder_path = os.path.normpath(folder_path)
     try:
-        full_cache = {}
-        if os.path.exists(CACHE_FILE):
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                full_cache = json.load(f)
-        
-        # We store only essential data. 
-        # Waveforms are already small arrays (400 floats)
-        # We convert numpy arrays to lists for JSON
-        serializable_tracks = []
-        for t in tracks:
-            t_copy = t.copy()
-            if hasattr(t["waveform"], "tolist"):
-                t_copy["waveform"] = t["waveform"].tolist()
-            # Remove any non-serializable objects like QPainterPath cache
-            if "_wave_path_cache" in t_copy:
-                del t_copy["_wave_path_cache"]
-            serializable_tracks.append(t_copy)
-            
-        full_cache[folder_path] = serializable_tracks
-        
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(full_cache, f, ensure_ascii=False, indent=2)
+        get_library_index().replace_folder(folder_path, tracks, scanned_at=time.time())
+    except Exception as e:
+        print(f"Cache Save Error: {e}")
+
+def save_track_to_cache(track):
+    try:
+        get_library_index().upsert_track(track)
+    except Exception as e:
+        print(f"Cache Save Error: {e}")
+
+def update_cached_waveform(path, waveform, analysis=None):
+    try:
+        get_library_index().set_waveform(path, waveform, analysis=analysis)
+    except Exception as e:
+        print(f"Cache Save Error: {e}")
+
+def remove_tracks_from_cache(paths):
+    try:
+        index = get_library_index()
+        for path in paths:
+            index.remove_track(path)
+    except Exception as e:
+        print(f"Cache Save Error: {e}")
+
+def move_in_cache(old_path, new_path):
+    """Follows a file or folder rename/move in the index (no re-analysis)."""
+    try:
+        get_library_index().move_path(old_path, new_path)
+    except Exception as e:
+        print(f"Cache Save Error: {e}")
+
+def remove_path_from_cache(path):
+    """Forgets a deleted file, or every track below a deleted folder."""
+    try:
+        get_library_index().remove_path(path)
+    except Exception as e:
+        print(f"Cache Save Error: {e}")
+
+def mark_folder_cached(folder_path, recursive=False):
+    folder_path = os.path.normpath(folder_path)
+    try:
+        get_library_index().mark_folder_scanned(folder_path, scanned_at=time.time(), recursive=recursive)
     except Exception as e:
         print(f"Cache Save Error: {e}")
 
 def invalidate_cache(folder_path):
     folder_path = os.path.normpath(folder_path)
     try:
-        if not os.path.exists(CACHE_FILE):
-            return
-            
-        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-            full_cache = json.load(f)
-            
-        if folder_path in full_cache:
-            del full_cache[folder_path]
-            with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(full_cache, f, ensure_ascii=False, indent=2)
+        get_library_index().invalidate_folder(folder_path)
     except Exception as e:
         print(f"Cache Invalidation Error: {e}")
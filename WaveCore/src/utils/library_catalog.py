@@ -0,0 +1,217 @@
+import json
+import threading
+import time
+import numpy as np
+from utils.library_index import get_library_index, normalize_path, CATALOG_COLUMNS
+from utils.search_index import SearchIndex, search_text
+from utils.fuzzy_index import TrigramIndex, fuzzy_name, top_matches
+from utils.track_query import parse_query
+
+_POS = {name: i for i, name in enumerate(("key",) + CATALOG_COLUMNS)} # Column -> position in a row
+
+class LibraryCatalog:
+    """
+    Vault-wide search: a columnar snapshot of every track in the library index
+    (all indexed roots, not just the folder listed in LibraryModel) plus a
+    SearchIndex over its text, so a query (see utils.track_query) is a text mask
+    and a few column masks over all tracks at once. A TrigramIndex over the track
+    names ranks the closest names when the words match nothing as typed.
+
+    Implements the table interface of TrackQuery (column/values): numeric columns
+    are arrays, text columns int codes into per-column value lists. When the index
+    revision has changed (at most every REFRESH_INTERVAL seconds: scans write
+    continuously) the snapshot is reloaded on a background thread and swapped in;
+    searches meanwhile use the previous one. A reload re-reads the lightweight
+    rows (no waveforms) and re-indexes the text of the rows that changed only.
+    """
+    NUMERIC = {"duration": np.float64, "sample_rate": np.int64}
+    CODED = ("type", "format", "channels")
+    REFRESH_INTERVAL = 2.0
+    FUZZY_LIMIT = 200
+
+    def __init__(self, index=None):
+        self._index = index
+        self._lock = threading.Lock()
+        self._revision = None
+        self._refreshed_at = 0.0
+        self._rows = {}         # Key -> (doc id, row), to re-index only changed rows
+        self._next_doc = 0
+        self.text_index = SearchIndex()
+        self.fuzzy_index = TrigramIndex() # Same doc ids as text_index
+        self.paths = []
+        self._row_of = {}       # Key -> row
+        self._docs = np.zeros(0, dtype=np.int64) # Row -> doc id in text_index
+        self._columns = {name: np.zeros(0, dtype=dtype) for name, dtype in self.NUMERIC.items()}
+        self._columns.update({name: np.zeros(0, dtype=np.int32) for name in self.CODED})
+        self._columns["is_favorite"] = np.zeros(0, dtype=bool)
+        self._values = {name: [""] for name in self.CODED}
+        self._loading = False
+        self._loaded = threading.Event()
+
+    def _refresh(self):
+        """Starts a background reload when the index has changed (waits for it if nothing is loaded yet)."""
+        index = self._index or get_library_index()
+        stale = (self._revision != index.revision and
+                 time.monotonic() - self._refreshed_at >= self.REFRESH_INTERVAL)
+        if stale and not self._loading:
+            self._loading = True
+            self._loaded.clear()
+            threading.Thread(target=self._load, args=(index,), daemon=True).start()
+        if self._revision is None:
+            self._loaded.wait()
+
+    def warm_up(self):
+        """Loads the snapshot in the background ahead of the first search."""
+        index = self._index or get_library_index()
+        if self._revision is None and not self._loading:
+            self._loading = True
+            self._loaded.clear()
+            threading.Thread(target=self._load, args=(index,), daemon=True).start()
+
+    def _load(self, index):
+        # Off the UI thread; only the swap at the end holds the lock searches use
+        try:
+            revision = index.revision # Read first: a write during the load triggers another refresh
+            rows = index.get_catalog_rows()
+
+            old, new, changed = dict(self._rows), {}, []
+            docs = np.empty(len(rows), dtype=np.int64)
+            for i, row in enumerate(rows):
+                prev = old.pop(row[0], None)
+                if prev is not None and prev[1] == row:
+                    doc = prev[0]
+                else:
+                    if prev is not None:
+                        doc = prev[0]
+                    else:
+                        doc = self._next_doc
+                        self._next_doc += 1
+                    changed.append((doc, self._text(row), self._name(row)))
+                new[row[0]] = (doc, row)
+                docs[i] = doc
+
+            columns, values = {}, {}
+            for name, dtype in self.NUMERIC.items():
+                pos = _POS[name]
+                columns[name] = np.array([r[pos] or 0 for r in rows], dtype=dtype)
+            for name in self.CODED:
+                pos = _POS[name]
+                codes, names = {"": 0}, [""]
+                for r in rows:
+                    value = r[pos] or ""
+                    if value not in codes:
+                        codes[value] = len(names)
+                        names.append(value)
+                columns[name] = np.fromiter((codes[r[pos] or ""] for r in rows), dtype=np.int32, count=len(rows))
+                values[name] = names
+            columns["is_favorite"] = np.zeros(len(rows), dtype=bool)
+            paths = [r[_POS["path"]] for r in rows]
+            row_of = {r[0]: i for i, r in enumerate(rows)}
+
+            with self._lock:
+                removed = [doc for doc, _ in old.values()]
+                self.text_index.remove(removed)
+                self.text_index.add_many((doc, text) for doc, text, _ in changed)
+                self.fuzzy_index.remove(removed)
+                self.fuzzy_index.add_many((doc, name) for doc, _, name in changed)
+                if self._revision is None:
+                    self.fuzzy_index.pack() # First load: searches wait for it anyway, not the first fuzzy one
+                self._rows, self._docs = new, docs
+                self.paths, self._row_of = paths, row_of
+                self._columns, self._values = columns, values
+                self._revision = revision
+                self._refreshed_at = time.monotonic()
+        except Exception as e:
+            print(f"Library catalog load failed: {e}")
+        finally:
+            self._loading = False
+            self._loaded.set()
+
+    @staticmethod
+    def _text(row):
+        tags = row[_POS["tags"]]
+        return search_text({
+            "path": row[_POS["path"]], "title": row[_POS["title"]], "artist": row[_POS["artist"]],
+            "album": row[_POS["album"]], "genre": row[_POS["genre"]], "tags": json.loads(tags) if tags else [],
+        })
+
+    @staticmethod
+    def _name(row):
+        return fuzzy_name({"path": row[_POS["path"]], "title": row[_POS["title"]]})
+
+    def _set_favorites(self, favorites):
+        mask = np.zeros(len(self.paths), dtype=bool)
+        rows = [self._row_of.get(normalize_path(p)) for p in favorites]
+        rows = [r for r in rows if r is not None]
+        if rows:
+            mask[rows] = True
+        self._columns["is_favorite"] = mask
+
+    # --- TrackQuery table interface ---
+    def __len__(self):
+        return len(self.paths)
+
+    def column(self, name):
+        return self._columns[name]
+
+    def values(self, name):
+        return self._values[name]
+
+    # --- Queries ---
+    def search(self, text, favorites=()):
+        """
+        Paths of every indexed track matching text (words and field terms, see
+        utils.track_query), in index order (grouped by folder); None for an empty
+        query. favorites: the favorite paths, for fav: terms.
+        """
+        query = parse_query(text)
+        if query.is_empty():
+            return None
+        self._refresh()
+        with self._lock:
+            if "is_favorite" in query.columns:
+                self._set_favorites(favorites)
+            keep = query.mask(self)
+            hits = query.text_mask(self.text_index, self._docs)
+            if hits is not None:
+                keep = hits if keep is None else keep & hits
+            paths = self.paths
+            if keep is None:
+                return list(paths)
+            return [paths[i] for i in np.flatnonzero(keep)]
+
+    def search_fuzzy(self, text, favorites=(), limit=FUZZY_LIMIT):
+        """
+        Paths of the tracks whose names are closest to the words of text (typos,
+        other word splits, see utils.fuzzy_index), best first, at most limit.
+        Field terms still filter. None when text has no words.
+        """
+        query = parse_query(text)
+        if not query.words:
+            return None
+        self._refresh()
+        with self._lock:
+            scores = self.fuzzy_index.scores(query.text)
+            if scores is None:
+                return []
+            scores = scores[self._docs]
+            if "is_favorite" in query.columns:
+                self._set_favorites(favorites)
+            keep = query.mask(self)
+            excluded = query.text_mask(self.text_index, self._docs, words=False)
+            if excluded is not None:
+                keep = excluded if keep is None else keep & excluded
+            if keep is not None:
+                scores[~keep] = 0
+            paths = self.paths
+            return [paths[i] for i in top_matches(scores, limit)]
+
+
+_catalog = None
+
+def get_library_catalog():
+    """Process-wide LibraryCatalog over the shared library index."""
+    global _catalog
+    if _catalog is None:
+        _catalog = LibraryCatalog()
+    return _catalog
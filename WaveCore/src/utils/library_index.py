@@ -0,0 +1,503 @@
+import os
+import json
+import sqlite3
+import threading
+import numpy as np
+from utils.waveform_store import WaveformStore
+
+INDEX_DIR = os.path.join(os.path.expanduser("~"), ".wavecore")
+INDEX_FILE = os.path.join(INDEX_DIR, "library.db")
+LEGACY_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".wavecore_cache.json")
+
+# Columns stored per track (besides the key/folder columns derived from the path).
+# Order matters: it is used for INSERT and SELECT.
+TRACK_COLUMNS = (
+    "path", "type", "filename", "title", "artist", "album", "genre",
+    "tags", "file_size", "mtime", "duration", "channels", "sample_rate", "format",
+    "wave_offset", "wave_len", "wave_approx", "analysis",
+)
+# Selected for every track at once by get_catalog_rows (vault-wide search)
+CATALOG_COLUMNS = ("path", "type", "title", "artist", "album", "genre", "tags",
+                   "duration", "channels", "sample_rate", "format")
+# Written with the track row but not part of TRACK_COLUMNS (never selected per track)
+EXTRA_COLUMNS = ("features",)
+_FEATURES = 2 + len(TRACK_COLUMNS) + EXTRA_COLUMNS.index("features") # Position in an insert row
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    key         TEXT PRIMARY KEY,
+    folder      TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    type        TEXT,
+    filename    TEXT,
+    title       TEXT,
+    artist      TEXT,
+    album       TEXT,
+    genre       TEXT,
+    tags        TEXT,
+    file_size   INTEGER,
+    mtime       REAL,
+    duration    REAL,
+    channels    TEXT,
+    sample_rate INTEGER,
+    format      TEXT,
+    wave_offset INTEGER DEFAULT 0,
+    wave_len    INTEGER DEFAULT 0,
+    wave_approx INTEGER DEFAULT 0,
+    analysis    TEXT,
+    features    BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_tracks_folder ON tracks(folder);
+CREATE TABLE IF NOT EXISTS folders (
+    folder     TEXT PRIMARY KEY,
+    scanned_at REAL,
+    recursive  INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+SCHEMA_VERSION = 6
+
+# Compact the waveform store on open once more than half of it is garbage
+COMPACT_MIN_GARBAGE = 1_000_000  # values (~2 MB)
+
+
+def normalize_path(path):
+    """Canonical key for a file or folder (case-folded on Windows)."""
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+
+class LibraryIndex:
+    """
+    Persistent per-track library index backed by SQLite in WAL mode.
+    Reads are per folder, writes are one transaction per track (or per batch).
+    Safe to share between the UI thread and scanner threads.
+    """
+
+    def __init__(self, db_path=INDEX_FILE, legacy_cache=LEGACY_CACHE_FILE):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._lock = threading.RLock()
+        self.revision = 0 # Bumped on every write, lets readers (e.g. LibraryCatalog) cache derived data
+        self.features_revision = 0 # Bumped only by writes that add, remove or change feature vectors
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._open_waveform_store()
+        self._upgrade_schema()
+        self._compact_waveform_store()
+
+        if legacy_cache and os.path.exists(legacy_cache):
+            self._migrate_legacy_json(legacy_cache)
+
+    # --- Schema ---
+    def _upgrade_schema(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            # Fresh database, SCHEMA already has the latest layout
+            version = SCHEMA_VERSION
+        if version < 2:
+            self._migrate_waveform_blobs()
+        if version < 3:
+            self._conn.execute("ALTER TABLE folders ADD COLUMN recursive INTEGER DEFAULT 0")
+        if version < 4:
+            self._conn.execute("ALTER TABLE tracks ADD COLUMN wave_approx INTEGER DEFAULT 0")
+        if version < 5:
+            self._conn.execute("ALTER TABLE tracks ADD COLUMN analysis TEXT")
+        if version < 6:
+            self._conn.execute("ALTER TABLE tracks ADD COLUMN features BLOB")
+        self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._conn.commit()
+
+    def _migrate_waveform_blobs(self):
+        """v1 -> v2: float32 BLOB column -> packed float16 WaveformStore."""
+        self._conn.execute("ALTER TABLE tracks ADD COLUMN wave_offset INTEGER DEFAULT 0")
+        self._conn.execute("ALTER TABLE tracks ADD COLUMN wave_len INTEGER DEFAULT 0")
+        rows = self._conn.execute("SELECT key, waveform FROM tracks WHERE waveform IS NOT NULL").fetchall()
+        with self._conn:
+            for key, blob in rows:
+                offset, length = self._waves.append(np.frombuffer(blob, dtype=np.float32))
+                self._conn.execute("UPDATE tracks SET wave_offset = ?, wave_len = ?, waveform = NULL WHERE key = ?",
+                                   (offset, length, key))
+        try:
+            self._conn.execute("ALTER TABLE tracks DROP COLUMN waveform")
+        except sqlite3.OperationalError:
+            pass # SQLite < 3.35: the column stays, empty
+        self._conn.execute("VACUUM")
+
+    # --- Waveform store ---
+    def _get_meta(self, name, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def _open_waveform_store(self):
+        # The store file name carries a generation number so compaction can swap files
+        # atomically together with the offsets (one SQLite transaction)
+        name = self._get_meta("waveform_file", "waveforms.0.bin")
+        self._waves = WaveformStore(os.path.join(os.path.dirname(self.db_path), name))
+
+    def _compact_waveform_store(self):
+        live = self._conn.execute(
+            "SELECT key, wave_offset, wave_len FROM tracks WHERE wave_len > 0 ORDER BY wave_offset"
+        ).fetchall()
+        garbage = self._waves.size - sum(r[2] for r in live)
+        if garbage < COMPACT_MIN_GARBAGE or garbage < self._waves.size // 2:
+            return
+
+        try:
+            old_path = self._waves.path
+            generation = int(os.path.basename(old_path).split(".")[1]) + 1
+            name = f"waveforms.{generation}.bin"
+            new_path = os.path.join(os.path.dirname(self.db_path), name)
+
+            new_offsets = self._waves.copy_to(new_path, [(r[1], r[2]) for r in live])
+            with self._conn:
+                self._conn.executemany("UPDATE tracks SET wave_offset = ? WHERE key = ?",
+                                       [(o, r[0]) for o, r in zip(new_offsets, live)])
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('waveform_file', ?)", (name,))
+
+            self._waves.close()
+            self._waves = WaveformStore(new_path)
+            os.remove(old_path)
+        except Exception as e:
+            print(f"Waveform Store Compaction Error: {e}")
+
+    def _migrate_legacy_json(self, legacy_cache):
+        """One-time import of the old monolithic ~/.wavecore_cache.json."""
+        try:
+            with open(legacy_cache, 'r', encoding='utf-8') as f:
+                full_cache = json.load(f)
+
+            with self._lock, self._conn:
+                for folder_path, tracks in full_cache.items():
+                    rows = [self._to_row(t) for t in tracks if t.get("path")]
+                    self._conn.executemany(self._insert_sql(), rows)
+                    self._conn.execute("INSERT OR REPLACE INTO folders (folder, scanned_at) VALUES (?, ?)",
+                                       (normalize_path(folder_path), 0))
+
+            # Keep the file around but out of the way so the migration runs only once
+            os.replace(legacy_cache, legacy_cache + ".migrated")
+            print(f"Migrated {len(full_cache)} cached folders into {self.db_path}")
+        except Exception as e:
+            print(f"Cache Migration Error: {e}")
+
+    # --- Row conversion ---
+    @staticmethod
+    def _insert_sql():
+        cols = ", ".join(("key", "folder") + TRACK_COLUMNS + EXTRA_COLUMNS)
+        marks = ", ".join("?" for _ in range(len(TRACK_COLUMNS) + len(EXTRA_COLUMNS) + 2))
+        return f"INSERT OR REPLACE INTO tracks ({cols}) VALUES ({marks})"
+
+    @staticmethod
+    def _split_analysis(analysis):
+        """Analysis dict -> (JSON text, float32 feature BLOB or None)."""
+        analysis = dict(analysis or {})
+        features = analysis.pop("features", None)
+        blob = np.asarray(features, dtype=np.float32).tobytes() if features is not None else None
+        return json.dumps(analysis), blob
+
+    def _to_row(self, track, stored=None):
+        """stored: the track's current (wave_offset, wave_len), reused if its waveform is unchanged."""
+        path = os.path.normpath(track["path"])
+        key = normalize_path(path)
+        wave_offset, wave_len = 0, 0
+        waveform = track.get("waveform")
+        if waveform is not None and len(waveform) > 0:
+            if stored is not None and self._same_waveform(stored, waveform):
+                wave_offset, wave_len = stored # E.g. a favorite toggle or metadata merge: no new copy
+            else:
+                wave_offset, wave_len = self._waves.append(waveform)
+        return (
+            key,
+            os.path.dirname(key),
+            path,
+            track.get("type", "audio"),
+            track.get("filename", os.path.basename(path)),
+            track.get("title", ""),
+            track.get("artist", ""),
+            track.get("album", ""),
+            track.get("genre", ""),
+            json.dumps(track.get("tags", []), ensure_ascii=False),
+            int(track.get("file_size", 0) or 0),
+            float(track.get("mtime", 0) or 0),
+            float(track.get("duration", 0) or 0),
+            str(track.get("channels", "")),
+            int(track.get("sample_rate", 0) or 0),
+            track.get("format", ""),
+            wave_offset,
+            wave_len,
+            int(bool(track.get("waveform_approx"))),
+            *self._split_analysis(track.get("analysis")),
+        )
+
+    def _same_waveform(self, stored, waveform):
+        offset, length = stored
+        if length != len(waveform):
+            return False
+        return np.array_equal(self._waves.view(offset, length), np.asarray(waveform, dtype=WaveformStore.DTYPE))
+
+    def _to_rows(self, tracks):
+        """
+        Rows of the tracks with a path, reusing the stored waveform ranges that still
+        match, and whether writing them changes any stored feature vector.
+        """
+        tracks = [t for t in tracks if t.get("path")]
+        keys = [normalize_path(t["path"]) for t in tracks]
+        waves, features = {}, {}
+        with self._lock:
+            for i in range(0, len(keys), 500): # Stay below SQLite's bound parameter limit
+                chunk = keys[i:i + 500]
+                marks = ", ".join("?" for _ in chunk)
+                for key, offset, length, blob in self._conn.execute(
+                        f"SELECT key, wave_offset, wave_len, features FROM tracks WHERE key IN ({marks})", chunk):
+                    if length:
+                        waves[key] = (offset, length)
+                    features[key] = blob
+        rows = [self._to_row(t, waves.get(key) if t.get("waveform") is not None else None)
+                for t, key in zip(tracks, keys)]
+        changed = any(row[_FEATURES] != features.get(key) for row, key in zip(rows, keys))
+        return rows, changed
+
+    def _from_row(self, row):
+        # Feature vectors are only read in bulk (get_feature_matrix), not per track
+        track = dict(zip(TRACK_COLUMNS, row))
+        track["tags"] = json.loads(track["tags"]) if track["tags"] else []
+        # Zero-copy view into the memory-mapped waveform store
+        track["waveform"] = self._waves.view(track.pop("wave_offset"), track.pop("wave_len"))
+        track["waveform_approx"] = bool(track.pop("wave_approx"))
+        track["analysis"] = json.loads(track["analysis"]) if track["analysis"] else {}
+        return track
+
+    # --- Reads ---
+    def has_folder(self, folder_path):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM folders WHERE folder = ?",
+                                     (normalize_path(folder_path),)).fetchone()
+        return row is not None
+
+    def get_folder_tracks(self, folder_path):
+        """Returns the list of track dicts stored for one folder, or None if never scanned."""
+        folder = normalize_path(folder_path)
+        if not self.has_folder(folder):
+            return None
+        cols = ", ".join(TRACK_COLUMNS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {cols} FROM tracks WHERE folder = ? ORDER BY filename", (folder,)
+            ).fetchall()
+        return [self._from_row(r) for r in rows]
+
+    @staticmethod
+    def _subtree_range(folder):
+        # Every folder key below 'folder' sorts in [folder + sep, folder + next char after sep).
+        # A drive or filesystem root ('/', 'c:\\') already ends with the separator.
+        sep = os.sep
+        base = folder[:-1] if folder.endswith(sep) else folder
+        return base + sep, base + chr(ord(sep) + 1)
+
+    def has_tree(self, root_path):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM folders WHERE folder = ? AND recursive = 1",
+                                     (normalize_path(root_path),)).fetchone()
+        return row is not None
+
+    def get_tree_tracks(self, root_path):
+        """Tracks of a folder and all its subfolders, or None if never scanned recursively."""
+        root = normalize_path(root_path)
+        if not self.has_tree(root):
+            return None
+        lo, hi = self._subtree_range(root)
+        cols = ", ".join(TRACK_COLUMNS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {cols} FROM tracks WHERE folder = ? OR (folder >= ? AND folder < ?) ORDER BY folder, filename",
+                (root, lo, hi)
+            ).fetchall()
+        return [self._from_row(r) for r in rows]
+
+    def get_track(self, path):
+        cols = ", ".join(TRACK_COLUMNS)
+        with self._lock:
+            row = self._conn.execute(f"SELECT {cols} FROM tracks WHERE key = ?",
+                                     (normalize_path(path),)).fetchone()
+        return self._from_row(row) if row else None
+
+    def get_tracks(self, paths):
+        """Track dicts for the given paths, in the same order (unknown paths are skipped)."""
+        cols = ", ".join(TRACK_COLUMNS)
+        keys = [normalize_path(p) for p in paths]
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500): # Stay below SQLite's bound parameter limit
+                chunk = keys[i:i + 500]
+                marks = ", ".join("?" for _ in chunk)
+                for row in self._conn.execute(f"SELECT key, {cols} FROM tracks WHERE key IN ({marks})", chunk):
+                    found[row[0]] = row[1:]
+        return [self._from_row(found[k]) for k in keys if k in found]
+
+    def get_feature_matrix(self, dim):
+        """
+        (paths, matrix): every track with a stored feature vector of length dim, the
+        vectors stacked into one contiguous (N, dim) float32 array.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, features FROM tracks WHERE length(features) = ? ORDER BY key", (dim * 4,)
+            ).fetchall()
+        paths = [r[0] for r in rows]
+        matrix = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float32).reshape(len(rows), dim)
+        return paths, matrix
+
+    def get_catalog_rows(self):
+        """
+        One tuple per indexed track, ordered by key: (key, path, type, title, artist,
+        album, genre, tags JSON, duration, channels, sample_rate, format). The
+        columns vault-wide search needs, without waveforms or analysis.
+        """
+        cols = ", ".join(CATALOG_COLUMNS)
+        with self._lock:
+            return self._conn.execute(f"SELECT key, {cols} FROM tracks ORDER BY key").fetchall()
+
+    # --- Writes ---
+    def upsert_track(self, track):
+        """Insert or update a single track in its own transaction."""
+        (row,), features_changed = self._to_rows([track])
+        with self._lock, self._conn:
+            self.revision += 1
+            self.features_revision += features_changed
+            self._conn.execute(self._insert_sql(), row)
+
+    def upsert_tracks(self, tracks):
+        """Insert or update many tracks in one transaction."""
+        rows, features_changed = self._to_rows(tracks)
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self.revision += 1
+            self.features_revision += features_changed
+            self._conn.executemany(self._insert_sql(), rows)
+
+    def set_waveform(self, path, waveform, approximate=False, analysis=None):
+        """
+        Swaps in a new waveform for an indexed track (e.g. the exact one replacing a
+        provisional one), and its analysis when given.
+        """
+        offset, length = self._waves.append(waveform)
+        analysis_json, features = self._split_analysis(analysis) if analysis is not None else (None, None)
+        with self._lock, self._conn:
+            self.revision += 1
+            self.features_revision += features is not None
+            cur = self._conn.execute(
+                "UPDATE tracks SET wave_offset = ?, wave_len = ?, wave_approx = ?, "
+                "analysis = COALESCE(?, analysis), features = COALESCE(?, features) WHERE key = ?",
+                (offset, length, int(approximate), analysis_json, features, normalize_path(path)))
+        return cur.rowcount > 0
+
+    def mark_folder_scanned(self, folder_path, scanned_at=0, recursive=False):
+        folder = normalize_path(folder_path)
+        upsert = ("INSERT INTO folders (folder, scanned_at, recursive) VALUES (?, ?, ?) "
+                  "ON CONFLICT(folder) DO UPDATE SET scanned_at = excluded.scanned_at, "
+                  "recursive = MAX(recursive, excluded.recursive)")
+        with self._lock, self._conn:
+            self.revision += 1
+            if recursive:
+                # A full tree scan also covers every subfolder (and its own subtree)
+                lo, hi = self._subtree_range(folder)
+                subfolders = self._conn.execute(
+                    "SELECT DISTINCT folder FROM tracks WHERE folder >= ? AND folder < ?", (lo, hi)
+                ).fetchall()
+                self._conn.executemany(upsert, [(f, scanned_at, 1) for (f,) in subfolders])
+            self._conn.execute(upsert, (folder, scanned_at, int(recursive)))
+
+    def replace_folder(self, folder_path, tracks, scanned_at=0):
+        """Atomically replaces every track of a folder with the given list."""
+        folder = normalize_path(folder_path)
+        rows, _ = self._to_rows(tracks)
+        with self._lock, self._conn:
+            self.revision += 1
+            self.features_revision += 1
+            self._conn.execute("DELETE FROM tracks WHERE folder = ?", (folder,))
+            self._conn.executemany(self._insert_sql(), rows)
+            self._conn.execute("INSERT OR REPLACE INTO folders (folder, scanned_at) VALUES (?, ?)", (folder, scanned_at))
+
+    def remove_track(self, path):
+        with self._lock, self._conn:
+            self.revision += 1
+            self.features_revision += 1
+            self._conn.execute("DELETE FROM tracks WHERE key = ?", (normalize_path(path),))
+
+    def move_path(self, old_path, new_path):
+        """
+        Re-keys a renamed/moved file, or every track and folder below a renamed/moved
+        folder, without touching the stored waveforms. Returns the number of tracks moved.
+        """
+        old, new = normalize_path(old_path), normalize_path(new_path)
+        new_full = os.path.normpath(os.path.abspath(new_path))
+        lo, hi = self._subtree_range(old)
+        with self._lock, self._conn:
+            self.revision += 1
+            self.features_revision += 1 # Paths change
+            rows = self._conn.execute(
+                "SELECT key, path FROM tracks WHERE key = ? OR (key >= ? AND key < ?)", (old, lo, hi)
+            ).fetchall()
+            updates = []
+            for key, path in rows:
+                # Keys and absolute paths have the same length, so the tail can be sliced off either
+                full = new_full + os.path.normpath(os.path.abspath(path))[len(old):]
+                new_key = new + key[len(old):]
+                old_name, new_name = os.path.basename(path), os.path.basename(full)
+                updates.append((new_key, os.path.dirname(new_key), full, new_name,
+                                old_name, new_name,
+                                os.path.splitext(old_name)[0], os.path.splitext(new_name)[0], key))
+            # Titles that were just the file name (with or without extension) follow the rename
+            self._conn.executemany(
+                "UPDATE OR REPLACE tracks SET key = ?, folder = ?, path = ?, filename = ?, "
+                "title = CASE WHEN title = ? THEN ? WHEN title = ? THEN ? ELSE title END "
+                "WHERE key = ?", updates)
+
+            folders = self._conn.execute(
+                "SELECT folder FROM folders WHERE folder = ? OR (folder >= ? AND folder < ?)", (old, lo, hi)
+            ).fetchall()
+            self._conn.executemany("UPDATE OR REPLACE folders SET folder = ? WHERE folder = ?",
+                                   [(new + f[len(old):], f) for (f,) in folders])
+        return len(updates)
+
+    def remove_path(self, path):
+        """Forgets a deleted file, or everything stored below a deleted folder."""
+        key = normalize_path(path)
+        lo, hi = self._subtree_range(key)
+        with self._lock, self._conn:
+            self.revision += 1
+            self.features_revision += 1
+            self._conn.execute("DELETE FROM tracks WHERE key = ? OR (key >= ? AND key < ?)", (key, lo, hi))
+            self._conn.execute("DELETE FROM folders WHERE folder = ? OR (folder >= ? AND folder < ?)", (key, lo, hi))
+
+    def invalidate_folder(self, folder_path):
+        folder = normalize_path(folder_path)
+        with self._lock, self._conn:
+            self.revision += 1
+            self.features_revision += 1
+            self._conn.execute("DELETE FROM tracks WHERE folder = ?", (folder,))
+            self._conn.execute("DELETE FROM folders WHERE folder = ?", (folder,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+            self._waves.close()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_library_index():
+    """Process-wide shared LibraryIndex (opened lazily)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = LibraryIndex()
+        return _index
@@ -0,0 +1,143 @@
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+import os
+from utils.asset_analysis import MEDIA_EXT
+from utils.scanner_thread import ScannerThread
+from utils.library_cache import save_track_to_cache, remove_tracks_from_cache, move_in_cache
+
+def _key(path):
+    return os.path.normcase(os.path.normpath(path))
+
+class LibraryWatcher(QObject):
+    """
+    Watches the folders currently listed and turns filesystem changes into
+    single-track updates instead of folder rescans:
+    - created/modified files are analyzed on their own,
+    - deleted files are dropped,
+    - files renamed or moved between watched folders are re-keyed without decoding.
+    Bursts of events are coalesced (DEBOUNCE_MS) before the folders are diffed.
+    The library index is updated here; listeners only apply the signals to their view.
+    """
+    tracks_changed = pyqtSignal(list) # Analyzed track dicts (new or modified files)
+    tracks_removed = pyqtSignal(list) # Paths
+    tracks_moved = pyqtSignal(list)   # (old_path, new_path) pairs
+
+    DEBOUNCE_MS = 300
+
+    def __init__(self, parent=None, workers=0):
+        super().__init__(parent)
+        self.workers = workers
+        self._snapshots = {} # Folder key -> {file key: (path, size, mtime)}
+        self._dirty = set()
+        self._scanners = []
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self.notify_changed)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self._flush)
+
+    def watch(self, folders, tracks=()):
+        """
+        Replaces the watched folders. The known state is seeded from the listed
+        tracks (path/file_size/mtime), so starting to watch costs no disk access.
+        """
+        watched = self._watcher.directories()
+        if watched:
+            self._watcher.removePaths(watched)
+        self._timer.stop()
+        self._dirty.clear()
+
+        folders = [f for f in folders if os.path.isdir(f)]
+        self._snapshots = {_key(f): {} for f in folders}
+        for track in tracks:
+            snap = self._snapshots.get(_key(os.path.dirname(track["path"])))
+            if snap is not None:
+                snap[_key(track["path"])] = (track["path"], track.get("file_size", 0), track.get("mtime", 0))
+        if folders:
+            self._watcher.addPaths(folders)
+
+    def notify_changed(self, folder):
+        """Queues a folder for diffing (also used when we wrote into it ourselves)."""
+        if _key(folder) in self._snapshots:
+            self._dirty.add(folder)
+            self._timer.start() # Restarting coalesces bursts of events
+
+    @staticmethod
+    def _snapshot(folder):
+        snap = {}
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in MEDIA_EXT:
+                    st = entry.stat()
+                    snap[_key(entry.path)] = (entry.path, st.st_size, st.st_mtime)
+        return snap
+
+    def _flush(self):
+        created, gone, modified = {}, {}, []
+        for folder in self._dirty:
+            folder_key = _key(folder)
+            old = self._snapshots.get(folder_key)
+            if old is None:
+                continue
+            try:
+                new = self._snapshot(folder)
+            except OSError:
+                new = {} # The folder itself was removed
+            self._snapshots[folder_key] = new
+
+            for key, entry in new.items():
+                prev = old.get(key)
+                if prev is None:
+                    created[key] = entry
+                elif prev[1:] != entry[1:]:
+                    modified.append(entry[0])
+            for key in old.keys() - new.keys():
+                gone[key] = old[key]
+        self._dirty.clear()
+
+        # A file that vanished and reappeared with the same size and mtime was renamed/moved
+        by_signature = {}
+        for key, (path, size, mtime) in gone.items():
+            by_signature.setdefault((size, mtime), []).append(key)
+        moved = []
+        for key, (path, size, mtime) in list(created.items()):
+            candidates = by_signature.get((size, mtime))
+            if candidates:
+                old_key = candidates.pop()
+                moved.append((gone.pop(old_key)[0], path))
+                del created[key]
+
+        if moved:
+            for old_path, new_path in moved:
+                move_in_cache(old_path, new_path)
+            self.tracks_moved.emit(moved)
+        if gone:
+            removed = [entry[0] for entry in gone.values()]
+            remove_tracks_from_cache(removed)
+            self.tracks_removed.emit(removed)
+
+        changed = [entry[0] for entry in created.values()] + modified
+        if changed:
+            self._analyze(changed)
+
+    def _analyze(self, paths):
+        scanner = ScannerThread(file_paths=paths, workers=self.workers if len(paths) > 1 else 0)
+        scanner.batch_found.connect(self._on_analyzed)
+        scanner.finished.connect(lambda s=scanner: self._scanners.remove(s))
+        self._scanners.append(scanner)
+        scanner.start()
+
+    def _on_analyzed(self, tracks):
+        for track in tracks:
+            save_track_to_cache(track)
+        # The view may have moved on to other folders meanwhile
+        visible = [t for t in tracks if _key(os.path.dirname(t["path"])) in self._snapshots]
+        if visible:
+            self.tracks_changed.emit(visible)
+
+    def stop(self):
+        self.watch([])
+        for scanner in list(self._scanners):
+            scanner.stop()
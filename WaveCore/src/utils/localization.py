@@ -31,11 +31,17 @@ TRANSLATIONS = {
         "dialog_select_folder": "Select Audio Folder",
         "status_loading": "Loading: {}",
         "status_loaded": "Loaded {} tracks.",
+        "status_closest_matches": "No exact matches, showing the {} closest names.",
         "ctx_new_folder": "New Folder",
         "ctx_rename": "Rename Folder",
         "ctx_delete": "Delete Folder",
         "ctx_rename_file": "Rename File",
         "ctx_delete_file": "Delete Selected ({})",
+        "ctx_scan_recursive": "Scan With Subfolders",
+        "ctx_find_similar": "Find Similar Sounds",
+        "placeholder_filter_tracks": "Filter tracks... (Ctrl+F)",
+        "btn_search_all": "All folders",
+        "tip_filter_syntax": "Words match name, artist, album, genre and tags.\nFields: dur:<2s  fmt:wav  ch:stereo  sr:>=48000  fav:yes\nRanges: dur:1s..3s   Exclude: -snare  -fmt:mp3",
         "menu_updates": "Check for Updates",
         "status_no_updates": "You already have the latest version.",
         "status_update_available": "Update Available",
@@ -139,11 +145,17 @@ TRANSLATIONS = {
         "dialog_select_folder": "Seleccionar Carpeta",
         "status_loading": "Cargando: {}",
         "status_loaded": "Se cargaron {} archivos.",
+        "status_closest_matches": "Sin coincidencias exactas, se muestran los {} nombres más parecidos.",
         "ctx_new_folder": "Nueva Carpeta",
         "ctx_rename": "Renombrar Carpeta",
         "ctx_delete": "Eliminar Carpeta",
         "ctx_rename_file": "Renombrar Archivo",
         "ctx_delete_file": "Eliminar Seleccionados ({})",
+        "ctx_scan_recursive": "Escanear con Subcarpetas",
+        "ctx_find_similar": "Buscar Sonidos Similares",
+        "placeholder_filter_tracks": "Filtrar pistas... (Ctrl+F)",
+        "btn_search_all": "Todas las carpetas",
+        "tip_filter_syntax": "Las palabras buscan en nombre, artista, álbum, género y etiquetas.\nCampos: dur:<2s  fmt:wav  ch:stereo  sr:>=48000  fav:yes\nRangos: dur:1s..3s   Excluir: -snare  -fmt:mp3",
         "menu_updates": "Actualizaciones",
         "status_no_updates": "Ya tienes la última versión.",
         "status_update_available": "Actualización Disponible",
@@ -245,11 +257,17 @@ TRANSLATIONS = {
         "dialog_select_folder": "Выбрать папку",
         "status_loading": "Загрузка: {}",
         "status_loaded": "Загружено {} файлов.",
+        "status_closest_matches": "Точных совпадений нет, показаны {} ближайших названий.",
         "ctx_new_folder": "Новая папка",
         "ctx_rename": "Переименовать папку",
         "ctx_delete": "Удалить папку",
         "ctx_rename_file": "Переименовать файл",
         "ctx_delete_file": "Удалить выбранные ({})",
+        "ctx_scan_recursive": "Сканировать с подпапками",
+        "ctx_find_similar": "Найти похожие звуки",
+        "placeholder_filter_tracks": "Фильтр треков... (Ctrl+F)",
+        "btn_search_all": "Все папки",
+        "tip_filter_syntax": "Слова ищутся в имени, исполнителе, альбоме, жанре и тегах.\nПоля: dur:<2s  fmt:wav  ch:stereo  sr:>=48000  fav:yes\nДиапазоны: dur:1s..3s   Исключить: -snare  -fmt:mp3",
         "menu_updates": "Обновления",
         "btn_welcome_start": "НАЧАТЬ",
         "dialog_welcome_title": "Добро пожаловать в WaveCore",
@@ -301,11 +319,17 @@ TRANSLATIONS = {
         "dialog_select_folder": "选择文件夹",
         "status_loading": "正在加载：{}",
         "status_loaded": "已加载 {} 个文件。",
+        "status_closest_matches": "没有完全匹配，显示 {} 个最接近的名称。",
         "ctx_new_folder": "新建文件夹",
         "ctx_rename": "重命名文件夹",
         "ctx_delete": "删除文件夹",
         "ctx_rename_file": "重命名文件",
         "ctx_delete_file": "删除所选 ({})",
+        "ctx_scan_recursive": "扫描（含子文件夹）",
+        "ctx_find_similar": "查找相似声音",
+        "placeholder_filter_tracks": "筛选曲目... (Ctrl+F)",
+        "btn_search_all": "所有文件夹",
+        "tip_filter_syntax": "关键词匹配名称、艺术家、专辑、流派和标签。\n字段: dur:<2s  fmt:wav  ch:stereo  sr:>=48000  fav:yes\n范围: dur:1s..3s   排除: -snare  -fmt:mp3",
         "menu_updates": "检查更新",
         "btn_welcome_start": "开始使用",
         "dialog_welcome_title": "欢迎使用 WaveCore",
@@ -357,11 +381,17 @@ TRANSLATIONS = {
         "dialog_select_folder": "Sélectionner le dossier",
         "status_loading": "Chargement : {}",
         "status_loaded": "{} fichiers chargés.",
+        "status_closest_matches": "Aucune correspondance exacte, affichage des {} noms les plus proches.",
         "ctx_new_folder": "Nouveau dossier",
         "ctx_rename": "Renommer le dossier",
         "ctx_delete": "Supprimer le dossier",
         "ctx_rename_file": "Renommer le fichier",
         "ctx_delete_file": "Supprimer la sélection ({})",
+        "ctx_scan_recursive": "Analyser avec les sous-dossiers",
+        "ctx_find_similar": "Trouver des sons similaires",
+        "placeholder_filter_tracks": "Filtrer les pistes... (Ctrl+F)",
+        "btn_search_all": "Tous les dossiers",
+        "tip_filter_syntax": "Les mots cherchent dans le nom, l'artiste, l'album, le genre et les tags.\nChamps : dur:<2s  fmt:wav  ch:stereo  sr:>=48000  fav:yes\nPlages : dur:1s..3s   Exclure : -snare  -fmt:mp3",
         "menu_updates": "Mises à jour",
         "btn_welcome_start": "COMMENCER",
         "dialog_welcome_title": "Bienvenue sur WaveCore",
@@ -6,13 +6,8 @@ from mutagen.flac import FLAC
 from mutagen.oggvorbis import OggVorbis
 from mutagen.wave import WAVE
 
-def get_track_metadata(file_path):
-    """
-    Reads metadata from an audio file.
-    Returns a dict with keys: 
-    title, artist, album, genre, duration, bitrate, sample_rate, channels.
-    """
-    meta = {
+def _default_meta(file_path):
+    return {
         "title": os.path.basename(file_path), # Default to filename
         "artist": "",
         "album": "",
@@ -22,59 +17,121 @@ def get_track_metadata(file_path):
         "sample_rate": 0,
         "channels": 0
     }
-    
+
+def _read_mutagen(f, meta):
+    """Fills meta from an opened mutagen.File object."""
+    # Duration/Technical
+    if f.info:
+        meta["duration"] = getattr(f.info, "length", 0)
+        meta["bitrate"] = getattr(f.info, "bitrate", 0) / 1000.0 # kbps
+        meta["sample_rate"] = getattr(f.info, "sample_rate", 0)
+        meta["channels"] = getattr(f.info, "channels", 0)
+
+    # Tags
+    # Mutagen handles different formats differently.
+    # EasyID3 is good for MP3 standard tags.
+    tags = f.tags or {}
+
+    # Helper to extract first item of list or string
+    def get_tag(keys):
+        for key in keys:
+            if key in tags:
+                val = tags[key]
+                if isinstance(val, list):
+                    return str(val[0])
+                return str(val)
+        return ""
+
+    # Common keys across formats (ID3 vs Vorbis vs etc)
+    # ID3: TIT2, TPE1, TALB, TCON
+    # Vorbis: TITLE, ARTIST, ALBUM, GENRE
+
+    # Title
+    t = get_tag(["TIT2", "title", "TITLE"])
+    if t: meta["title"] = t
+
+    # Artist
+    a = get_tag(["TPE1", "artist", "ARTIST"])
+    if a: meta["artist"] = a
+
+    # Album
+    al = get_tag(["TALB", "album", "ALBUM"])
+    if al: meta["album"] = al
+
+    # Genre
+    g = get_tag(["TCON", "genre", "GENRE"])
+    if g: meta["genre"] = g
+
+def get_track_metadata(file_path):
+    """
+    Reads metadata from an audio file.
+    Returns a dict with keys:
+    title, artist, album, genre, duration, bitrate, sample_rate, channels.
+    """
+    meta = _default_meta(file_path)
+
     if not os.path.exists(file_path):
         return meta
-        
+
     try:
         # Generic Mutagen Load
         f = mutagen.File(file_path)
-        if not f:
+        if f is None:
             return meta
-            
-        # Duration/Technical
-        if f.info:
-            meta["duration"] = getattr(f.info, "length", 0)
-            meta["bitrate"] = getattr(f.info, "bitrate", 0) / 1000.0 # kbps
-            meta["sample_rate"] = getattr(f.info, "sample_rate", 0)
-            meta["channels"] = getattr(f.info, "channels", 0)
-            
-        # Tags
-        # Mutagen handles different formats differently.
-        # EasyID3 is good for MP3 standard tags.
-        tags = f.tags or {}
-        
-        # Helper to extract first item of list or string
-        def get_tag(keys):
-            for key in keys:
-                if key in tags:
-                    val = tags[key]
-                    if isinstance(val, list):
-                        return str(val[0])
-                    return str(val)
-            return ""
-            
-        # Common keys across formats (ID3 vs Vorbis vs etc)
-        # ID3: TIT2, TPE1, TALB, TCON
-        # Vorbis: TITLE, ARTIST, ALBUM, GENRE
-        
-        # Title
-        t = get_tag(["TIT2", "title", "TITLE"])
-        if t: meta["title"] = t
-        
-        # Artist
-        a = get_tag(["TPE1", "artist", "ARTIST"])
-        if a: meta["artist"] = a
-        
-        # Album
-        al = get_tag(["TALB", "album", "ALBUM"])
-        if al: meta["album"] = al
-        
-        # Genre
-        g = get_tag(["TCON", "genre", "GENRE"])
-        if g: meta["genre"] = g
-        
+        _read_mutagen(f, meta)
+
     except Exception as e:
         print(f"Metadata error {file_path}: {e}")
-        
+
+    return meta
+
+def probe_audio(file_path, waveform_points=None, approx_over=0):
+    """
+    Single-pass probe of an audio file: format, sample rate, channels, duration and
+    tags come from one open file handle. Samples are only decoded (from that same
+    handle) when waveform_points is given, or when the header gave no duration.
+    Files longer than approx_over seconds (0 = never) get a seek-sampled, provisional
+    waveform and "waveform_approx" set to True.
+    Returns the get_track_metadata dict plus "format", "waveform" (None unless decoded)
+    and "analysis" (block analyzer results from the same decode, see analyze_audio).
+    """
+    meta = _default_meta(file_path)
+    meta["format"] = os.path.splitext(file_path)[1].lower().replace(".", "")
+    meta["waveform"] = None
+    meta["waveform_approx"] = False
+    meta["analysis"] = {}
+
+    try:
+        with open(file_path, 'rb') as fh:
+            try:
+                f = mutagen.File(fh)
+                if f is not None: # Untagged files are falsy but still carry .info
+                    _read_mutagen(f, meta)
+            except Exception as e:
+                print(f"Metadata error {file_path}: {e}")
+
+            if waveform_points:
+                from utils.audio_loader import analyze_audio
+                fh.seek(0)
+                approximate = bool(approx_over) and meta["duration"] > approx_over
+                data, duration, channels, analysis = analyze_audio(fh, points=waveform_points, approximate=approximate)
+                meta["waveform_approx"] = approximate
+                meta["analysis"] = analysis
+                meta["waveform"] = data
+                if not meta["duration"]: meta["duration"] = duration
+                if not meta["channels"]: meta["channels"] = channels
+            elif not meta["duration"] or not meta["channels"]:
+                # Header-only fallback through libsndfile, still no decoding
+                import soundfile as sf
+                fh.seek(0)
+                try:
+                    with sf.SoundFile(fh) as sfile:
+                        if not meta["duration"]: meta["duration"] = sfile.frames / sfile.samplerate
+                        if not meta["channels"]: meta["channels"] = sfile.channels
+                        if not meta["sample_rate"]: meta["sample_rate"] = sfile.samplerate
+                except Exception:
+                    pass
+    except OSError as e:
+        print(f"Probe error {file_path}: {e}")
+
     return meta
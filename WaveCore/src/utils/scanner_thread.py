@@ -1,125 +1,315 @@
-
 from PyQt6.QtCore import QThread, pyqtSignal
 import os
 import time
-from core.asset_models import AudioAsset, VideoAsset, ImageAsset
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, CancelledError, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from utils.asset_analysis import (analyze_file, describe_file, analyze_details,
+                                  AUDIO_EXT, VIDEO_EXT, IMAGE_EXT, MEDIA_EXT)
+from utils.dir_walker import walk_entries
+
+# Default number of analysis processes (0/1 = analyze inside the scanner thread)
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def get_analysis_pool(workers):
+    """Shared process pool, re-created when the worker count changes or it broke."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and (_pool_workers != workers or getattr(_pool, "_broken", False)):
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
 
 class ScannerThread(QThread):
     # Signals
-    batch_found = pyqtSignal(list) 
+    batch_found = pyqtSignal(list)
+    details_found = pyqtSignal(list) # Partial track dicts to merge into listed rows (progressive mode)
+    tracks_removed = pyqtSignal(list) # Paths that vanished since the cached scan (delta mode)
     finished_scan = pyqtSignal(int)
 
-    def __init__(self, folder_path=None, file_paths=None):
+    BATCH_SIZE = 20
+
+    def __init__(self, folder_path=None, file_paths=None, known_tracks=None, workers=0, recursive=False,
+                 approx_over=0, progressive=False):
+        """
+        :param known_tracks: Optional list of previously cached track dicts for folder_path.
+                             When given, the scan runs in delta mode: only new or changed
+                             files (by mtime/file_size) are analyzed and emitted, and files
+                             that no longer exist are reported through tracks_removed.
+        :param workers: Number of analysis processes. With 2 or more, files are fanned out
+                        to a ProcessPoolExecutor and results are emitted in completion order;
+                        otherwise (or if the pool fails) files are analyzed in this thread.
+        :param recursive: Walk the whole tree under folder_path concurrently; files are
+                          analyzed as they are discovered, not after the walk.
+        :param approx_over: Audio longer than this (seconds, 0 = never) gets a fast,
+                            seek-sampled waveform flagged "waveform_approx".
+        :param progressive: Two-stage scan. batch_found first delivers cheap rows (stat and
+                            header data, "analysis_pending" set) as files are listed; the
+                            waveforms/thumbnails follow through details_found.
+                            Otherwise batch_found delivers complete rows only.
+        """
         super().__init__()
         self.folder_path = folder_path
         self.file_paths = file_paths
+        self.workers = workers
+        self.recursive = recursive
+        self.approx_over = approx_over
+        self.progressive = progressive
         self._is_running = True
-        
-        self.audio_ext = ('.mp3', '.wav', '.flac', '.ogg', '.m4a', '.aiff')
-        self.video_ext = ('.mp4', '.mov', '.avi', '.mkv', '.webm')
-        self.image_ext = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+        self.known = None
+        if known_tracks is not None:
+            self.known = {os.path.normcase(os.path.normpath(t["path"])): t for t in known_tracks}
+
+        self.audio_ext = AUDIO_EXT
+        self.video_ext = VIDEO_EXT
+        self.image_ext = IMAGE_EXT
 
     def run(self):
-        batch_size = 20
-        current_batch = []
-        total_count = 0
-        
+        self._batch = []
+        self._details = []
+        self._total_count = 0
+
         try:
-            if self.folder_path:
-                with os.scandir(self.folder_path) as it:
-                    for entry in it:
-                        if not self._is_running: break
-                        if entry.is_file():
-                            ext = os.path.splitext(entry.name)[1].lower()
-                            if ext in self.audio_ext or ext in self.video_ext or ext in self.image_ext:
-                                self._process_file(entry.path, entry.name, ext, current_batch)
-                                total_count += 1
-                                if len(current_batch) >= batch_size:
-                                    self.batch_found.emit(current_batch)
-                                    current_batch = []
-                                    time.sleep(0.001)
-            elif self.file_paths:
-                for path in self.file_paths:
-                    if not self._is_running: break
-                    if os.path.exists(path):
-                        ext = os.path.splitext(path)[1].lower()
-                        if ext in self.audio_ext or ext in self.video_ext or ext in self.image_ext:
-                            self._process_file(path, os.path.basename(path), ext, current_batch)
-                            total_count += 1
-                            if len(current_batch) >= batch_size:
-                                self.batch_found.emit(current_batch)
-                                current_batch = []
-
-            if current_batch:
-                self.batch_found.emit(current_batch)
-                
+            jobs = self._iter_jobs()
+            if self.workers and self.workers > 1:
+                self._run_pool(jobs)
+            else:
+                self._run_in_thread(jobs)
+
+            self._flush_batch()
+            if self._details:
+                self.details_found.emit(self._details)
+
         except Exception as e:
             print(f"Scanner Error: {e}")
             import traceback
             traceback.print_exc()
-            
-        self.finished_scan.emit(total_count)
 
-    def _process_file(self, path, name, ext, batch):
+        self.finished_scan.emit(self._total_count)
+
+    def _iter_jobs(self):
+        """Yields (path, name, ext) of every file that needs analysis."""
+        if self.folder_path:
+            seen = set()
+            if self.recursive:
+                entries = walk_entries(self.folder_path, should_stop=self.was_cancelled)
+            else:
+                entries = self._list_folder(self.folder_path)
+            for entry in entries:
+                if not self._is_running: return
+                if entry.is_file():
+                    ext = os.path.splitext(entry.name)[1].lower()
+                    if ext in MEDIA_EXT:
+                        if self.known is not None:
+                            key = os.path.normcase(os.path.normpath(entry.path))
+                            seen.add(key)
+                            if self._is_unchanged(entry, self.known.get(key)):
+                                self._total_count += 1
+                                continue
+                        yield entry.path, entry.name, ext
+
+            # Only trust the removal list if the listing was not interrupted
+            if self.known is not None and self._is_running:
+                removed = [t["path"] for key, t in self.known.items() if key not in seen]
+                if removed:
+                    self.tracks_removed.emit(removed)
+        elif self.file_paths:
+            for path in self.file_paths:
+                if not self._is_running: return
+                if os.path.exists(path):
+                    ext = os.path.splitext(path)[1].lower()
+                    if ext in MEDIA_EXT:
+                        yield path, os.path.basename(path), ext
+
+    @staticmethod
+    def _list_folder(path):
+        with os.scandir(path) as it:
+            yield from it
+
+    def _add_result(self, track_data):
+        self._total_count += 1
+        if track_data:
+            self._batch.append(track_data)
+        if len(self._batch) >= self.BATCH_SIZE:
+            self._flush_batch()
+            time.sleep(0.001)
+
+    def _flush_batch(self):
+        if self._batch:
+            self.batch_found.emit(self._batch)
+            self._batch = []
+
+    def _add_details(self, update):
+        if update:
+            self._details.append(update)
+        if len(self._details) >= self.BATCH_SIZE:
+            self.details_found.emit(self._details)
+            self._details = []
+            time.sleep(0.001)
+
+    def _list_job(self, job):
+        """Progressive stage 1: emits the cheap row. Returns the stage 2 task, or None."""
+        track = describe_file(*job)
+        self._add_result(track)
+        if track and track.get("analysis_pending"):
+            path, name, ext = job
+            return analyze_details, (path, ext, self.approx_over, track.get("duration", 0))
+        return None
+
+    def _task(self, job):
+        """(function, args) producing the result of a job; runs in a worker or in-thread."""
+        if self.progressive:
+            return self._list_job(job)
+        return analyze_file, (*job, self.approx_over)
+
+    def _add_task_result(self, result):
+        if self.progressive:
+            self._add_details(result)
+        else:
+            self._add_result(result)
+
+    def _run_in_thread(self, jobs):
+        tasks = []
+        for job in jobs:
+            if not self._is_running: return
+            task = self._task(job)
+            if task is None: continue
+            if self.progressive:
+                # List everything before decoding anything
+                tasks.append(task)
+            else:
+                self._add_task_result(task[0](*task[1]))
+        self._flush_batch()
+        self._run_tasks(tasks)
+
+    def _run_tasks(self, tasks):
+        for func, args in tasks:
+            if not self._is_running: break
+            self._add_task_result(func(*args))
+
+    def _run_pool(self, jobs):
         try:
-            asset = None
-            
-            if ext in self.audio_ext:
-                from utils.audio_loader import load_waveform_data
-                from utils.metadata_reader import get_track_metadata
-                
-                # Load Audio Data
-                try:
-                    data, duration, chans = load_waveform_data(path, points=400)
-                except:
-                    data, duration, chans = None, 0, 0
-                
-                meta = get_track_metadata(path)
-                final_duration = meta.get("duration", 0)
-                if final_duration == 0: final_duration = duration
-                
-                asset = AudioAsset(path, duration=final_duration)
-                asset.waveform = data
-                asset.channels = "Stereo" if chans > 1 else "Mono"
-                asset.title = meta.get("title", name) # Override title if metadata exists
-                
-            elif ext in self.video_ext:
-                from utils.video_utils import VideoMetadataExtractor
-                
-                # Extract Metadata & Thumbnail
-                extractor = VideoMetadataExtractor()
-                meta = extractor.get_metadata(path)
-                
-                asset = VideoAsset(path)
-                asset.duration = meta.get("duration", 0)
-                asset.width = meta.get("width", 0)
-                asset.height = meta.get("height", 0)
-                asset.fps = meta.get("fps", 0)
-                asset.thumbnail_path = meta.get("thumbnail_path", "")
-                
-                # Title from filename if not in metadata (OpenCV doesn't give title usually)
-                asset.title = name
-                
-            elif ext in self.image_ext:
-                # Placeholder for Image Extraction
-                asset = ImageAsset(path)
-            
-            if asset:
-                # COMPATIBILITY LAYER:
-                # Convert the object to a dict structure that LibraryModel expects
-                # LibraryModel expects: path, title, duration, format, channels, waveform, is_favorite
-                
-                track_data = asset.to_dict()
-                
-                # Add extra fields expected by current UI if missing
-                if "artist" not in track_data: track_data["artist"] = ""
-                if "album" not in track_data: track_data["album"] = ""
-                if "channels" not in track_data: track_data["channels"] = ""
-                
-                batch.append(track_data)
-                
+            pool = get_analysis_pool(self.workers)
         except Exception as e:
-            print(f"Error processing {name}: {e}")
+            print(f"Analysis pool unavailable ({e}), scanning in-thread")
+            self._run_in_thread(jobs)
+            return
+
+        # Keep a bounded number of tasks in flight so stop() is honoured quickly. A
+        # progressive scan still lists every file right away (rows appear while the
+        # workers decode); its detail tasks wait in the backlog for a free slot.
+        max_in_flight = self.workers * 4
+        backlog = deque()
+        pending = {}
+        try:
+            for job in jobs:
+                if not self._is_running: break
+                task = self._task(job)
+                if task is None: continue
+                backlog.append(task)
+                self._submit(pool, backlog, pending, max_in_flight)
+                if self.progressive:
+                    self._collect(pending, timeout=0)
+                else:
+                    # Read the listing only as fast as the workers go
+                    while self._is_running and backlog:
+                        self._collect(pending, timeout=0.25)
+                        self._submit(pool, backlog, pending, max_in_flight)
+
+            self._flush_batch()
+            while self._is_running and (backlog or pending):
+                self._submit(pool, backlog, pending, max_in_flight)
+                self._collect(pending, timeout=0.25)
+        except BrokenProcessPool as e:
+            # A worker died (or processes can't be spawned here): finish in-thread
+            print(f"Analysis pool failed ({e}), continuing in-thread")
+            tasks = list(pending.values()) + list(backlog)
+            pending.clear()
+            self._run_tasks(tasks)
+            self._run_in_thread(jobs)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _submit(pool, backlog, pending, max_in_flight):
+        while backlog and len(pending) < max_in_flight:
+            task = backlog.popleft()
+            try:
+                future = pool.submit(task[0], *task[1])
+            except BrokenProcessPool:
+                future = Future() # Placeholder so the task is retried in-thread
+                pending[future] = task
+                raise
+            pending[future] = task
+
+    def _collect(self, pending, timeout):
+        """Handles finished futures; waits up to timeout for the first one."""
+        if not pending:
+            return
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            task = pending.pop(future)
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                pending[future] = task
+                raise
+            except CancelledError:
+                continue
+            except Exception as e:
+                print(f"Analysis task failed: {e}")
+                # A listed row must not stay pending forever
+                result = {"path": task[1][0], "analysis_pending": False} if self.progressive else None
+            self._add_task_result(result)
+
+    @staticmethod
+    def _is_unchanged(entry, known):
+        if known is None:
+            return False
+        try:
+            st = entry.stat()
+        except OSError:
+            return False
+        return st.st_mtime == known.get("mtime") and st.st_size == known.get("file_size")
+
+    def was_cancelled(self):
+        return not self._is_running
+
+    def stop(self):
+        self._is_running = False
+        self.wait()
+
+
+class FolderTreeThread(QThread):
+    """Lists every subfolder under root_path (concurrently) for the library sidebar."""
+    folders_found = pyqtSignal(list)
+
+    def __init__(self, root_path):
+        super().__init__()
+        self.root_path = root_path
+        self._is_running = True
+
+    def run(self):
+        batch = []
+        for entry in walk_entries(self.root_path, include_dirs=True, should_stop=lambda: not self._is_running):
+            if entry.is_dir():
+                # Parents are always reported before their children
+                batch.append(entry.path)
+                if len(batch) >= 200:
+                    self.folders_found.emit(batch)
+                    batch = []
+        if batch:
+            self.folders_found.emit(batch)
 
     def stop(self):
         self._is_running = False
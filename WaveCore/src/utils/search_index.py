@@ -0,0 +1,176 @@
+from itertools import chain
+import bisect
+import os
+import re
+import numpy as np
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+def tokenize(text):
+    """Lower-case words of text: 'Kick_Hard-02.wav' -> ['kick', 'hard', '02', 'wav']."""
+    return _WORD_RE.findall(text.lower()) if text else []
+
+def search_text(track):
+    """Searchable text of a track dict: title, file name, artist, album, genre and tags."""
+    parts = [track.get("title") or "", os.path.basename(track.get("path") or "")]
+    parts.extend(track.get(key) or "" for key in ("artist", "album", "genre"))
+    tags = track.get("tags")
+    if isinstance(tags, (list, tuple)):
+        parts.extend(str(t) for t in tags)
+    elif tags:
+        parts.append(str(tags))
+    return " ".join(parts)
+
+def _prefix_range(tokens, word):
+    """[lo, hi) of the sorted tokens starting with word."""
+    lo = bisect.bisect_left(tokens, word)
+    return lo, bisect.bisect_left(tokens, word[:-1] + chr(ord(word[-1]) + 1), lo)
+
+class SearchIndex:
+    """
+    Token/prefix inverted index for as-you-type filtering.
+
+    Documents are integer ids (the caller's stable row ids) with their searchable
+    text. The index is packed into two arrays: the tokens sorted, and the doc ids
+    of every token laid end to end (CSR offsets). The tokens starting with a typed
+    prefix are one contiguous range (bisect), so their documents are one slice of
+    the flat array, written into a boolean mask in a single NumPy call.
+
+    Documents added after the last pack live in small per-token sets (the delta)
+    and removed/re-indexed ones are masked out, so scanner batches are indexed as
+    they arrive; the delta is folded into the packed arrays once it grows.
+    search() returns a boolean mask over doc ids; masks of each prefix are memoized
+    until the index changes, so the words already typed cost nothing.
+    """
+    PACK_MIN = 4096 # Delta docs tolerated before repacking (or 1/8 of the index if larger)
+    MEMO_SIZE = 32
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._postings = {}   # Token -> set of doc ids (emptied sets are kept until the next clear)
+        self._doc_tokens = {} # Doc id -> tokens, for removal
+        self._size = 0        # Mask length: highest doc id + 1
+        self._all_tokens = []
+        self._unsorted = False
+
+        # Packed snapshot (see class docstring) and what changed since
+        self._tokens = []
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._flat = np.zeros(0, dtype=np.int64)
+        self._delta = {}      # Token -> set of doc ids added since the pack
+        self._delta_docs = set()
+        self._delta_tokens = None # Sorted delta tokens (built on demand)
+        self._dead = set()    # Packed doc ids removed or re-indexed since the pack
+        self._memo = {}
+
+    def __len__(self):
+        return len(self._doc_tokens)
+
+    def add(self, doc, text):
+        self.add_many([(doc, text)])
+
+    def add_many(self, docs):
+        """Indexes (doc id, text) pairs; a doc id already indexed is re-indexed."""
+        postings, delta = self._postings, self._delta
+        for doc, text in docs:
+            if doc in self._doc_tokens:
+                self._discard(doc)
+            tokens = tuple(set(tokenize(text)))
+            self._doc_tokens[doc] = tokens
+            self._delta_docs.add(doc)
+            for token in tokens:
+                ids = postings.get(token)
+                if ids is None:
+                    ids = postings[token] = set()
+                    self._all_tokens.append(token)
+                    self._unsorted = True
+                ids.add(doc)
+                ids = delta.get(token)
+                if ids is None:
+                    ids = delta[token] = set()
+                    self._delta_tokens = None
+                ids.add(doc)
+            if doc >= self._size:
+                self._size = doc + 1
+        self._memo.clear()
+
+    def remove(self, docs):
+        for doc in docs:
+            self._discard(doc)
+        self._memo.clear()
+
+    def _discard(self, doc):
+        tokens = self._doc_tokens.pop(doc, ())
+        for token in tokens:
+            self._postings[token].discard(doc)
+        if doc in self._delta_docs:
+            self._delta_docs.discard(doc)
+            for token in tokens:
+                self._delta[token].discard(doc)
+        # Also dead when it sits in the packed arrays (harmless otherwise)
+        self._dead.add(doc)
+
+    # --- Packing ---
+    def pack(self):
+        """
+        Folds the delta into the packed arrays. Done by search() when the delta has
+        grown; call it after bulk loads (end of a scan) so no keystroke pays for it.
+        """
+        if not self._delta_docs and not self._dead:
+            return
+        if self._unsorted:
+            # New tokens were appended to a sorted list: Timsort merges the run cheaply
+            self._all_tokens.sort()
+            self._unsorted = False
+        tokens = list(self._all_tokens)
+        postings = self._postings
+        lengths = np.fromiter((len(postings[t]) for t in tokens), dtype=np.int64, count=len(tokens))
+        offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        self._flat = np.fromiter(chain.from_iterable(postings[t] for t in tokens), dtype=np.int64, count=offsets[-1])
+        self._tokens, self._offsets = tokens, offsets
+        self._delta, self._delta_docs, self._delta_tokens = {}, set(), None
+        self._dead = set()
+        self._memo.clear()
+
+    def _needs_pack(self):
+        return len(self._delta_docs) + len(self._dead) > max(self.PACK_MIN, len(self) // 8)
+
+    # --- Queries ---
+    def _prefix_mask(self, word):
+        mask = self._memo.get(word)
+        if mask is not None:
+            return mask
+        mask = np.zeros(self._size, dtype=bool)
+        lo, hi = _prefix_range(self._tokens, word)
+        mask[self._flat[self._offsets[lo]:self._offsets[hi]]] = True
+        if self._dead:
+            mask[np.fromiter(self._dead, dtype=np.int64, count=len(self._dead))] = False
+        if self._delta_docs:
+            if self._delta_tokens is None:
+                self._delta_tokens = sorted(self._delta)
+            lo, hi = _prefix_range(self._delta_tokens, word)
+            ids = set().union(*(self._delta[t] for t in self._delta_tokens[lo:hi]))
+            mask[np.fromiter(ids, dtype=np.int64, count=len(ids))] = True
+        if len(self._memo) >= self.MEMO_SIZE:
+            self._memo.clear()
+        self._memo[word] = mask
+        return mask
+
+    def search(self, text):
+        """
+        Boolean mask over doc ids (True = matches every word of text as a prefix),
+        or None when text has no words (no filter). Shared: do not modify it.
+        """
+        words = set(tokenize(text))
+        if not words:
+            return None
+        if self._needs_pack():
+            self.pack()
+        result = None
+        for word in words:
+            mask = self._prefix_mask(word)
+            result = mask if result is None else result & mask
+        return result
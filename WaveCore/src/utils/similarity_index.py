@@ -0,0 +1,110 @@
+import threading
+import time
+import numpy as np
+from utils.block_analyzers import FeatureAnalyzer
+from utils.library_index import get_library_index, normalize_path
+
+class SimilarityIndex:
+    """
+    "Find sounds like this" over every indexed track with a feature vector
+    (FeatureAnalyzer, computed at scan time).
+
+    The vectors live in one contiguous (N, D) float32 matrix, standardized per
+    dimension (so loud MFCC 0 does not drown the rest) and L2-normalized, which
+    turns cosine similarity into a single matrix-vector product. With D = 32 a
+    full scan of 100k tracks is a few milliseconds, so no coarse pre-filter is
+    needed.
+
+    The matrix follows LibraryIndex.features_revision (writes that add, remove or
+    change feature vectors, not every write): when it has changed, at most every
+    REFRESH_INTERVAL seconds, it is rebuilt on a background thread and swapped in,
+    and queries meanwhile use the previous one (as in LibraryCatalog).
+    """
+    REFRESH_INTERVAL = 2.0
+
+    def __init__(self, index=None):
+        self._index = index
+        self._lock = threading.Lock()
+        self._revision = None
+        self._refreshed_at = 0.0
+        self._paths = []
+        self._row_of = {}
+        self._matrix = np.zeros((0, FeatureAnalyzer.FEATURE_DIM), dtype=np.float32)
+        self._loading = False
+        self._loaded = threading.Event()
+
+    def _refresh(self):
+        """Starts a background rebuild when features changed (waits for it if nothing is loaded yet)."""
+        index = self._index or get_library_index()
+        stale = (self._revision != index.features_revision and
+                 time.monotonic() - self._refreshed_at >= self.REFRESH_INTERVAL)
+        if stale and not self._loading:
+            self._loading = True
+            self._loaded.clear()
+            threading.Thread(target=self._load, args=(index,), daemon=True).start()
+        if self._revision is None:
+            self._loaded.wait()
+
+    def _load(self, index):
+        try:
+            revision = index.features_revision # Read first: a write during the load triggers another refresh
+            paths, raw = index.get_feature_matrix(FeatureAnalyzer.FEATURE_DIM)
+
+            matrix = raw.astype(np.float32) # Writable copy (raw is a view on the SQLite bytes)
+            if len(matrix):
+                matrix -= matrix.mean(axis=0)
+                std = matrix.std(axis=0)
+                matrix /= np.where(std > 1e-6, std, 1.0)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix /= np.where(norms > 0, norms, 1.0)
+            row_of = {normalize_path(p): i for i, p in enumerate(paths)}
+            matrix = np.ascontiguousarray(matrix)
+
+            with self._lock:
+                self._paths, self._row_of, self._matrix = paths, row_of, matrix
+                self._revision = revision
+                self._refreshed_at = time.monotonic()
+        except Exception as e:
+            print(f"Similarity index load failed: {e}")
+        finally:
+            self._loading = False
+            self._loaded.set()
+
+    def __len__(self):
+        self._refresh()
+        with self._lock:
+            return len(self._paths)
+
+    def has_features(self, path):
+        self._refresh()
+        with self._lock:
+            return normalize_path(path) in self._row_of
+
+    def query(self, path, k=50):
+        """
+        The k tracks most similar to path, as (path, score) pairs sorted best first
+        (score = cosine similarity, 1.0 = identical). Empty if path has no features.
+        """
+        self._refresh()
+        with self._lock:
+            row = self._row_of.get(normalize_path(path))
+            if row is None:
+                return []
+            scores = self._matrix @ self._matrix[row]
+            scores[row] = -np.inf # Not similar to itself
+            k = min(k, len(scores) - 1)
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._paths[i], float(scores[i])) for i in top]
+
+
+_similarity_index = None
+
+def get_similarity_index():
+    """Process-wide SimilarityIndex over the shared library index."""
+    global _similarity_index
+    if _similarity_index is None:
+        _similarity_index = SimilarityIndex()
+    return _similarity_index
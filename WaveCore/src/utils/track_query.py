@@ -0,0 +1,200 @@
+"""
+Library search queries: free words plus field terms, e.g.
+
+    whoosh fast dur:<2s fmt:wav ch:stereo sr:>=48000 fav:yes
+
+Words go to the text index (SearchIndex). Field terms become NumPy boolean masks
+over the columns of a table: any object with column(name) (one array per column,
+int codes for text columns) and values(name) (the strings behind the codes), such
+as TrackStore (the listed folder) or LibraryCatalog (the whole library).
+
+    dur / duration     seconds: 2s, 500ms, 1.5m, 1:30; bare numbers are seconds
+    sr / rate          Hz: 48000, 48k, 44.1khz
+    fmt / format / ext file format: wav, mp3 (comma = any of: fmt:wav,aif)
+    ch / channels      mono, stereo (or 1, 2)
+    fav / favorite     yes / no
+
+Numbers take <, <=, >, >=, = or a range a..b (dur:1s..3s); dur:2s alone matches
+what the list shows as 00:02. A leading '-' negates a term (-fmt:mp3) or excludes
+the tracks matching a word (-snare).
+"""
+
+import re
+import numpy as np
+from utils.search_index import tokenize
+
+class QueryError(ValueError):
+    """A field term whose value cannot be understood (e.g. 'sr:fast')."""
+
+_NUMBER = r"(\d+(?:\.\d*)?|\.\d+)"
+_DURATION_RE = re.compile(_NUMBER + r"\s*(ms|s|sec|m|min|h)?")
+_CLOCK_RE = re.compile(r"(\d+):(\d{1,2}(?:\.\d*)?)")
+_RATE_RE = re.compile(_NUMBER + r"\s*(k)?(?:hz)?")
+_OP_RE = re.compile(r"(<=|>=|!=|<|>|=)?(.*)")
+_SECONDS = {None: 1, "ms": 0.001, "s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600}
+
+def _parse_duration(text):
+    m = _CLOCK_RE.fullmatch(text)
+    if m:
+        return int(m.group(1)) * 60 + float(m.group(2))
+    m = _DURATION_RE.fullmatch(text)
+    if not m:
+        raise QueryError(f"Not a duration: {text}")
+    return float(m.group(1)) * _SECONDS[m.group(2)]
+
+def _parse_rate(text):
+    m = _RATE_RE.fullmatch(text)
+    if not m:
+        raise QueryError(f"Not a sample rate: {text}")
+    return float(m.group(1)) * (1000 if m.group(2) else 1)
+
+_YES = {"yes", "y", "true", "1", "on"}
+_NO = {"no", "n", "false", "0", "off"}
+
+def _parse_flag(text):
+    if text in _YES:
+        return True
+    if text in _NO:
+        return False
+    raise QueryError(f"Expected yes or no: {text}")
+
+_CHANNEL_ALIASES = {"1": "mono", "2": "stereo"}
+
+# Query field -> (column, kind, value parser)
+FIELDS = {
+    "dur": ("duration", "number", _parse_duration),
+    "duration": ("duration", "number", _parse_duration),
+    "sr": ("sample_rate", "number", _parse_rate),
+    "rate": ("sample_rate", "number", _parse_rate),
+    "fmt": ("format", "text", lambda v: v.lstrip(".")),
+    "format": ("format", "text", lambda v: v.lstrip(".")),
+    "ext": ("format", "text", lambda v: v.lstrip(".")),
+    "ch": ("channels", "text", lambda v: _CHANNEL_ALIASES.get(v, v)),
+    "channels": ("channels", "text", lambda v: _CHANNEL_ALIASES.get(v, v)),
+    "fav": ("is_favorite", "flag", _parse_flag),
+    "favorite": ("is_favorite", "flag", _parse_flag),
+}
+
+_COMPARE = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+            "=": np.equal, "!=": np.not_equal}
+
+class FieldPredicate:
+    """One field term, evaluated as a boolean mask over a table's rows."""
+    __slots__ = ("column", "kind", "op", "value", "negate")
+
+    def __init__(self, column, kind, op, value, negate=False):
+        self.column = column
+        self.kind = kind
+        self.op = op        # Numbers: a _COMPARE key, "range" (value = (lo, hi)) or "display" (whole seconds)
+        self.value = value  # Text columns: set of accepted lower-case strings
+        self.negate = negate
+
+    def mask(self, table, start, end):
+        column = table.column(self.column)[start:end]
+        if self.kind == "text":
+            # Compare the few distinct strings, then select rows by code
+            codes = [i for i, v in enumerate(table.values(self.column)) if str(v).lower() in self.value]
+            mask = np.isin(column, codes)
+        elif self.kind == "flag":
+            mask = column == self.value
+        elif self.op == "range":
+            lo, hi = self.value
+            mask = (column >= lo) & (column <= hi)
+        elif self.op == "display":
+            mask = np.floor(column) == np.floor(self.value)
+        else:
+            mask = _COMPARE[self.op](column, self.value)
+        return ~mask if self.negate else mask
+
+def _predicate(spec, text, negate):
+    column, kind, parse = spec
+    text = text.lower()
+    if kind == "text":
+        return FieldPredicate(column, kind, "=", {parse(v) for v in text.split(",") if v}, negate)
+    if kind == "flag":
+        return FieldPredicate(column, kind, "=", parse(text), negate)
+    if ".." in text:
+        lo, hi = text.split("..", 1)
+        return FieldPredicate(column, kind, "range", (parse(lo), parse(hi)), negate)
+    op, value = _OP_RE.fullmatch(text).groups()
+    if not value:
+        raise QueryError(f"Missing value: {text}")
+    if op is None:
+        op = "display" if column == "duration" else "="
+    return FieldPredicate(column, kind, op, parse(value), negate)
+
+class TrackQuery:
+    """A parsed query: free words and excluded words (for the text index) and field predicates."""
+
+    def __init__(self, words, predicates, errors, excluded=()):
+        self.words = words
+        self.predicates = predicates
+        self.errors = errors # Terms that were ignored (see QueryError)
+        self.excluded = list(excluded) # Words of '-word' terms
+
+    @property
+    def text(self):
+        return " ".join(self.words)
+
+    @property
+    def columns(self):
+        return {p.column for p in self.predicates}
+
+    def is_empty(self):
+        return not self.words and not self.excluded and not self.predicates
+
+    def text_mask(self, index, docs, words=True):
+        """
+        Which of docs (doc ids in the SearchIndex index) match every word and none
+        of the excluded words; None when there is nothing to match. words=False
+        applies the exclusions only.
+        """
+        result = None
+        if words and self.words:
+            result = index.search(self.text) # None: no text filter
+            if result is not None:
+                result = result[docs]
+        for word in self.excluded:
+            hits = index.search(word)
+            if hits is not None:
+                keep = ~hits[docs]
+                result = keep if result is None else result & keep
+        return result
+
+    def mask(self, table, start=0, end=None):
+        """Rows [start, end) of table passing every field predicate, or None without predicates."""
+        if not self.predicates:
+            return None
+        if end is None:
+            end = len(table)
+        result = None
+        for predicate in self.predicates:
+            mask = predicate.mask(table, start, end)
+            result = mask if result is None else result & mask
+        return result
+
+def parse_query(text):
+    """
+    Splits text into words and field terms. Terms still being typed ('dur:') or
+    with values that do not parse are left out (listed in errors), so filtering
+    as you type never fails.
+    """
+    words, excluded, predicates, errors = [], [], [], []
+    for term in (text or "").split():
+        negate = term.startswith("-")
+        field, sep, value = (term[1:] if negate else term).partition(":")
+        spec = FIELDS.get(field.lower()) if sep else None
+        if spec is None:
+            # '-' or '_' alone (a term being typed) filters nothing
+            if negate and tokenize(term[1:]):
+                excluded.append(term[1:])
+            elif not negate and tokenize(term):
+                words.append(term)
+            continue
+        if not value:
+            continue
+        try:
+            predicates.append(_predicate(spec, value, negate))
+        except QueryError as e:
+            errors.append(str(e))
+    return TrackQuery(words, predicates, errors, excluded)
@@ -0,0 +1,157 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+import os
+import hashlib
+import numpy as np
+import soundfile as sf
+from utils.audio_loader import mix_to_mono
+
+PYRAMID_DIR = os.path.join(os.path.expanduser("~"), ".wavecore", "pyramids")
+PYRAMID_CACHE_BYTES = 256 * 1024 * 1024 # Least recently used pyramids are deleted above this
+
+FINEST_BIN = 256      # Samples per bin at the most detailed level
+COARSEST_BINS = 512   # Stop decimating once a level is this small
+BLOCK_FRAMES = 256 * 1024
+
+class WaveformPyramid:
+    """
+    Min/max peak pyramid of a track. levels[0] is the finest (FINEST_BIN samples
+    per bin); every following level halves the resolution. Each level is a
+    (2, n) float16 array of [min, max] normalized to the track's absolute peak.
+    """
+    def __init__(self, levels):
+        self.levels = levels
+        self.peaks = [np.maximum(np.abs(l[0]), np.abs(l[1])) for l in levels]
+
+    def level_for(self, zoom_factor, bars):
+        """Coarsest level that still has at least one bin per bar in the visible window."""
+        for peaks in reversed(self.peaks):
+            if len(peaks) / zoom_factor >= bars:
+                return peaks
+        return self.peaks[0]
+
+_failed = {} # File key -> (mtime, size) of the version that could not be decoded
+
+def _file_key(file_path):
+    return os.path.normcase(os.path.abspath(file_path))
+
+def _cache_path(file_path):
+    st = os.stat(file_path)
+    key = f"{_file_key(file_path)}|{st.st_mtime}|{st.st_size}"
+    return os.path.join(PYRAMID_DIR, hashlib.md5(key.encode()).hexdigest() + ".npz")
+
+def pyramid_failed(file_path):
+    """True if building this version of the file already failed (e.g. a format soundfile cannot read)."""
+    version = _failed.get(_file_key(file_path))
+    if version is None:
+        return False
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return True
+    return version == (st.st_mtime, st.st_size)
+
+def _mark_failed(file_path):
+    try:
+        st = os.stat(file_path)
+        _failed[_file_key(file_path)] = (st.st_mtime, st.st_size)
+    except OSError:
+        pass
+
+def prune_pyramid_cache(max_bytes=PYRAMID_CACHE_BYTES, cache_dir=PYRAMID_DIR, keep=None):
+    """Deletes the least recently used pyramids until the cache fits in max_bytes."""
+    try:
+        entries = []
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+    except OSError:
+        return
+
+    total = sum(e[1] for e in entries)
+    for _, size, path in sorted(entries): # Oldest first (hits refresh the mtime)
+        if total <= max_bytes: break
+        if path == keep: continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def _decimate(level):
+    # Pair bins 2:1 (pad odd lengths by repeating the last bin)
+    if level.shape[1] % 2:
+        level = np.concatenate([level, level[:, -1:]], axis=1)
+    pairs = level.reshape(2, -1, 2)
+    return np.stack([pairs[0].min(axis=1), pairs[1].max(axis=1)])
+
+def build_pyramid(file_path):
+    """Decodes the file once and returns its WaveformPyramid."""
+    mins, maxs = [], []
+    carry = np.zeros(0, dtype=np.float32)
+    with sf.SoundFile(file_path) as f:
+        for block in f.blocks(blocksize=BLOCK_FRAMES, always_2d=True, dtype='float32'):
+            mono = np.concatenate([carry, mix_to_mono(block)])
+            usable = len(mono) - len(mono) % FINEST_BIN
+            bins = mono[:usable].reshape(-1, FINEST_BIN)
+            mins.append(bins.min(axis=1))
+            maxs.append(bins.max(axis=1))
+            carry = mono[usable:]
+    if len(carry):
+        mins.append(carry.min(keepdims=True))
+        maxs.append(carry.max(keepdims=True))
+    if not mins:
+        return None
+
+    level = np.stack([np.concatenate(mins), np.concatenate(maxs)])
+    peak = np.max(np.abs(level))
+    if peak > 0:
+        level = level / peak
+
+    levels = [level.astype(np.float16)]
+    while levels[-1].shape[1] > COARSEST_BINS:
+        levels.append(_decimate(levels[-1]))
+    return WaveformPyramid(levels)
+
+def load_or_build_pyramid(file_path):
+    """Returns the persisted pyramid for the current file version, computing it once if needed."""
+    try:
+        cache_path = _cache_path(file_path)
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as npz:
+                pyramid = WaveformPyramid([npz[f"level{i}"] for i in range(len(npz.files))])
+            os.utime(cache_path) # Recently used: pruned last
+            return pyramid
+
+        # A file that cannot be decoded is not retried until it changes
+        try:
+            pyramid = build_pyramid(file_path)
+        except Exception:
+            _mark_failed(file_path)
+            raise
+        if not pyramid:
+            _mark_failed(file_path)
+            return None
+
+        os.makedirs(PYRAMID_DIR, exist_ok=True)
+        tmp_path = cache_path + ".tmp.npz"
+        np.savez(tmp_path, **{f"level{i}": l for i, l in enumerate(pyramid.levels)})
+        os.replace(tmp_path, cache_path)
+        prune_pyramid_cache(keep=cache_path)
+        return pyramid
+    except Exception as e:
+        print(f"Pyramid error {file_path}: {e}")
+        return None
+
+class PyramidLoader(QThread):
+    pyramid_ready = pyqtSignal(str, object)
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+
+    def run(self):
+        pyramid = load_or_build_pyramid(self.file_path)
+        if pyramid:
+            self.pyramid_ready.emit(self.file_path, pyramid)
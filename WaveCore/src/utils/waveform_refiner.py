@@ -0,0 +1,46 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+import os
+import queue
+from utils.audio_loader import analyze_audio
+from utils.asset_analysis import WAVEFORM_POINTS
+
+class WaveformRefiner(QThread):
+    """
+    Computes the exact waveform of tracks that were listed with a provisional
+    (seek-sampled) one. Files are processed one at a time at the lowest thread
+    priority, so it only uses time the scanner and UI leave free.
+    """
+    waveform_refined = pyqtSignal(str, object, object) # path, exact peak array, analysis dict
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._is_running = True
+
+    def enqueue(self, paths):
+        for path in paths:
+            key = os.path.normcase(os.path.normpath(path))
+            if key in self._queued: continue
+            self._queued.add(key)
+            self._queue.put(path)
+        if self._is_running and not self.isRunning():
+            self.start(QThread.Priority.LowestPriority)
+
+    def run(self):
+        while self._is_running:
+            path = self._queue.get()
+            if path is None: break
+            self._queued.discard(os.path.normcase(os.path.normpath(path)))
+            if not os.path.exists(path): continue
+
+            # The exact pass also yields the measurements skipped by the sampled one
+            data, duration, _, analysis = analyze_audio(path, points=WAVEFORM_POINTS,
+                                                        should_stop=lambda: not self._is_running)
+            if data is not None and duration > 0 and self._is_running:
+                self.waveform_refined.emit(path, data, analysis)
+
+    def stop(self):
+        self._is_running = False
+        self._queue.put(None)
+        self.wait()
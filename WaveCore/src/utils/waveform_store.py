@@ -0,0 +1,70 @@
+import os
+import threading
+import numpy as np
+
+class WaveformStore:
+    """
+    Append-only binary file of packed waveform peaks (float16), read back through
+    numpy.memmap. Callers keep the (offset, length) pair returned by append();
+    view() returns a zero-copy, read-only slice of the mapped file.
+    Changed waveforms simply append again; the old range becomes garbage until compact().
+    """
+    DTYPE = np.dtype(np.float16)
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._map = None
+        self._fh = open(path, 'ab')
+
+    @property
+    def size(self):
+        """Total number of stored values (live + garbage)."""
+        with self._lock:
+            self._fh.seek(0, os.SEEK_END)
+            return self._fh.tell() // self.DTYPE.itemsize
+
+    def append(self, data):
+        """Appends a waveform and returns its (offset, length) in values."""
+        arr = np.ascontiguousarray(data, dtype=self.DTYPE)
+        with self._lock:
+            self._fh.seek(0, os.SEEK_END)
+            offset = self._fh.tell() // self.DTYPE.itemsize
+            self._fh.write(arr.tobytes())
+            self._fh.flush()
+        return offset, len(arr)
+
+    def view(self, offset, length):
+        if not length:
+            return np.zeros(0, dtype=self.DTYPE)
+        end = offset + length
+        with self._lock:
+            # The file only grows, so remap lazily once a range falls past the current map.
+            # Views handed out earlier keep their own reference to the old mapping.
+            if self._map is None or end > len(self._map):
+                self._map = np.memmap(self.path, dtype=self.DTYPE, mode='r')
+            return self._map[offset:end]
+
+    def copy_to(self, target_path, ranges):
+        """
+        Writes the given live (offset, length) ranges to a fresh file, in order,
+        and returns the new offsets. Used for compaction.
+        """
+        new_offsets = []
+        src = np.memmap(self.path, dtype=self.DTYPE, mode='r') if self.size else None
+        try:
+            with open(target_path, 'wb') as out:
+                pos = 0
+                for offset, length in ranges:
+                    out.write(src[offset:offset + length].tobytes())
+                    new_offsets.append(pos)
+                    pos += length
+        finally:
+            if src is not None:
+                src._mmap.close()
+        return new_offsets
+
+    def close(self):
+        with self._lock:
+            self._fh.close()
+            self._map = None